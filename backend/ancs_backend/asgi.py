@@ -2,4 +2,18 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ancs_backend.settings")
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up.
+from notices.events import serve_until_disconnect  # noqa: E402
+
+EVENTS_PATH = "/api/events"
+
+
+async def application(scope, receive, send):
+    # /api/events is an ordinary Django view, but its streams are long-lived, so
+    # they are told when the client disconnects; everything else goes straight through.
+    if scope["type"] == "http" and scope["path"].rstrip("/") == EVENTS_PATH:
+        await serve_until_disconnect(django_application, scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -122,9 +122,88 @@ EMAIL_HOST_USER = os.environ.get("SMTP_USERNAME", "")
 EMAIL_HOST_PASSWORD = os.environ.get("SMTP_PASSWORD", "")
 EMAIL_USE_TLS = os.environ.get("SMTP_USE_TLS", "false").lower() == "true"
 DEFAULT_FROM_EMAIL = os.environ.get("EMAIL_FROM", "no-reply@nea.local")
+EMAIL_TIMEOUT = int(os.environ.get("SMTP_TIMEOUT", "30"))
+# Bulk circulation: messages sent per SMTP session, and retries after a dropped connection
+EMAIL_BULK_CHUNK_SIZE = int(os.environ.get("SMTP_BULK_CHUNK_SIZE", "100"))
+EMAIL_BULK_MAX_RETRIES = int(os.environ.get("SMTP_BULK_MAX_RETRIES", "2"))
 
 FCM_SERVER_KEY = os.environ.get("FCM_SERVER_KEY", "")
 
+# SMS gateway: notices.sms.ConsoleSMSBackend (log only) or notices.sms.SparrowSMSBackend
+SMS_BACKEND = os.environ.get("SMS_BACKEND", "notices.sms.ConsoleSMSBackend")
+SMS_API_URL = os.environ.get("SMS_API_URL", "https://api.sparrowsms.com/v2/sms/")
+SMS_API_TOKEN = os.environ.get("SMS_API_TOKEN", "")
+SMS_SENDER_ID = os.environ.get("SMS_SENDER_ID", "NEA")
+SMS_BATCH_SIZE = int(os.environ.get("SMS_BATCH_SIZE", "100"))
+SMS_RATE_LIMIT = float(os.environ.get("SMS_RATE_LIMIT", "10"))  # messages per second; 0 turns throttling off
+SMS_MAX_RETRIES = int(os.environ.get("SMS_MAX_RETRIES", "3"))
+
+# Notice view/download tracking is buffered per process and written in bulk.
+# TRACKING_FLUSH_INTERVAL=0 writes every event immediately.
+TRACKING_FLUSH_INTERVAL = float(os.environ.get("TRACKING_FLUSH_INTERVAL", "5"))
+TRACKING_FLUSH_SIZE = int(os.environ.get("TRACKING_FLUSH_SIZE", "1000"))
+TRACKING_SEEN_CACHE_SIZE = int(os.environ.get("TRACKING_SEEN_CACHE_SIZE", "100000"))
+
+# prune_activity_log: entries older than this many days move to gzipped JSONL files here
+ACTIVITY_RETENTION_DAYS = int(os.environ.get("ACTIVITY_RETENTION_DAYS", "365"))
+ACTIVITY_ARCHIVE_DIR = os.environ.get("ACTIVITY_ARCHIVE_DIR", str(BASE_DIR / "archive" / "activity"))
+
+# Background circulation worker (python manage.py run_circulation_worker)
+CIRCULATION_POLL_INTERVAL = float(os.environ.get("CIRCULATION_POLL_INTERVAL", "2"))
+# A running job refreshes started_at as its sends complete; one that has not for this many
+# seconds is treated as abandoned, so keep it above the longest single office/channel send.
+CIRCULATION_JOB_TIMEOUT = int(os.environ.get("CIRCULATION_JOB_TIMEOUT", "1800"))
+# Threads per channel; each channel has its own pool, so a slow one never holds up the others
+CIRCULATION_CHANNEL_CONCURRENCY = {
+    "email": int(os.environ.get("CIRCULATION_EMAIL_CONCURRENCY", "4")),
+    "sms": int(os.environ.get("CIRCULATION_SMS_CONCURRENCY", "4")),
+    "push": int(os.environ.get("CIRCULATION_PUSH_CONCURRENCY", "8")),
+}
+# Delivery ledger retries (notices/deliveries.py): exponential backoff from BASE, capped at MAX,
+# with jitter; a recipient still failing after DELIVERY_MAX_ATTEMPTS sends becomes a dead letter
+DELIVERY_MAX_ATTEMPTS = int(os.environ.get("DELIVERY_MAX_ATTEMPTS", "5"))
+DELIVERY_RETRY_BASE_SECONDS = float(os.environ.get("DELIVERY_RETRY_BASE_SECONDS", "60"))
+DELIVERY_RETRY_MAX_SECONDS = float(os.environ.get("DELIVERY_RETRY_MAX_SECONDS", "3600"))
+DELIVERY_RETRY_BATCH = int(os.environ.get("DELIVERY_RETRY_BATCH", "500"))
+
+# Cache for the department directory (notices/directory.py). Local memory is per process;
+# use django.core.cache.backends.filebased.FileBasedCache to share it between processes.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "ancs"),
+    }
+}
+# Also bounds how long another process may serve a directory it did not see change.
+DEPARTMENT_CACHE_TIMEOUT = int(os.environ.get("DEPARTMENT_CACHE_TIMEOUT", "300"))
+
+# Attachments (notices/attachments.py): resumable chunked uploads stored by SHA-256 under MEDIA_ROOT
+ATTACHMENT_CHUNK_SIZE = int(os.environ.get("ATTACHMENT_CHUNK_SIZE", str(8 * 1024 * 1024)))
+ATTACHMENT_MAX_SIZE = int(os.environ.get("ATTACHMENT_MAX_SIZE", str(200 * 1024 * 1024)))
+# Downloads (notices/downloads.py): "x-accel" hands the file to nginx via X-Accel-Redirect
+ATTACHMENT_SENDFILE = os.environ.get("ATTACHMENT_SENDFILE", "")
+# Lifetime of the signed token in a download link, which names the reader for tracking.
+# Links are fetched when the reader clicks (GET /api/notices/{id}/download-link), so keep it short.
+ATTACHMENT_LINK_MAX_AGE = int(os.environ.get("ATTACHMENT_LINK_MAX_AGE", "300"))
+
+# Delta sync (/api/notices/changes): hold back rows this recent so slow commits are not skipped
+SYNC_SETTLE_SECONDS = float(os.environ.get("SYNC_SETTLE_SECONDS", "2"))
+# Deletions are reported to delta-sync clients for this long (python manage.py prune_tombstones);
+# a cursor older than this gets 410 Gone and the client resyncs from scratch
+SYNC_TOMBSTONE_RETENTION_DAYS = float(os.environ.get("SYNC_TOMBSTONE_RETENTION_DAYS", "90"))
+
+# Server-Sent Events at /api/events (ASGI only; see ancs_backend/asgi.py)
+EVENTS_HEARTBEAT_INTERVAL = float(os.environ.get("EVENTS_HEARTBEAT_INTERVAL", "20"))
+EVENTS_QUEUE_SIZE = int(os.environ.get("EVENTS_QUEUE_SIZE", "100"))
+EVENTS_RETRY_MS = int(os.environ.get("EVENTS_RETRY_MS", "5000"))
+# Events are written to the notices_noticeevent outbox by any process (web, worker, cron);
+# each web process with open streams polls it this often
+EVENTS_POLL_INTERVAL = float(os.environ.get("EVENTS_POLL_INTERVAL", "1"))
+# A gap in outbox ids is waited on this long in case its transaction has not committed yet
+EVENTS_SETTLE_SECONDS = float(os.environ.get("EVENTS_SETTLE_SECONDS", "10"))
+# Outbox rows older than this are deleted by python manage.py prune_events
+EVENTS_RETENTION_HOURS = float(os.environ.get("EVENTS_RETENTION_HOURS", "24"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -0,0 +1,122 @@
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import ActivityLog, Notice, User
+
+logger = logging.getLogger(__name__)
+
+# Rows per bulk INSERT statement, and per read when archiving
+WRITE_CHUNK = 500
+
+
+class ActivityWriter:
+    """Append-only audit log, written in bulk when each transaction commits.
+
+    ``log`` adds an entry to a batch that is inserted with one
+    ``bulk_create`` from ``transaction.on_commit``, so a rolled-back change
+    leaves no audit row and a committed one is on disk before the request
+    returns. Entries logged at the same savepoint depth share a batch: a
+    savepoint rollback discards its callback, and with it exactly the entries
+    logged under that savepoint. Outside a transaction an entry is written
+    at once. Entries keep the time they were logged.
+    """
+
+    def log(self, user, action, notice=None):
+        entry = ActivityLog(
+            user_id=getattr(user, "pk", None),
+            action=action,
+            notice_id=getattr(notice, "pk", None),
+            created_at=timezone.now(),
+        )
+        connection = transaction.get_connection()
+        savepoints = set(connection.savepoint_ids)
+        # Django keeps (savepoint ids, callback, robust) for each on_commit callback.
+        for callback_savepoints, callback, _ in reversed(connection.run_on_commit):
+            if isinstance(callback, ActivityBatch) and callback_savepoints == savepoints:
+                callback.entries.append(entry)
+                return
+        transaction.on_commit(ActivityBatch(entry))
+
+
+class ActivityBatch:
+    """The entries one transaction logged; called by ``on_commit`` to write them."""
+
+    def __init__(self, entry):
+        self.entries = [entry]
+
+    def __call__(self):
+        try:
+            for start in range(0, len(self.entries), WRITE_CHUNK):
+                _write(self.entries[start:start + WRITE_CHUNK])
+        except Exception:
+            # The change itself has committed; report the entries rather than fail the request.
+            logger.exception(
+                "Could not write activity log entries: %s",
+                [(e.user_id, e.action, e.notice_id, e.created_at.isoformat()) for e in self.entries],
+            )
+
+
+def _write(entries):
+    try:
+        with transaction.atomic():
+            ActivityLog.objects.bulk_create(entries)
+    except IntegrityError:
+        # A user or notice was hard-deleted before the entry was written; keep
+        # the entry the way ON DELETE SET NULL would have left it.
+        users = set(User.objects.filter(pk__in={e.user_id for e in entries}).values_list("pk", flat=True))
+        notices = set(Notice.objects.filter(pk__in={e.notice_id for e in entries}).values_list("pk", flat=True))
+        for entry in entries:
+            entry.pk = None
+            entry.user_id = entry.user_id if entry.user_id in users else None
+            entry.notice_id = entry.notice_id if entry.notice_id in notices else None
+        with transaction.atomic():
+            ActivityLog.objects.bulk_create(entries)
+
+
+def archive_activity(older_than, directory):
+    """Move entries created before ``older_than`` into a gzipped JSON Lines file.
+
+    Rows are deleted only after the archive has been completely written and
+    renamed into place. Returns ``(rows, path)``; ``path`` is None when there
+    was nothing to archive.
+    """
+    old = ActivityLog.objects.filter(created_at__lt=older_than).order_by("id")
+    last_id = old.values_list("id", flat=True).last()
+    if last_id is None:
+        return 0, None
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"activity-{older_than:%Y%m%dT%H%M%S}-{last_id}.jsonl.gz"
+    partial = path.with_name(path.name + ".part")
+    rows, after = 0, 0
+    with gzip.open(partial, "wt", encoding="utf-8") as fh:
+        while True:
+            chunk = list(
+                old.filter(id__gt=after, id__lte=last_id).values("id", "user_id", "action", "notice_id", "created_at")[
+                    :WRITE_CHUNK
+                ]
+            )
+            if not chunk:
+                break
+            for row in chunk:
+                row["created_at"] = row["created_at"].isoformat()
+                fh.write(json.dumps(row) + "\n")
+            rows += len(chunk)
+            after = chunk[-1]["id"]
+    os.replace(partial, path)
+    archived = ActivityLog.objects.filter(created_at__lt=older_than, id__lte=last_id)
+    while True:
+        ids = list(archived.order_by("id").values_list("id", flat=True)[:WRITE_CHUNK])
+        if not ids:
+            break
+        ActivityLog.objects.filter(id__in=ids).delete()
+    logger.info("Archived %s activity log entries to %s", rows, path)
+    return rows, path
+
+
+activity = ActivityWriter()
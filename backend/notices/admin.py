@@ -1,6 +1,21 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Department, Notice, NoticeDistribution, NoticeTracking, ActivityLog
+from django.utils import timezone
+from .models import (
+    User,
+    Department,
+    Notice,
+    NoticeDistribution,
+    NoticeDelivery,
+    NoticeTracking,
+    ActivityLog,
+    CirculationJob,
+    DeviceToken,
+    DashboardCounter,
+    Attachment,
+    NoticeAttachment,
+    UploadSession,
+)
 
 
 class UserAdmin(BaseUserAdmin):
@@ -24,9 +39,30 @@ class UserAdmin(BaseUserAdmin):
     ordering = ("email",)
 
 
+class NoticeDeliveryAdmin(admin.ModelAdmin):
+    list_display = ("notice", "department", "channel", "recipient", "status", "attempts", "next_attempt_at", "last_error")
+    list_filter = ("status", "channel")
+    search_fields = ("recipient",)
+    raw_id_fields = ("notice", "department")
+    actions = ["retry_now"]
+
+    @admin.action(description="Retry selected deliveries now")
+    def retry_now(self, request, queryset):
+        # Dead letters get a fresh set of attempts once the cause is fixed.
+        updated = queryset.exclude(status="sent").update(status="failed", attempts=0, next_attempt_at=timezone.now())
+        self.message_user(request, f"{updated} deliveries queued for retry.")
+
+
 admin.site.register(User, UserAdmin)
 admin.site.register(Department)
 admin.site.register(Notice)
 admin.site.register(NoticeDistribution)
+admin.site.register(NoticeDelivery, NoticeDeliveryAdmin)
 admin.site.register(NoticeTracking)
 admin.site.register(ActivityLog)
+admin.site.register(CirculationJob)
+admin.site.register(DeviceToken)
+admin.site.register(DashboardCounter)
+admin.site.register(Attachment)
+admin.site.register(NoticeAttachment)
+admin.site.register(UploadSession)
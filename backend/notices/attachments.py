@@ -0,0 +1,208 @@
+import hashlib
+import logging
+import mimetypes
+import os
+from pathlib import Path
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import Attachment, NoticeAttachment, UploadSession
+
+logger = logging.getLogger(__name__)
+
+# Bytes moved per read/write; an upload never holds more than this in memory.
+READ_SIZE = 64 * 1024
+
+
+class UploadOffsetConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Chunk does not start at the current upload offset."
+
+    def __init__(self, offset):
+        super().__init__()
+        # Assigned directly so the offset reaches the client as a number.
+        self.detail = {"detail": self.default_detail, "offset": offset}
+
+
+class ChunkTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Chunk is larger than ATTACHMENT_CHUNK_SIZE."
+
+
+def temp_path(session):
+    return Path(settings.MEDIA_ROOT) / "uploads" / f"{session.pk}.part"
+
+
+def stored_name(sha256):
+    """Path of a file under MEDIA_ROOT, fanned out by hash prefix."""
+    return f"attachments/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def start_upload(user, filename, size, content_type="", sha256=""):
+    """Open an upload session; a known ``sha256`` of the same size completes it immediately."""
+    filename = os.path.basename(filename)
+    content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    session = UploadSession.objects.create(
+        user=user, filename=filename, size=size, content_type=content_type, sha256=sha256.lower()
+    )
+    if session.sha256:
+        existing = Attachment.objects.filter(sha256=session.sha256, size=size).first()
+        if existing is not None:
+            session.received, session.status, session.attachment = size, "complete", existing
+            session.save(update_fields=["received", "status", "attachment", "updated_at"])
+    return session
+
+
+def write_chunk(session, start, stream, length):
+    """Append ``length`` bytes read from ``stream`` at ``start`` and finish the upload if it is whole.
+
+    Writers of one session are serialized by a row lock on it, taken without
+    waiting: a retry that arrives while the original request is still
+    streaming gets a 409 instead of interleaving with it. Under the lock the
+    offset is re-read and the file is cut back to exactly ``received`` bytes
+    before anything is appended, so a write that never advanced the offset
+    leaves no trace. A chunk cut short by a dropped connection still counts
+    for the bytes that arrived, so the client resumes from the offset the
+    server reports. SQLite has no row locks; there the conditional update of
+    the offset is the only guard.
+    """
+    if session.status != "open":
+        raise ValidationError({"detail": "Upload is already complete."})
+    if start != session.received:
+        raise UploadOffsetConflict(session.received)
+    if length > settings.ATTACHMENT_CHUNK_SIZE:
+        raise ChunkTooLarge()
+    path = temp_path(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    locked = restarted = False
+    try:
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update(nowait=True).get(pk=session.pk)
+            locked = True
+            restarted = _append(session, start, stream, length)
+    except OperationalError:
+        if locked:
+            raise
+        # Another request is still writing this upload.
+        session.refresh_from_db(fields=["received", "status"])
+        raise UploadOffsetConflict(session.received)
+    # Raised once the reset has committed.
+    if restarted:
+        raise UploadOffsetConflict(0)
+    if session.received == session.size:
+        finalize_upload(session)
+    return session
+
+
+def _append(session, start, stream, length):
+    """Write the chunk under the session's row lock; True if the upload had to restart."""
+    if session.status != "open":
+        raise ValidationError({"detail": "Upload is already complete."})
+    if start != session.received:
+        raise UploadOffsetConflict(session.received)
+    with open(os.open(temp_path(session), os.O_RDWR | os.O_CREAT, 0o644), "r+b") as fh:
+        if os.fstat(fh.fileno()).st_size < start:
+            # Bytes the offset counts are missing (e.g. the file was pruned); start over.
+            fh.truncate(0)
+            UploadSession.objects.filter(pk=session.pk).update(received=0, updated_at=timezone.now())
+            return True
+        # Drop bytes past the offset left by a writer that died before recording them.
+        fh.truncate(start)
+        fh.seek(start)
+        limit = min(length, session.size - start)
+        written = 0
+        while written < limit:
+            data = stream.read(min(READ_SIZE, limit - written))
+            if not data:
+                break
+            fh.write(data)
+            written += len(data)
+        fh.flush()
+    # Still conditional on the offset, in case the session was reset or aborted meanwhile.
+    advanced = UploadSession.objects.filter(pk=session.pk, received=start, status="open").update(
+        received=start + written, updated_at=timezone.now()
+    )
+    if not advanced:
+        session.refresh_from_db()
+        raise UploadOffsetConflict(session.received)
+    session.received = start + written
+    return False
+
+
+def finalize_upload(session):
+    """Hash the completed file and store it once under its content hash."""
+    path = temp_path(session)
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(READ_SIZE), b""):
+            digest.update(block)
+    sha256 = digest.hexdigest()
+    if session.sha256 and session.sha256 != sha256:
+        path.unlink(missing_ok=True)
+        UploadSession.objects.filter(pk=session.pk).update(received=0)
+        session.received = 0
+        raise ValidationError({"sha256": ["Uploaded content does not match the declared hash; the upload was restarted."]})
+
+    attachment = Attachment.objects.filter(sha256=sha256).first()
+    if attachment is None:
+        name = stored_name(sha256)
+        target = Path(settings.MEDIA_ROOT) / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, target)
+        try:
+            with transaction.atomic():
+                attachment = Attachment.objects.create(
+                    sha256=sha256, size=session.size, content_type=session.content_type, file=name
+                )
+        except IntegrityError:  # another upload of the same content finished first
+            attachment = Attachment.objects.get(sha256=sha256)
+    else:
+        path.unlink(missing_ok=True)
+    session.status = "complete"
+    session.attachment = attachment
+    session.save(update_fields=["status", "attachment", "updated_at"])
+    return attachment
+
+
+def abort_upload(session):
+    temp_path(session).unlink(missing_ok=True)
+    session.delete()
+
+
+def attach(notice, session, user, filename=None):
+    if session.status != "complete" or session.attachment_id is None:
+        raise ValidationError({"upload_id": ["Upload is not complete."]})
+    link, _ = NoticeAttachment.objects.get_or_create(
+        notice=notice,
+        attachment=session.attachment,
+        defaults={"filename": filename or session.filename, "created_by": user},
+    )
+    return link
+
+
+def prune_uploads(older_than):
+    """Drop open sessions idle since ``older_than`` and stored files nothing refers to.
+
+    Returns ``(sessions, files)`` removed.
+    """
+    stale = UploadSession.objects.filter(status="open", updated_at__lt=older_than)
+    sessions = 0
+    for session in stale.iterator():
+        abort_upload(session)
+        sessions += 1
+    # Files never attached to a notice and not part of a recent upload.
+    orphans = Attachment.objects.filter(created_at__lt=older_than, notice_links__isnull=True).exclude(
+        Q(uploadsession__updated_at__gte=older_than)
+    )
+    files = 0
+    for attachment in orphans.iterator():
+        path = Path(settings.MEDIA_ROOT) / attachment.file.name
+        attachment.delete()
+        path.unlink(missing_ok=True)
+        files += 1
+    logger.info("Pruned %s stale uploads and %s unattached files", sessions, files)
+    return sessions, files
@@ -0,0 +1,70 @@
+import abc
+import atexit
+import logging
+import threading
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundBuffer(abc.ABC):
+    """Base for in-process buffers whose entries are written in bulk off the request path.
+
+    Subclasses hold their pending entries under ``self._lock``, call
+    ``_added`` after adding one and implement ``flush``. A background thread
+    flushes every ``interval`` seconds, or sooner once ``_added`` reports
+    the buffer full, and ``register_exit_flush`` writes what is left when the
+    process exits. ``interval=0`` flushes on every add. ``flush`` must put
+    entries it could not write back into the buffer and re-raise, so a
+    failed write is retried on the next flush instead of being lost.
+    """
+
+    name = "buffer"
+
+    def __init__(self, interval, max_size):
+        self.interval = interval
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    @abc.abstractmethod
+    def flush(self):
+        """Write the pending entries, keeping any that could not be written."""
+
+    def _added(self, full):
+        if self.interval <= 0:
+            self.flush()
+            return
+        self._ensure_flusher()
+        if full:
+            self._wake.set()
+
+    def _ensure_flusher(self):
+        # Started lazily so each (possibly forked) worker process gets its own thread.
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("%s flush failed; pending entries are kept for the next one", self.name)
+            finally:
+                connections.close_all()
+
+    def register_exit_flush(self):
+        atexit.register(self._flush_at_exit)
+        return self
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except Exception:  # pragma: no cover - database may already be gone
+            logger.exception("%s flush at exit failed", self.name)
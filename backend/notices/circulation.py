@@ -0,0 +1,342 @@
+import logging
+import queue
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .activity import activity
+from .models import Department, DeviceToken, Notice, NoticeDelivery, NoticeDistribution, CirculationJob
+from .recipients import resolve_recipients
+from .deliveries import create_deliveries, delivery_counts, record_deliveries, refresh_distributions
+from .events import publish_notice_event
+from .notifications import BulkEmailSender, send_email_notice, send_sms_notice, send_push_notice
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ("email", "sms", "push")
+
+
+def ensure_distributions(notice, department_ids):
+    """Create missing distribution rows; return ``{department_id: {channel: status}}`` for those that existed."""
+    existing = {
+        row["department_id"]: {channel: row[f"{channel}_status"] for channel in CHANNELS}
+        for row in NoticeDistribution.objects.filter(notice=notice, department_id__in=department_ids).values(
+            "department_id", *(f"{channel}_status" for channel in CHANNELS)
+        )
+    }
+    NoticeDistribution.objects.bulk_create(
+        [NoticeDistribution(notice=notice, department_id=dept_id) for dept_id in department_ids if dept_id not in existing],
+        ignore_conflicts=True,
+    )
+    return existing
+
+
+def enqueue_circulation(notice, department_ids, user=None):
+    """Queue a circulation job for ``department_ids``; returns ``(job, skipped)``.
+
+    Circulating is idempotent per notice, office and channel: a channel an
+    office has already received (status ``sent``) is not sent again, and no
+    recipient in the ledger is ever sent the same notice twice. Recipients
+    of the targeted offices whose send failed are tried again straight away;
+    dead-lettered ones (a refused address, an unregistered device) stay dead.
+    ``skipped`` lists ``{"department_id", "channels"}`` for
+    the channels left alone.
+    """
+    department_ids = sorted({int(pk) for pk in department_ids})
+    valid_ids = list(Department.objects.filter(id__in=department_ids).values_list("id", flat=True))
+    existing = ensure_distributions(notice, valid_ids)
+    skipped = []
+    for department_id, statuses in sorted(existing.items()):
+        done = [channel for channel in CHANNELS if statuses[channel] == "sent"]
+        if done:
+            skipped.append({"department_id": department_id, "channels": done})
+    # Office statuses catch up when the job re-aggregates the ledger.
+    NoticeDelivery.objects.filter(
+        notice=notice, department_id__in=list(existing), status="failed"
+    ).update(status="pending", attempts=0, next_attempt_at=None, last_error="")
+    job = CirculationJob.objects.create(notice=notice, requested_by=user, department_ids=valid_ids)
+    return job, skipped
+
+
+def _stale_cutoff():
+    return timezone.now() - timedelta(seconds=settings.CIRCULATION_JOB_TIMEOUT)
+
+
+def _claimable():
+    # Jobs left "running" by a worker that died are picked up again after the timeout.
+    return CirculationJob.objects.filter(
+        Q(status="queued") | Q(status="running", started_at__lt=_stale_cutoff())
+    ).order_by("created_at", "id")
+
+
+def job_heartbeat(job):
+    """A callable that keeps ``job`` from looking stale while it is still being worked on.
+
+    Each call moves ``started_at`` forward (at most once every tenth of
+    ``CIRCULATION_JOB_TIMEOUT``), so only a job whose worker stopped making
+    progress is claimed again. The update is keyed on ``attempts``, so a
+    worker whose job was already re-claimed cannot refresh it.
+    """
+    every = settings.CIRCULATION_JOB_TIMEOUT / 10
+    last = time.monotonic()
+
+    def beat():
+        nonlocal last
+        if time.monotonic() - last < every:
+            return
+        last = time.monotonic()
+        CirculationJob.objects.filter(pk=job.pk, status="running", attempts=job.attempts).update(
+            started_at=timezone.now()
+        )
+
+    return beat
+
+
+def claim_next_job():
+    """Atomically move the oldest claimable job to "running" and return it, or None."""
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = _claimable().select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status = "running"
+            job.started_at = timezone.now()
+            job.attempts += 1
+            job.save(update_fields=["status", "started_at", "attempts"])
+            return job
+
+    # SQLite has no row locks; a conditional UPDATE decides which worker wins the job.
+    for job in _claimable()[:10]:
+        claimed = CirculationJob.objects.filter(pk=job.pk, status=job.status, started_at=job.started_at).update(
+            status="running", started_at=timezone.now(), attempts=job.attempts + 1
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+class CirculationExecutor:
+    """One bounded thread pool per channel for notification sends.
+
+    Sending is network bound, so channels and departments overlap. Each
+    channel's pool is sized to its concurrency limit, so a backlog of slow
+    email sends never takes threads away from SMS or push. Worker threads
+    never touch the database; callers record results themselves. Each email
+    thread owns its own ``BulkEmailSender`` so SMTP sessions are reused
+    without being shared between threads.
+    """
+
+    def __init__(self, limits=None):
+        limits = {**settings.CIRCULATION_CHANNEL_CONCURRENCY, **(limits or {})}
+        self._pools = {
+            channel: ThreadPoolExecutor(max_workers=max(1, limits[channel]), thread_name_prefix=f"circulation-{channel}")
+            for channel in CHANNELS
+        }
+        self._email_senders = queue.Queue()
+        for _ in range(max(1, limits["email"])):
+            self._email_senders.put(BulkEmailSender())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def shutdown(self):
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+        while not self._email_senders.empty():
+            self._email_senders.get_nowait().close()
+
+    def submit(self, channel, func, *args):
+        return self._pools[channel].submit(self._run, channel, func, *args)
+
+    def _run(self, channel, func, *args):
+        try:
+            if channel != "email":
+                return func(*args)
+            # One sender per email thread, so this never blocks.
+            sender = self._email_senders.get()
+            try:
+                return func(*args, sender=sender)
+            finally:
+                self._email_senders.put(sender)
+        except Exception as exc:
+            logger.exception("%s send failed", channel)
+            return {"status": "failed", "reason": str(exc)}
+
+
+def channel_send(notice, channel, recipients):
+    """The ``(func, *args)`` that delivers ``notice`` to ``recipients`` on ``channel``."""
+    if channel == "email":
+        return send_email_notice, f"[NEA Notice] {notice.title}", notice.content, recipients
+    if channel == "sms":
+        return send_sms_notice, f"NEA Notice: {notice.title}", recipients
+    return send_push_notice, notice.title, notice.content, recipients
+
+
+def notice_channels(notice):
+    # Push needs FCM credentials; without them it is skipped rather than retried forever.
+    channels = ["email", "push"] if settings.FCM_SERVER_KEY else ["email"]
+    if notice.priority in ["high", "urgent"]:
+        channels.append("sms")
+    return channels
+
+
+def prune_device_tokens(result):
+    """Delete the device tokens FCM reported as permanently invalid."""
+    invalid_tokens = result.get("invalid_tokens")
+    if invalid_tokens:
+        deleted, _ = DeviceToken.objects.filter(token__in=invalid_tokens).delete()
+        logger.info("Pruned %s stale device tokens", deleted)
+
+
+def send_deliveries(notices, deliveries, executor, heartbeat=None):
+    """Send pending or due ledger rows, one send per notice, office and channel.
+
+    Results are written to the ledger as each send lands and the office's
+    distribution status is re-aggregated; ``heartbeat`` is called after
+    each one. Returns ``{(notice_id, department_id): {channel: result}}``.
+    """
+    groups = defaultdict(list)
+    for row in deliveries:
+        groups[(row.notice_id, row.department_id, row.channel)].append(row)
+    futures = {}
+    for (notice_id, department_id, channel), rows in groups.items():
+        func, *args = channel_send(notices[notice_id], channel, [row.recipient for row in rows])
+        futures[executor.submit(channel, func, *args)] = (notice_id, department_id, channel)
+    results = defaultdict(dict)
+    for future in as_completed(futures):
+        notice_id, department_id, channel = key = futures[future]
+        result = future.result()
+        if channel == "push":
+            prune_device_tokens(result)
+        record_deliveries(groups[key], result)
+        refresh_distributions(notice_id, [department_id])
+        results[(notice_id, department_id)][channel] = result
+        if heartbeat is not None:
+            heartbeat()
+    return results
+
+
+def circulate(notice, departments, executor, heartbeat=None):
+    """Fan ``notice`` out to ``departments`` through ``executor`` and record each result as it lands.
+
+    Every recipient gets a pending ledger row first; only rows never tried
+    are claimed and sent, so a job picked up again after a crash, or a
+    second approval, does not repeat sends that were already recorded.
+    Failures are left to ``retry_due_deliveries``.
+    """
+    departments = list(departments)
+    department_ids = [dept.pk for dept in departments]
+    existing = ensure_distributions(notice, department_ids)
+    channels = notice_channels(notice)
+    recipients = resolve_recipients(department_ids)
+    create_deliveries(
+        notice,
+        {
+            # Channels an office already received are not circulated to it again.
+            pk: {channel: contacts[channel] for channel in channels if existing.get(pk, {}).get(channel) != "sent"}
+            for pk, contacts in recipients.items()
+        },
+    )
+    untried = NoticeDelivery.objects.filter(
+        notice=notice, department_id__in=department_ids, status="pending", next_attempt_at__isnull=True
+    )
+    sent = send_deliveries({notice.pk: notice}, lease_deliveries(untried), executor, heartbeat)
+    # Offices with nothing to send (no recipients, or no SMS for normal priority) end up "skipped".
+    refresh_distributions(notice.pk, department_ids)
+    return [
+        {"department": dept.name, **{channel: {"status": "skipped"} for channel in CHANNELS}, **sent.get((notice.pk, dept.pk), {})}
+        for dept in departments
+    ]
+
+
+def lease_deliveries(queryset, limit=None):
+    """Claim the ledger rows in ``queryset`` for sending and return those this caller won.
+
+    The claim sets them ``pending`` with ``next_attempt_at`` moved
+    ``CIRCULATION_JOB_TIMEOUT`` ahead; rows a crashed worker leased become
+    due for retry when the lease runs out. The lease time doubles as the
+    claim token, so two workers (or two approvals of one notice) never send
+    the same row.
+    """
+    ids = list(queryset.order_by("next_attempt_at", "id").values_list("id", flat=True)[:limit])
+    if not ids:
+        return []
+    lease = timezone.now() + timedelta(seconds=settings.CIRCULATION_JOB_TIMEOUT, microseconds=random.randrange(1_000_000))
+    queryset.filter(id__in=ids).update(status="pending", next_attempt_at=lease)
+    return list(NoticeDelivery.objects.filter(id__in=ids, status="pending", next_attempt_at=lease).order_by("id"))
+
+
+def claim_due_deliveries(limit=None, now=None):
+    """Lease up to ``limit`` failed ledger rows whose retry time has come."""
+    due = NoticeDelivery.objects.filter(status__in=["pending", "failed"], next_attempt_at__lte=now or timezone.now())
+    return lease_deliveries(due, limit or settings.DELIVERY_RETRY_BATCH)
+
+
+def retry_due_deliveries(limit=None):
+    """Re-send failed deliveries that are due; returns how many were attempted."""
+    deliveries = claim_due_deliveries(limit)
+    if not deliveries:
+        return 0
+    notices = Notice.objects.in_bulk({row.notice_id for row in deliveries})
+    with CirculationExecutor() as executor:
+        send_deliveries(notices, deliveries, executor)
+    logger.info("Retried %s failed deliveries", len(deliveries))
+    return len(deliveries)
+
+
+def process_job(job):
+    notice = job.notice
+    try:
+        with CirculationExecutor() as executor:
+            departments = Department.objects.filter(id__in=job.department_ids).order_by("id")
+            for result in circulate(notice, departments, executor, job_heartbeat(job)):
+                logger.info("Circulation #%s: %s", job.pk, result)
+    except Exception as exc:
+        logger.exception("Circulation #%s failed", job.pk)
+        job.status = "failed"
+        job.error = str(exc)
+    else:
+        job.status = "completed"
+        job.error = ""
+        activity.log(job.requested_by, "circulated notice", notice)
+    job.finished_at = timezone.now()
+    with transaction.atomic():
+        job.save(update_fields=["status", "error", "finished_at"])
+        publish_notice_event("notice.circulated", notice, job.department_ids, job={"id": job.pk, "status": job.status})
+    return job
+
+
+def job_progress(job):
+    """Per-department and per-channel progress for a circulation job."""
+    distributions = list(
+        NoticeDistribution.objects.filter(notice_id=job.notice_id, department_id__in=job.department_ids)
+        .select_related("department")
+        .order_by("department__name")
+    )
+    channels = {channel: {} for channel in CHANNELS}
+    departments = []
+    done = 0
+    for dist in distributions:
+        statuses = {channel: getattr(dist, f"{channel}_status") for channel in CHANNELS}
+        for channel, value in statuses.items():
+            channels[channel][value] = channels[channel].get(value, 0) + 1
+        finished = all(value != "pending" for value in statuses.values())
+        done += finished
+        departments.append({"department_id": dist.department_id, "department": dist.department.name, "done": finished, **statuses})
+    return {
+        "total": len(distributions),
+        "done": done,
+        "channels": channels,
+        "recipients": delivery_counts(job.notice_id, job.department_ids),
+        "departments": departments,
+    }
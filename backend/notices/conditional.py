@@ -0,0 +1,61 @@
+import hashlib
+from calendar import timegm
+from django.db.models import Count, Max, Subquery
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def collection_version(queryset, *nested):
+    """(row count, newest ``updated_at``) of ``queryset`` in one aggregate query.
+
+    ``nested`` querysets (the users and offices serialized into each row)
+    add their newest ``updated_at`` through scalar subqueries in the same
+    statement, so renaming an author or an office changes the version too.
+    """
+    newest = {
+        f"nested_{n}": Max(Subquery(related.order_by("-updated_at").values("updated_at")[:1]))
+        for n, related in enumerate(nested)
+    }
+    totals = queryset.order_by().aggregate(count=Count("pk"), last_modified=Max("updated_at"), **newest)
+    count = totals.pop("count")
+    return count, max((value for value in totals.values() if value), default=None)
+
+
+def row_version(*rows):
+    """A version token and the newest ``updated_at`` of a row and the loaded rows nested in its payload.
+
+    ``None`` entries (an unset relation) are skipped.
+    """
+    rows = [row for row in rows if row is not None]
+    token = ",".join(f"{row._meta.label}:{row.pk}:{row.updated_at.isoformat()}" for row in rows)
+    return token, max(row.updated_at for row in rows)
+
+
+def validators(request, *parts):
+    """A strong ETag over ``parts`` and this exact request (path, query, media type)."""
+    key = "|".join(str(part) for part in (*parts, request.get_full_path(), getattr(request, "accepted_media_type", "")))
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+def not_modified(request, etag, last_modified=None):
+    """The 304 (or 412) to send if the client's copy is current, else None.
+
+    Views call this before loading or serializing anything, then pass their
+    normal response through ``set_validators``. Pass ``last_modified`` only
+    when every change to the response moves it; collections, where deletes
+    do not, send the ETag alone.
+    """
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(timegm(last_modified.utctimetuple()))
+    # Let caches keep the body but revalidate on every use; kiosks get a 304 instead of stale data.
+    patch_cache_control(response, no_cache=True)
+    return response
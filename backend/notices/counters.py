@@ -0,0 +1,59 @@
+from django.db.models import BigIntegerField, Case, F, Value, When
+
+from .models import Department, Notice, NoticeDistribution, DashboardCounter
+
+COUNTERS = {
+    "total_notices": lambda: Notice.objects.count(),
+    "delivered_reports": lambda: NoticeDistribution.objects.filter(sent_email=True).count(),
+    "failed_deliveries": lambda: NoticeDistribution.objects.filter(email_status="failed").count(),
+    "urgent_notices": lambda: Notice.objects.filter(priority="urgent").count(),
+    "active_departments": lambda: Department.objects.count(),
+}
+
+
+def rebuild_counters():
+    """Recount every dashboard counter from the source tables."""
+    values = {name: count() for name, count in COUNTERS.items()}
+    DashboardCounter.objects.bulk_create([DashboardCounter(name=name) for name in values], ignore_conflicts=True)
+    for name, value in values.items():
+        DashboardCounter.objects.filter(name=name).update(value=value)
+    return values
+
+
+def read_counters():
+    values = dict(DashboardCounter.objects.values_list("name", "value"))
+    if set(COUNTERS) - set(values):
+        values = rebuild_counters()
+    return values
+
+
+def bump(**deltas):
+    """Add ``deltas`` to their counters in a single atomic UPDATE.
+
+    The counter rows are created by migration 0016, so nothing is read first
+    and concurrent bumps cannot overwrite each other.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    DashboardCounter.objects.filter(name__in=deltas).update(
+        value=F("value")
+        + Case(
+            *(When(name=name, then=Value(delta)) for name, delta in deltas.items()),
+            default=Value(0),
+            output_field=BigIntegerField(),
+        )
+    )
+
+
+def notice_counts(priority):
+    return {"total_notices": 1, "urgent_notices": int(priority == "urgent")}
+
+
+def distribution_counts(sent_email, email_status):
+    return {"delivered_reports": int(bool(sent_email)), "failed_deliveries": int(email_status == "failed")}
+
+
+def bump_change(before, after):
+    """Apply the difference between two count dicts (either may be empty)."""
+    bump(**{name: after.get(name, 0) - before.get(name, 0) for name in set(before) | set(after)})
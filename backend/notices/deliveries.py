@@ -0,0 +1,175 @@
+import random
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .counters import bump_change, distribution_counts
+from .models import NoticeDelivery, NoticeDistribution
+
+# Rows per bulk INSERT / UPDATE statement
+WRITE_CHUNK = 500
+
+
+def create_deliveries(notice, recipients):
+    """Add a pending ledger row for every ``recipients[department_id][channel]`` address.
+
+    Addresses already in the ledger for this notice and channel are left as
+    they are (``ignore_conflicts``).
+    """
+    rows = [
+        NoticeDelivery(notice=notice, department_id=department_id, channel=channel, recipient=recipient)
+        for department_id, contacts in recipients.items()
+        for channel, addresses in contacts.items()
+        for recipient in addresses
+    ]
+    NoticeDelivery.objects.bulk_create(rows, batch_size=WRITE_CHUNK, ignore_conflicts=True)
+
+
+def retry_delay(attempts):
+    """Seconds to wait before attempt ``attempts + 1``: exponential, capped, with jitter.
+
+    Half the delay is fixed and half random, so failures from one outage do
+    not all come back at the same moment.
+    """
+    delay = min(settings.DELIVERY_RETRY_MAX_SECONDS, settings.DELIVERY_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def recipient_outcomes(channel, result, recipients):
+    """Map a send result onto ``{recipient: (status, error)}`` for the ledger.
+
+    Permanent failures (a refused address, an unregistered device token) go
+    straight to ``dead``; anything else that did not arrive is ``failed``.
+    """
+    reason = (result.get("reason") or "")[:255]
+    per_recipient = {}
+    if channel == "email" and "recipients" in result:
+        per_recipient = {
+            address: {"sent": "sent", "refused": "dead"}.get(outcome, "failed")
+            for address, outcome in result["recipients"].items()
+        }
+    elif channel == "sms" and "sent" in result:
+        failed = set(result.get("failed") or [])
+        per_recipient = {number: "failed" if number in failed else "sent" for number in recipients}
+    elif channel == "push" and "failed_tokens" in result:
+        failed, invalid = set(result["failed_tokens"]), set(result.get("invalid_tokens") or [])
+        per_recipient = {
+            token: "dead" if token in invalid else "failed" if token in failed else "sent" for token in recipients
+        }
+    outcomes = {}
+    for recipient in recipients:
+        status = per_recipient.get(recipient, "sent" if result.get("status") == "sent" else "failed")
+        if status == "sent":
+            outcomes[recipient] = (status, "")
+        else:
+            outcomes[recipient] = (status, reason or ("rejected permanently" if status == "dead" else "send failed"))
+    return outcomes
+
+
+def record_deliveries(deliveries, result):
+    """Apply one send ``result`` to the ledger ``deliveries`` it covered (one channel)."""
+    if not deliveries:
+        return
+    now = timezone.now()
+    outcomes = recipient_outcomes(deliveries[0].channel, result, [row.recipient for row in deliveries])
+    for row in deliveries:
+        status, error = outcomes[row.recipient]
+        row.attempts += 1
+        row.last_error = error
+        if status == "sent":
+            row.status, row.sent_at, row.next_attempt_at = "sent", now, None
+        elif status == "dead" or row.attempts >= settings.DELIVERY_MAX_ATTEMPTS:
+            row.status, row.next_attempt_at = "dead", None
+        else:
+            row.status, row.next_attempt_at = "failed", now + timedelta(seconds=retry_delay(row.attempts))
+    NoticeDelivery.objects.bulk_update(
+        deliveries, ["status", "attempts", "last_error", "sent_at", "next_attempt_at"], batch_size=WRITE_CHUNK
+    )
+
+
+def channel_status(pending=0, sent=0, failed=0):
+    if pending:
+        return "pending"
+    if not sent and not failed:
+        return "skipped"
+    if not failed:
+        return "sent"
+    return "partial" if sent else "failed"
+
+
+def refresh_distributions(notice_id, department_ids):
+    """Recompute the per-department channel statuses of ``notice_id`` from the ledger.
+
+    The distribution rows are locked first, so two workers refreshing the
+    same office apply their counter changes one after the other instead of
+    both diffing against the same old status. Then one grouped query over
+    the ledger and a bulk update of the rows whose status changed. A
+    channel with no ledger rows is ``skipped`` once its circulation has
+    run; a status recorded before the ledger existed is kept.
+    """
+    with transaction.atomic():
+        distributions = list(
+            NoticeDistribution.objects.select_for_update()
+            .filter(notice_id=notice_id, department_id__in=department_ids)
+            .order_by("id")
+        )
+        totals = {}
+        for row in (
+            NoticeDelivery.objects.filter(notice_id=notice_id, department_id__in=department_ids)
+            .values("department_id", "channel")
+            .annotate(
+                pending=Count("id", filter=Q(status="pending")),
+                sent=Count("id", filter=Q(status="sent")),
+                failed=Count("id", filter=Q(status__in=["failed", "dead"])),
+            )
+            .order_by()
+        ):
+            totals[(row["department_id"], row["channel"])] = row
+        now = timezone.now()
+        changed, before, after = [], {}, {}
+        for dist in distributions:
+            counts = distribution_counts(dist.sent_email, dist.email_status)
+            updated = False
+            for channel, _ in NoticeDelivery.CHANNEL_CHOICES:
+                row = totals.get((dist.department_id, channel))
+                if row is not None:
+                    status = channel_status(row["pending"], row["sent"], row["failed"])
+                elif getattr(dist, f"{channel}_status") == "pending":
+                    status = "skipped"
+                else:
+                    continue
+                if getattr(dist, f"{channel}_status") != status:
+                    setattr(dist, f"{channel}_status", status)
+                    setattr(dist, f"sent_{channel}", status == "sent")
+                    updated = True
+            if updated:
+                dist.sent_time = now
+                changed.append(dist)
+                for name, value in counts.items():
+                    before[name] = before.get(name, 0) + value
+                for name, value in distribution_counts(dist.sent_email, dist.email_status).items():
+                    after[name] = after.get(name, 0) + value
+        NoticeDistribution.objects.bulk_update(
+            changed,
+            ["sent_email", "sent_sms", "sent_push", "email_status", "sms_status", "push_status", "sent_time"],
+            batch_size=WRITE_CHUNK,
+        )
+        # bulk_update bypasses the counter signals, so adjust the dashboard by hand.
+        bump_change(before, after)
+    return len(changed)
+
+
+def delivery_counts(notice_id, department_ids):
+    """``{channel: {status: recipients}}`` for a circulation, in one grouped query."""
+    counts = {channel: {} for channel, _ in NoticeDelivery.CHANNEL_CHOICES}
+    rows = (
+        NoticeDelivery.objects.filter(notice_id=notice_id, department_id__in=department_ids)
+        .values("channel", "status")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        counts[row["channel"]][row["status"]] = row["total"]
+    return counts
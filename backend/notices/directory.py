@@ -0,0 +1,44 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = "departments:version"
+
+
+def directory_version():
+    """Current version of the department directory; part of every cached key."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seeded from the clock so a lost version key never revives entries
+        # that outlived it (file caches expire keys independently).
+        cache.add(VERSION_KEY, time.time_ns(), settings.DEPARTMENT_CACHE_TIMEOUT)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_directory_version():
+    """Invalidate every cached directory entry once the current transaction commits."""
+    transaction.on_commit(_bump)
+
+
+def _bump():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:  # no version yet, or it expired
+        cache.set(VERSION_KEY, time.time_ns(), settings.DEPARTMENT_CACHE_TIMEOUT)
+
+
+def cached_directory(name, build):
+    """Return ``(version, build())``, cached under the current directory version.
+
+    The version is read before ``build`` runs, so data built while an office
+    is being changed lands under the old version and is never served again.
+    """
+    version = directory_version()
+    key = f"departments:{version}:{name}"
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, settings.DEPARTMENT_CACHE_TIMEOUT)
+    return version, value
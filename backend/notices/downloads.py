@@ -0,0 +1,141 @@
+import asyncio
+import re
+from pathlib import Path
+from urllib.parse import quote
+from django.conf import settings
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import content_disposition_header
+
+from .attachments import READ_SIZE
+from .models import User
+
+SIGNING_SALT = "notices.download"
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def download_token(user, notice_id, attachment_id=None):
+    """Token naming the downloader, for links opened without an Authorization header.
+
+    It sits in a query string, where access logs and proxies can see it, so it
+    is only good for this one notice and attachment and expires after
+    ``ATTACHMENT_LINK_MAX_AGE`` seconds. It only attributes the download;
+    the file itself is public.
+    """
+    return signing.dumps({"user": user.pk, "notice": notice_id, "attachment": attachment_id}, salt=SIGNING_SALT)
+
+
+def token_user(token, notice_id, attachment_id=None):
+    """The active user a download token names, if it is current and was issued for this file."""
+    try:
+        data = signing.loads(token, salt=SIGNING_SALT, max_age=settings.ATTACHMENT_LINK_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    if not isinstance(data, dict) or data.get("notice") != notice_id or data.get("attachment") != attachment_id:
+        return None
+    return User.objects.filter(pk=data.get("user"), is_active=True).first()
+
+
+def download_url(request, notice_id, attachment_id=None):
+    url = reverse("notice-download", args=[notice_id])
+    params = []
+    if attachment_id is not None:
+        params.append(f"attachment={attachment_id}")
+    if request is not None and request.user.is_authenticated:
+        params.append(f"token={download_token(request.user, notice_id, attachment_id)}")
+    if params:
+        url += "?" + "&".join(params)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def parse_range(header, size):
+    """The inclusive ``(start, end)`` of a single byte range, None to send the whole file.
+
+    Raises ValueError when the range cannot be satisfied. Multi-range
+    requests are answered with the whole file, which RFC 9110 allows.
+    """
+    match = RANGE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes.
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def attachment_response(request, link):
+    """Serve a notice attachment, by nginx ``X-Accel-Redirect`` or streamed from MEDIA_ROOT."""
+    attachment = link.attachment
+    etag = f'"{attachment.sha256}"'
+    if settings.ATTACHMENT_SENDFILE == "x-accel":
+        # nginx reads the file from its internal /media/attachments/ location and
+        # handles Range itself; the worker returns straight away.
+        response = HttpResponse(content_type=attachment.content_type or "application/octet-stream")
+        response["X-Accel-Redirect"] = quote(f"{settings.MEDIA_URL}{attachment.file.name}")
+        return _file_headers(response, link, etag)
+
+    path = Path(settings.MEDIA_ROOT) / attachment.file.name
+    if not path.is_file():
+        raise Http404("Attachment file is missing.")
+    size = attachment.size
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if range_header and request.headers.get("If-Range", etag) == etag:
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+    # Under ASGI, Django buffers sync iterators whole, so stream asynchronously there.
+    chunks = _aread(path, start, length) if isinstance(getattr(request, "_request", request), ASGIRequest) else _read(path, start, length)
+    response = StreamingHttpResponse(
+        chunks,
+        status=206 if byte_range else 200,
+        content_type=attachment.content_type or "application/octet-stream",
+    )
+    response["Content-Length"] = str(length)
+    if byte_range:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return _file_headers(response, link, etag)
+
+
+def _file_headers(response, link, etag):
+    response["Content-Disposition"] = content_disposition_header(True, link.filename)
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    # The URL may carry a download token; keep it out of Referer headers.
+    response["Referrer-Policy"] = "no-referrer"
+    return response
+
+
+def _read(path, start, length):
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        while length > 0:
+            data = fh.read(min(READ_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+async def _aread(path, start, length):
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        while length > 0:
+            data = await asyncio.to_thread(fh.read, min(READ_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
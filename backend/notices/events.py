@@ -0,0 +1,272 @@
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Max
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import NoticeEvent
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ("notice.approved", "notice.updated", "notice.archived", "notice.circulated")
+
+# Outbox rows read per poll
+RELAY_BATCH = 500
+
+
+class Broadcaster:
+    """Fan notice events out to every open event stream in this process.
+
+    Each subscriber is an ``asyncio.Queue`` owned by the event loop that
+    serves its connection, so an idle client costs a queue and a suspended
+    coroutine, not a thread. ``publish`` is safe to call from any thread; a
+    client that falls ``EVENTS_QUEUE_SIZE`` events behind loses the oldest
+    ones rather than holding memory.
+    """
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or settings.EVENTS_QUEUE_SIZE
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:  # loop already closed
+                self.unsubscribe(queue)
+
+
+def _offer(queue, event):
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+class EventRelay:
+    """Feed a broadcaster from the ``NoticeEvent`` outbox.
+
+    Runs as a task on the event loop while the process has subscribers, and
+    polls for rows above ``floor`` every ``EVENTS_POLL_INTERVAL`` seconds on
+    its own thread (so the sync ORM never blocks the loop). Ids are handed
+    out before their transactions commit, so a later id can appear first;
+    the floor only moves past a missing id once a newer row is
+    ``EVENTS_SETTLE_SECONDS`` old, and rows already relayed above it are
+    remembered so none is sent twice.
+    """
+
+    def __init__(self, broadcaster, interval=None, settle=None):
+        self.broadcaster = broadcaster
+        self.interval = settings.EVENTS_POLL_INTERVAL if interval is None else interval
+        self.settle = timedelta(seconds=settings.EVENTS_SETTLE_SECONDS if settle is None else settle)
+        self.floor = 0
+        self._relayed = {}
+        self._task = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-relay")
+
+    def ensure_running(self):
+        """Start relaying on the running loop unless it already is."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        # Clients reload on (re)connect, so only rows written from now on are relayed.
+        self.reset(await loop.run_in_executor(self._executor, self.latest_id))
+        while len(self.broadcaster):
+            try:
+                rows = await loop.run_in_executor(self._executor, self.fetch)
+            except Exception:
+                logger.exception("Could not read the notice event outbox")
+                rows = []
+            for event in self.accept(rows):
+                self.broadcaster.publish(event)
+            if len(rows) < RELAY_BATCH:
+                await asyncio.sleep(self.interval)
+
+    def reset(self, floor):
+        self.floor = floor
+        self._relayed = {}
+
+    def latest_id(self):
+        close_old_connections()
+        return NoticeEvent.objects.aggregate(latest=Max("id"))["latest"] or 0
+
+    def fetch(self):
+        close_old_connections()
+        return list(
+            NoticeEvent.objects.filter(id__gt=self.floor)
+            .order_by("id")
+            .values("id", "event_type", "data", "created_at")[:RELAY_BATCH]
+        )
+
+    def accept(self, rows, now=None):
+        """The events in ``rows`` not relayed yet; advances ``floor`` past settled ids."""
+        events = []
+        for row in rows:
+            if row["id"] not in self._relayed:
+                self._relayed[row["id"]] = row["created_at"]
+                events.append({"id": row["id"], "type": row["event_type"], "data": row["data"]})
+        cutoff = (now or timezone.now()) - self.settle
+        floor = max([self.floor, *(pk for pk, created_at in self._relayed.items() if created_at <= cutoff)])
+        while floor + 1 in self._relayed:
+            floor += 1
+        self.floor = floor
+        self._relayed = {pk: created_at for pk, created_at in self._relayed.items() if pk > floor}
+        return events
+
+
+broadcaster = Broadcaster()
+relay = EventRelay(broadcaster)
+
+
+def notice_event(event_type, notice, department_ids=None, **extra):
+    """An unsaved ``NoticeEvent`` announcing a change to ``notice``."""
+    data = {
+        "id": notice.pk,
+        "title": notice.title,
+        "priority": notice.priority,
+        "status": notice.status,
+        "updated_at": notice.updated_at.isoformat() if notice.updated_at else None,
+        **extra,
+    }
+    if department_ids is not None:
+        data["department_ids"] = list(department_ids)
+    return NoticeEvent(event_type=event_type, data=data)
+
+
+def publish_notice_event(event_type, notice, department_ids=None, **extra):
+    """Announce a notice change to event-stream clients once the transaction commits.
+
+    The event is written to the outbox in the caller's transaction, so it is
+    sent exactly when the change commits, whichever process made it.
+    """
+    event = notice_event(event_type, notice, department_ids, **extra)
+    event.save()
+    return event
+
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n".encode()
+
+
+def wants(event, department_id):
+    # Events without a target list (updates, archives) go to every client.
+    targets = event["data"].get("department_ids")
+    return department_id is None or targets is None or department_id in targets
+
+
+class EventStreamAccess(APIView):
+    """Applies the API's authentication, permission and throttle policy to ``/api/events``."""
+
+    def get(self, request):
+        department_id = request.query_params.get("department_id")
+        if department_id and not department_id.isdigit():
+            raise ValidationError({"department_id": ["A valid integer is required."]})
+        return Response(status=204)
+
+
+def _check_access(request):
+    response = EventStreamAccess.as_view()(request)
+    return response.render() if response.status_code != 204 else None
+
+
+async def event_stream(request):
+    """``GET /api/events``: a Server-Sent Events stream of notice changes.
+
+    ``?department_id=`` limits approvals to those circulated to that office.
+    An async view, so an open stream holds no thread; ``asgi.py`` tells it
+    when the client disconnects so its subscription is released at once.
+    """
+    denied = await sync_to_async(_check_access)(request)
+    if denied is not None:
+        return denied
+    if not hasattr(request, "scope"):
+        # WSGI (runserver) would buffer the whole endless stream before sending any of it.
+        return JsonResponse({"detail": "Event streams need the ASGI server."}, status=503)
+    department_id = request.GET.get("department_id")
+    response = StreamingHttpResponse(
+        _stream(int(department_id) if department_id else None, request.scope.get("disconnected")),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # nginx must pass events through as they are written.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def _stream(department_id, disconnected=None):
+    disconnected = disconnected or asyncio.Event()
+    queue = broadcaster.subscribe()
+    relay.ensure_running()
+    gone = asyncio.ensure_future(disconnected.wait())
+    try:
+        # Clients reload their notice list on (re)connect, so nothing needs replaying.
+        yield f"retry: {settings.EVENTS_RETRY_MS}\n\n".encode()
+        while not gone.done():
+            get = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {get, gone}, timeout=settings.EVENTS_HEARTBEAT_INTERVAL, return_when=asyncio.FIRST_COMPLETED
+            )
+            if get in done:
+                event = get.result()
+                if wants(event, department_id):
+                    yield format_event(event)
+                continue
+            get.cancel()
+            if not done:
+                # Comment line keeps proxies and load balancers from closing an idle stream.
+                yield b": keepalive\n\n"
+    finally:
+        broadcaster.unsubscribe(queue)
+        gone.cancel()
+
+
+async def serve_until_disconnect(app, scope, receive, send):
+    """Run the ASGI ``app`` with ``scope["disconnected"]`` set when the client goes away.
+
+    Django 4.2 stops reading from the client once it has the request body, and
+    ASGI servers drop writes to a closed connection silently, so a streaming
+    view would otherwise never learn that nobody is listening.
+    """
+    disconnected = asyncio.Event()
+    messages = asyncio.Queue()
+
+    async def listen():
+        while True:
+            message = await receive()
+            messages.put_nowait(message)
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+                return
+
+    listener = asyncio.ensure_future(listen())
+    try:
+        await app({**scope, "disconnected": disconnected}, messages.get, send)
+    finally:
+        listener.cancel()
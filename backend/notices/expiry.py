@@ -0,0 +1,40 @@
+import logging
+from django.db import transaction
+from django.utils import timezone
+
+from .events import notice_event
+from .models import Notice, NoticeEvent
+
+logger = logging.getLogger(__name__)
+
+# Notices archived per UPDATE statement
+EXPIRE_CHUNK = 500
+
+
+def expire_notices(today=None, chunk_size=EXPIRE_CHUNK):
+    """Archive active notices whose ``expiry_date`` has passed; returns how many.
+
+    Works in chunks of ``chunk_size`` ids read from the partial expiry index,
+    each archived by one UPDATE in its own transaction, so a large backlog
+    never holds long locks. ``updated_at`` is set explicitly (``update()``
+    skips ``auto_now``) so list validators and the delta feed see the change,
+    and a ``notice.archived`` event is written for each notice in the chunk.
+    Safe to run repeatedly: archived notices are never selected again.
+    """
+    today = today or timezone.localdate()
+    expired = Notice.objects.active().filter(expiry_date__lt=today)
+    total = 0
+    while True:
+        ids = list(expired.order_by("expiry_date", "id").values_list("id", flat=True)[:chunk_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            # Re-checked in the UPDATE in case a notice changed since it was read.
+            now = timezone.now()
+            total += expired.filter(id__in=ids).update(status="archived", updated_at=now)
+            archived = Notice.objects.filter(id__in=ids, status="archived", updated_at=now)
+            NoticeEvent.objects.bulk_create(notice_event("notice.archived", notice) for notice in archived)
+        if len(ids) < chunk_size:
+            break
+    logger.info("Archived %s expired notices", total)
+    return total
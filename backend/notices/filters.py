@@ -0,0 +1,91 @@
+from datetime import datetime, time, timedelta
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+from .models import Notice, NoticeDistribution
+
+
+# Filters whose result depends on today's date; see date_dependent()
+DATE_FILTERS = ("expired", "expires_before", "expires_after", "created_after", "created_before")
+
+
+def date_dependent(params):
+    """True when a filter in ``params`` compares against dates, so its result can change at midnight."""
+    return any(params.get(name) for name in DATE_FILTERS)
+
+
+def _choices(params, name, allowed):
+    raw = params.get(name)
+    if not raw:
+        return []
+    values = [value.strip() for value in raw.split(",") if value.strip()]
+    invalid = [value for value in values if value not in allowed]
+    if invalid:
+        raise ValidationError({name: [f'"{value}" is not a valid choice.' for value in invalid]})
+    return values
+
+
+def _date(params, name):
+    raw = params.get(name)
+    if not raw:
+        return None
+    value = parse_date(raw)
+    if value is None:
+        raise ValidationError({name: ["Date has wrong format. Use YYYY-MM-DD."]})
+    return value
+
+
+def _start_of_day(value):
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def filter_notices(queryset, params, active_only=True):
+    """Apply the notice list filters from query ``params``.
+
+    Supported: ``status`` and ``priority`` (comma separated), ``department_id``,
+    ``expired`` (true/false), ``expires_before``, ``expires_after``, ``created_after``
+    and ``created_before`` (YYYY-MM-DD, inclusive for creation dates). Without
+    ``status`` only active (non-archived) notices are returned, unless
+    ``active_only`` is false.
+    """
+    statuses = _choices(params, "status", dict(Notice.STATUS_CHOICES))
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    elif active_only:
+        queryset = queryset.active()
+    priorities = _choices(params, "priority", dict(Notice.PRIORITY_CHOICES))
+    if priorities:
+        queryset = queryset.filter(priority__in=priorities)
+    department_id = params.get("department_id")
+    if department_id:
+        if not department_id.isdigit():
+            raise ValidationError({"department_id": ["A valid integer is required."]})
+        # EXISTS keeps one row per notice without the DISTINCT a join would need.
+        queryset = queryset.filter(
+            Exists(NoticeDistribution.objects.filter(notice=OuterRef("pk"), department_id=department_id))
+        )
+    expired = params.get("expired")
+    if expired is not None:
+        today = timezone.localdate()
+        if expired.lower() in ("true", "1"):
+            queryset = queryset.filter(expiry_date__lt=today)
+        elif expired.lower() in ("false", "0"):
+            queryset = queryset.exclude(expiry_date__lt=today)
+        else:
+            raise ValidationError({"expired": ["Must be true or false."]})
+    expires_before = _date(params, "expires_before")
+    if expires_before:
+        queryset = queryset.filter(expiry_date__lt=expires_before)
+    expires_after = _date(params, "expires_after")
+    if expires_after:
+        queryset = queryset.filter(expiry_date__gte=expires_after)
+    # Creation dates become datetime bounds so the created_at indexes stay usable.
+    created_after = _date(params, "created_after")
+    if created_after:
+        queryset = queryset.filter(created_at__gte=_start_of_day(created_after))
+    created_before = _date(params, "created_before")
+    if created_before:
+        queryset = queryset.filter(created_at__lt=_start_of_day(created_before + timedelta(days=1)))
+    return queryset
@@ -0,0 +1,49 @@
+from functools import reduce
+from operator import or_
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Length, StrIndex, Substr
+from django.utils import timezone
+
+from .models import Department
+
+
+def subtree(root_ids):
+    """Departments under (and including) each root office.
+
+    The root paths are read first so the subtree filter compares against
+    constant prefixes, which the ``varchar_pattern_ops`` path index can serve.
+    """
+    paths = Department.objects.filter(pk__in=root_ids).exclude(path="").values_list("path", flat=True)
+    return under_paths(paths)
+
+
+def under_paths(paths):
+    """Departments whose materialized path starts with any of ``paths``, as one indexed query."""
+    # A root nested inside another root adds nothing to the result.
+    roots = []
+    for path in sorted(set(paths), key=len):
+        if not any(path.startswith(root) for root in roots):
+            roots.append(path)
+    if not roots:
+        return Department.objects.none()
+    return Department.objects.filter(reduce(or_, (Q(path__startswith=path) for path in roots)))
+
+
+def ancestors(department):
+    """The offices above ``department``, root first."""
+    ids = [int(pk) for pk in department.path.strip("/").split("/") if pk]
+    return Department.objects.filter(pk__in=ids).exclude(pk=department.pk).order_by(Length("path"))
+
+
+def is_in_subtree(candidate, root):
+    return bool(root.path) and candidate.path.startswith(root.path)
+
+
+def detach_subtree(department_pk):
+    """Re-root the descendants of a deleted office; their parent link was set to null."""
+    segment = f"/{department_pk}/"
+    # Match on the id segment rather than the (possibly stale) path of the deleted instance.
+    Department.objects.filter(path__contains=segment).update(
+        path=Concat(Value("/"), Substr("path", StrIndex("path", Value(segment)) + len(segment))),
+        updated_at=timezone.now(),
+    )
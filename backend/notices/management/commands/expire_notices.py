@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from notices.expiry import EXPIRE_CHUNK, expire_notices
+
+
+class Command(BaseCommand):
+    help = "Archive notices whose expiry_date has passed. Safe to run from cron as often as needed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=EXPIRE_CHUNK)
+
+    def handle(self, *args, **options):
+        archived = expire_notices(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} expired notices"))
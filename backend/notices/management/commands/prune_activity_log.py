@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notices.activity import archive_activity
+
+
+class Command(BaseCommand):
+    help = "Move activity log entries older than --days into a gzipped JSON Lines archive under --archive-dir."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=float, default=settings.ACTIVITY_RETENTION_DAYS)
+        parser.add_argument("--archive-dir", default=settings.ACTIVITY_ARCHIVE_DIR)
+
+    def handle(self, *args, **options):
+        rows, path = archive_activity(timezone.now() - timedelta(days=options["days"]), options["archive_dir"])
+        if path is None:
+            self.stdout.write("No activity log entries to archive")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Archived {rows} activity log entries to {path}"))
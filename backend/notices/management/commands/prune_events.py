@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notices.models import NoticeEvent
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete notice events older than --hours from the /api/events outbox. Web processes only "
+        "relay rows written while they have clients, so old rows are needed by nobody."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=float, default=settings.EVENTS_RETENTION_HOURS)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        deleted, _ = NoticeEvent.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} events older than {cutoff:%Y-%m-%d %H:%M}"))
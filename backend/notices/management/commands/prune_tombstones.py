@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notices.models import NoticeTombstone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete notice tombstones older than --days. Delta-sync cursors older than "
+        "SYNC_TOMBSTONE_RETENTION_DAYS are refused with 410 Gone, so no client still needs them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=float, default=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        deleted, _ = NoticeTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstones older than {cutoff:%Y-%m-%d %H:%M}"))
@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notices.attachments import prune_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete upload sessions idle for --hours and stored attachment files no notice uses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=float, default=24)
+
+    def handle(self, *args, **options):
+        sessions, files = prune_uploads(timezone.now() - timedelta(hours=options["hours"]))
+        self.stdout.write(self.style.SUCCESS(f"Removed {sessions} stale uploads and {files} unattached files"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from notices.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Recount the admin dashboard counters from the notice, distribution and department tables."
+
+    def handle(self, *args, **options):
+        for name, value in rebuild_counters().items():
+            self.stdout.write(f"{name}: {value}")
@@ -0,0 +1,144 @@
+from datetime import datetime, timezone as dt_timezone
+import json
+import math
+import random
+import statistics
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from notices.models import Department, Notice, NoticeDistribution, NoticeTracking, User
+from notices.tracking import TrackingBuffer
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the main API endpoints with Django's test client against the current database "
+        "(seed it with seed_benchmark_data) and report p50/p95 latency and query counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--user", help="Email of the admin to authenticate as (default: first admin).")
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument("--json", action="store_true", help="Print the JSON report instead of a table.")
+
+    def handle(self, *args, **options):
+        user = self.get_user(options["user"])
+        rng = random.Random(options["seed"])
+        notice_ids = list(Notice.objects.order_by("-id").values_list("id", flat=True)[:1000])
+        department_ids = list(Department.objects.values_list("id", flat=True)[:100])
+        if not notice_ids or not department_ids:
+            raise CommandError("No notices or departments found; run seed_benchmark_data first.")
+
+        client = APIClient()
+        client.force_authenticate(user)
+        endpoints = [
+            ("notice list", "get", lambda: "/api/notices/", None),
+            ("notice list (compact)", "get", lambda: "/api/notices/?compact=true", None),
+            ("notice list (department)", "get", lambda: f"/api/notices/?department_id={rng.choice(department_ids)}", None),
+            ("notice retrieve", "get", lambda: f"/api/notices/{rng.choice(notice_ids)}/", None),
+            ("notice tracking", "get", lambda: f"/api/notices/{rng.choice(notice_ids)}/tracking/", None),
+            (
+                "notice approve",
+                "post",
+                lambda: f"/api/notices/{rng.choice(notice_ids)}/approve/",
+                lambda: {"department_ids": rng.sample(department_ids, min(5, len(department_ids)))},
+            ),
+            ("admin dashboard", "get", lambda: "/api/admin/dashboard", None),
+            ("department dashboard", "get", lambda: f"/api/department/dashboard?department_id={rng.choice(department_ids)}", None),
+        ]
+
+        # A private tracking buffer, flushed inside each request's rolled-back transaction below, so
+        # the tracking rows a benchmark request produces never reach the dataset. Audit entries are
+        # written on commit, so the rollback discards them too.
+        buffers = [TrackingBuffer(interval=3600)]
+        results = []
+        with mock.patch("notices.views.tracker", buffers[0]):
+            for name, method, make_url, make_body in endpoints:
+                results.append(self.measure(client, name, method, make_url, make_body, options, buffers))
+
+        report = {
+            "timestamp": datetime.now(dt_timezone.utc).isoformat(),
+            "database": connection.vendor,
+            "iterations": options["iterations"],
+            "dataset": {
+                "departments": Department.objects.count(),
+                "users": User.objects.count(),
+                "notices": Notice.objects.count(),
+                "distributions": NoticeDistribution.objects.count(),
+                "tracking": NoticeTracking.objects.count(),
+            },
+            "results": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.print_table(report)
+
+    def measure(self, client, name, method, make_url, make_body, options, buffers):
+        timings, queries, db_times, statuses = [], [], [], set()
+        for iteration in range(options["warmup"] + options["iterations"]):
+            url = make_url()
+            body = make_body() if make_body else None
+            # Every request runs in a rolled-back transaction so approve leaves no trace.
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = getattr(client, method)(url, body, format="json") if body else getattr(client, method)(url)
+                    elapsed = (time.perf_counter() - started) * 1000
+                for buffer in buffers:
+                    buffer.flush()
+                transaction.set_rollback(True)
+            if iteration < options["warmup"]:
+                continue
+            statuses.add(response.status_code)
+            timings.append(elapsed)
+            queries.append(len(captured.captured_queries))
+            db_times.append(sum(float(q["time"]) for q in captured.captured_queries) * 1000)
+        return {
+            "endpoint": name,
+            "method": method.upper(),
+            "statuses": sorted(statuses),
+            "p50_ms": round(percentile(timings, 0.50), 2),
+            "p95_ms": round(percentile(timings, 0.95), 2),
+            "mean_ms": round(statistics.mean(timings), 2),
+            "queries_p50": percentile(queries, 0.50),
+            "queries_max": max(queries),
+            "db_ms_p50": round(percentile(db_times, 0.50), 2),
+        }
+
+    def get_user(self, email):
+        users = User.objects.filter(email=email) if email else User.objects.filter(role=User.Role.ADMIN).order_by("id")
+        user = users.first()
+        if user is None:
+            raise CommandError("No admin user to authenticate as; pass --user or run seed_benchmark_data.")
+        return user
+
+    def print_table(self, report):
+        self.stdout.write(f"Dataset: {report['dataset']} ({report['database']}, {report['iterations']} iterations)")
+        header = f"{'endpoint':<28}{'status':>10}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'db p50':>10}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in report["results"]:
+            statuses = ",".join(str(s) for s in row["statuses"])
+            self.stdout.write(
+                f"{row['endpoint']:<28}{statuses:>10}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+                f"{row['queries_p50']:>9}{row['db_ms_p50']:>10}"
+            )
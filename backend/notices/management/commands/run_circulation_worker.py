@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db import close_old_connections
+import time
+
+from notices.circulation import claim_next_job, process_job, retry_due_deliveries
+
+
+class Command(BaseCommand):
+    help = (
+        "Claim queued notice circulation jobs and send their email, SMS and push notifications; "
+        "between jobs, retry failed deliveries that are due."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process every queued job and due retry, then exit.")
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.CIRCULATION_POLL_INTERVAL,
+            help="Seconds to sleep when the queue is empty.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Circulation worker started.")
+        try:
+            while True:
+                close_old_connections()
+                job = claim_next_job()
+                if job is None:
+                    retried = retry_due_deliveries()
+                    if retried:
+                        self.stdout.write(f"Retried {retried} failed deliveries")
+                        continue
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+                self.stdout.write(f"Processing circulation job #{job.pk} for notice #{job.notice_id}")
+                job = process_job(job)
+                self.stdout.write(f"Circulation job #{job.pk} {job.status}")
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write("Circulation worker stopped.")
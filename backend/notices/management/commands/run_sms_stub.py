@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+import json
+import threading
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local Sparrow-style SMS gateway for testing. Point SMS_API_URL at "
+        "http://localhost:<port>/v2/sms/ with SMS_BACKEND=notices.sms.SparrowSMSBackend."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=8025)
+        parser.add_argument("--max-batch", type=int, default=100, help="Reject requests with more recipients than this.")
+        parser.add_argument("--rate", type=float, default=0, help="Answer 429 above this many messages per second (0 disables).")
+
+    def handle(self, *args, **options):
+        stdout = self.stdout
+        max_batch = options["max_batch"]
+        rate = options["rate"]
+        lock = threading.Lock()
+        window = {"start": time.monotonic(), "count": 0, "total": 0}
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, code, response, **extra):
+                body = json.dumps({"response_code": code, "response": response, **extra}).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                if code == 429:
+                    self.send_header("Retry-After", "1")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode())
+                numbers = [n for n in form.get("to", [""])[0].split(",") if n]
+                if not numbers or not form.get("text"):
+                    return self._reply(400, "Missing 'to' or 'text'")
+                if len(numbers) > max_batch:
+                    return self._reply(400, f"At most {max_batch} recipients per request")
+                with lock:
+                    now = time.monotonic()
+                    if now - window["start"] >= 1:
+                        window["start"], window["count"] = now, 0
+                    if rate and window["count"] + len(numbers) > rate:
+                        return self._reply(429, "Rate limit exceeded")
+                    window["count"] += len(numbers)
+                    window["total"] += len(numbers)
+                    total = window["total"]
+                stdout.write(f"SMS x{len(numbers)} (total {total}): {form['text'][0][:60]}")
+                self._reply(200, f"{len(numbers)} messages have been queued for delivery", count=len(numbers))
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("0.0.0.0", options["port"]), Handler)
+        self.stdout.write(f"SMS stub gateway listening on http://0.0.0.0:{options['port']}/v2/sms/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,212 @@
+from datetime import timedelta
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+from notices.counters import rebuild_counters
+from notices.models import Department, Notice, NoticeDistribution, NoticeTracking, User
+
+BENCH_DOMAIN = "bench.nea.local"
+BENCH_PASSWORD = "bench-password"
+BATCH_SIZE = 5000
+# Rows per backdating UPDATE (one CASE branch each)
+BACKDATE_CHUNK = 500
+
+DISTRICTS = {
+    "koshi": [
+        "Bhojpur", "Dhankuta", "Ilam", "Jhapa", "Khotang", "Morang", "Okhaldhunga", "Panchthar",
+        "Sankhuwasabha", "Solukhumbu", "Sunsari", "Taplejung", "Terhathum", "Udayapur",
+    ],
+    "madhesh": ["Bara", "Dhanusha", "Mahottari", "Parsa", "Rautahat", "Saptari", "Sarlahi", "Siraha"],
+    "bagmati": [
+        "Bhaktapur", "Chitwan", "Dhading", "Dolakha", "Kathmandu", "Kavrepalanchok", "Lalitpur",
+        "Makwanpur", "Nuwakot", "Ramechhap", "Rasuwa", "Sindhuli", "Sindhupalchok",
+    ],
+    "gandaki": [
+        "Baglung", "Gorkha", "Kaski", "Lamjung", "Manang", "Mustang", "Myagdi", "Nawalpur", "Parbat",
+        "Syangja", "Tanahun",
+    ],
+    "lumbini": [
+        "Arghakhanchi", "Banke", "Bardiya", "Dang", "Eastern Rukum", "Gulmi", "Kapilvastu", "Parasi",
+        "Palpa", "Pyuthan", "Rolpa", "Rupandehi",
+    ],
+    "karnali": ["Dailekh", "Dolpa", "Humla", "Jajarkot", "Jumla", "Kalikot", "Mugu", "Salyan", "Surkhet", "Western Rukum"],
+    "sudurpashchim": ["Achham", "Baitadi", "Bajhang", "Bajura", "Dadeldhura", "Darchula", "Doti", "Kailali", "Kanchanpur"],
+}
+DIVISIONS_PER_PROVINCE = 2
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a synthetic NEA-scale dataset (7 provinces, 77 districts, office hierarchy, users, "
+        "notices, distributions and tracking) for benchmarking. All rows use the "
+        f"{BENCH_DOMAIN} domain so --clear can remove them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20000)
+        parser.add_argument("--notices", type=int, default=100000)
+        parser.add_argument("--departments-per-notice", type=int, default=5, help="Average offices a notice is circulated to.")
+        parser.add_argument("--views-per-notice", type=int, default=5, help="Average tracking rows per notice.")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--clear", action="store_true", help="Delete existing benchmark data first.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        if options["clear"]:
+            self.clear()
+        elif User.objects.filter(email__endswith=f"@{BENCH_DOMAIN}").exists():
+            raise CommandError("Benchmark data already exists; rerun with --clear to replace it.")
+
+        with transaction.atomic():
+            departments = self.create_departments()
+            users = self.create_users(departments, options["users"], rng)
+        self.create_notices(departments, users, options, rng)
+        counters = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f"Benchmark data ready: {counters}"))
+
+    def clear(self):
+        bench_users = User.objects.filter(email__endswith=f"@{BENCH_DOMAIN}")
+        Notice.objects.filter(created_by__in=bench_users).delete()
+        bench_users.delete()
+        Department.objects.filter(email__endswith=f"@{BENCH_DOMAIN}").delete()
+        self.stdout.write("Cleared previous benchmark data.")
+
+    def _office(self, name, office_type, parent=None, province="", district=""):
+        office = Department(
+            name=name,
+            email=f"{name.lower().replace(' ', '-')}@{BENCH_DOMAIN}",
+            office_type=office_type,
+            parent_office=parent,
+            province=province,
+            district=district,
+        )
+        office.save()
+        return office
+
+    def create_departments(self):
+        # Saved one by one (about a hundred rows) so Department.save() maintains the paths.
+        directorate = self._office("Bench Distribution and Consumer Services Directorate", "directorate")
+        departments = [directorate]
+        for province, districts in DISTRICTS.items():
+            label = dict(Department.PROVINCE_CHOICES)[province]
+            province_office = self._office(f"Bench {label} Office", "province", directorate, province)
+            divisions = [
+                self._office(f"Bench {label} Division {n}", "province_division", province_office, province)
+                for n in range(1, DIVISIONS_PER_PROVINCE + 1)
+            ]
+            departments += [province_office, *divisions]
+            for index, district in enumerate(districts):
+                departments.append(
+                    self._office(
+                        f"Bench {district} Distribution Centre", "division", divisions[index % len(divisions)], province, district
+                    )
+                )
+        self.stdout.write(f"Created {len(departments)} offices")
+        return departments
+
+    def create_users(self, departments, count, rng):
+        password = make_password(BENCH_PASSWORD)
+        users = [
+            User(
+                email=f"admin@{BENCH_DOMAIN}",
+                name="Bench Admin",
+                role=User.Role.ADMIN,
+                department=departments[0],
+                password=password,
+                password_hash=password,
+            )
+        ]
+        for i in range(count):
+            users.append(
+                User(
+                    email=f"user{i}@{BENCH_DOMAIN}",
+                    name=f"Bench User {i}",
+                    phone=f"98{rng.randrange(10 ** 8):08d}",
+                    role=User.Role.DEPT_HEAD if i < len(departments) else User.Role.STAFF,
+                    department=departments[i % len(departments)],
+                    password=password,
+                    password_hash=password,
+                )
+            )
+        User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+        self.stdout.write(f"Created {len(users)} users")
+        return list(User.objects.filter(email__endswith=f"@{BENCH_DOMAIN}").order_by("id").values_list("id", "department_id"))
+
+    def create_notices(self, departments, users, options, rng):
+        authors = [user_id for user_id, _ in users[: len(departments) + 1]]
+        department_ids = [dept.pk for dept in departments]
+        users_by_department = {}
+        for user_id, department_id in users:
+            users_by_department.setdefault(department_id, []).append(user_id)
+        now = timezone.now()
+        priorities = ["low"] * 2 + ["normal"] * 5 + ["high"] * 2 + ["urgent"]
+        statuses = ["approved"] * 7 + ["pending"] + ["draft"] + ["archived"]
+        total = options["notices"]
+        created = 0
+        while created < total:
+            size = min(BATCH_SIZE, total - created)
+            notices, created_at = [], []
+            for i in range(created, created + size):
+                created_at.append(now - timedelta(minutes=(total - i) * 5))
+                notices.append(
+                    Notice(
+                        title=f"Bench notice {i}: {rng.choice(['Tariff', 'Outage', 'Maintenance', 'Circular', 'Meeting'])} update",
+                        content=f"Synthetic benchmark notice {i} about scheduled work and consumer services.",
+                        priority=rng.choice(priorities),
+                        status=rng.choice(statuses),
+                        created_by_id=rng.choice(authors),
+                        expiry_date=(now + timedelta(days=rng.randrange(-365, 365))).date() if rng.random() < 0.3 else None,
+                    )
+                )
+            with transaction.atomic():
+                # Postgres and SQLite both return the new primary keys from bulk_create.
+                ids = [notice.pk for notice in Notice.objects.bulk_create(notices)]
+                self.backdate(ids, created_at)
+                distributions = []
+                tracking = []
+                for notice_id in ids:
+                    targets = rng.sample(department_ids, min(len(department_ids), max(1, int(rng.expovariate(1 / options["departments_per_notice"])))))
+                    for department_id in targets:
+                        email_status = rng.choice(["sent"] * 9 + ["failed"])
+                        distributions.append(
+                            NoticeDistribution(
+                                notice_id=notice_id,
+                                department_id=department_id,
+                                sent_email=email_status == "sent",
+                                email_status=email_status,
+                                sms_status=rng.choice(["sent", "skipped"]),
+                                push_status=rng.choice(["sent", "skipped"]),
+                            )
+                        )
+                    readers = {
+                        rng.choice(users_by_department.get(rng.choice(targets)) or authors)
+                        for _ in range(rng.randrange(options["views_per_notice"] * 2 + 1))
+                    }
+                    for user_id in readers:
+                        downloaded = rng.random() < 0.2
+                        tracking.append(
+                            NoticeTracking(
+                                user_id=user_id,
+                                notice_id=notice_id,
+                                viewed_at=now,
+                                downloaded=downloaded,
+                                download_time=now if downloaded else None,
+                            )
+                        )
+                NoticeDistribution.objects.bulk_create(distributions, batch_size=BATCH_SIZE)
+                NoticeTracking.objects.bulk_create(tracking, batch_size=BATCH_SIZE, ignore_conflicts=True)
+            created += size
+            self.stdout.write(f"Created {created}/{total} notices")
+
+    def backdate(self, ids, created_at):
+        """Spread the new notices over the past; ``auto_now_add`` stamped them all with now()."""
+        for start in range(0, len(ids), BACKDATE_CHUNK):
+            chunk = list(zip(ids[start:start + BACKDATE_CHUNK], created_at[start:start + BACKDATE_CHUNK]))
+            Notice.objects.filter(id__in=[pk for pk, _ in chunk]).update(
+                created_at=Case(*(When(id=pk, then=Value(when)) for pk, when in chunk), output_field=DateTimeField())
+            )
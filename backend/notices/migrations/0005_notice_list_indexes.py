@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notices', '0004_devicetoken'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(fields=['-created_at', '-id'], name='notices_not_created_482a2b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='notices_not_status_4ea08e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(fields=['priority', '-created_at', '-id'], name='notices_not_priorit_c335e4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(fields=['expiry_date'], name='notices_not_expiry__2e115a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='noticedistribution',
+            index=models.Index(fields=['department', 'notice'], name='notices_not_departm_7164a3_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:50
+
+from django.db import migrations, models
+
+
+def build_paths(apps, schema_editor):
+    Department = apps.get_model("notices", "Department")
+    parents = dict(Department.objects.values_list("id", "parent_office_id"))
+    paths = {}
+
+    def path_for(pk, seen=()):
+        if pk not in paths:
+            parent = parents.get(pk)
+            # Treat a dangling or cyclic parent link as a root.
+            prefix = path_for(parent, seen + (pk,)) if parent in parents and parent not in seen else "/"
+            paths[pk] = f"{prefix}{pk}/"
+        return paths[pk]
+
+    for pk in parents:
+        Department.objects.filter(pk=pk).update(path=path_for(pk))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notices', '0006_dashboardcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='department',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+    ]
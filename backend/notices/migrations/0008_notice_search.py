@@ -0,0 +1,71 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE notices_notice ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX notices_notice_search_idx ON notices_notice USING GIN (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS notices_notice_search_idx",
+    "ALTER TABLE notices_notice DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE notices_notice_fts USING fts5(
+        title, content, content='notices_notice', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER notices_notice_fts_insert AFTER INSERT ON notices_notice BEGIN
+        INSERT INTO notices_notice_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER notices_notice_fts_delete AFTER DELETE ON notices_notice BEGIN
+        INSERT INTO notices_notice_fts(notices_notice_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER notices_notice_fts_update AFTER UPDATE OF title, content ON notices_notice BEGIN
+        INSERT INTO notices_notice_fts(notices_notice_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO notices_notice_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "INSERT INTO notices_notice_fts(notices_notice_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS notices_notice_fts_update",
+    "DROP TRIGGER IF EXISTS notices_notice_fts_delete",
+    "DROP TRIGGER IF EXISTS notices_notice_fts_insert",
+    "DROP TABLE IF EXISTS notices_notice_fts",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notices', '0007_department_path'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD}),
+            _run({"postgresql": POSTGRES_BACKWARD, "sqlite": SQLITE_BACKWARD}),
+        ),
+    ]
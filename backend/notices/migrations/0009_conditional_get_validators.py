@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notices', '0008_notice_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='department',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(fields=['updated_at'], name='notices_not_updated_0c99af_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notices', '0009_conditional_get_validators'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoticeTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notice_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='notice',
+            name='notices_not_updated_0c99af_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(fields=['updated_at', 'id'], name='notices_not_updated_8e6b2c_idx'),
+        ),
+    ]
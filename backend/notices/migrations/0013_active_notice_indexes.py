@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notices', '0012_activity_log_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notice',
+            name='notices_not_expiry__2e115a_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(condition=models.Q(('status', 'archived'), _negated=True), fields=['-created_at', '-id'], name='notices_notice_active_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(condition=models.Q(('status', 'archived'), _negated=True), fields=['expiry_date'], name='notices_notice_active_expiry'),
+        ),
+    ]
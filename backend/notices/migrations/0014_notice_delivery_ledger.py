@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notices', '0013_active_notice_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoticeDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(choices=[('email', 'Email'), ('sms', 'SMS'), ('push', 'Push')], max_length=5)),
+                ('recipient', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed, will retry'), ('dead', 'Dead letter')], default='pending', max_length=7)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.CharField(blank=True, max_length=255)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notice_deliveries', to='notices.department')),
+                ('notice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='notices.notice')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['notice', 'department', 'channel', 'status'], name='notices_not_notice__65490b_idx'), models.Index(condition=models.Q(('status__in', ['pending', 'failed'])), fields=['next_attempt_at'], name='notices_delivery_retry_due')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='noticedelivery',
+            constraint=models.UniqueConstraint(fields=('notice', 'channel', 'recipient'), name='notices_delivery_recipient'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:16
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def drop_duplicate_distributions(apps, schema_editor):
+    # Concurrent approvals could create two rows for one office; keep the oldest.
+    NoticeDistribution = apps.get_model("notices", "NoticeDistribution")
+    duplicates = (
+        NoticeDistribution.objects.values("notice_id", "department_id")
+        .annotate(rows=Count("id"), keep=Min("id"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates:
+        NoticeDistribution.objects.filter(notice_id=row["notice_id"], department_id=row["department_id"]).exclude(
+            id=row["keep"]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notices', '0014_notice_delivery_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_distributions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='noticedistribution',
+            constraint=models.UniqueConstraint(fields=('notice', 'department'), name='notices_distribution_office'),
+        ),
+    ]
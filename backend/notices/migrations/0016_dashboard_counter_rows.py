@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def create_counter_rows(apps, schema_editor):
+    # bump() only ever UPDATEs, so every counter row has to exist up front.
+    DashboardCounter = apps.get_model("notices", "DashboardCounter")
+    Department = apps.get_model("notices", "Department")
+    Notice = apps.get_model("notices", "Notice")
+    NoticeDistribution = apps.get_model("notices", "NoticeDistribution")
+    values = {
+        "total_notices": Notice.objects.count(),
+        "delivered_reports": NoticeDistribution.objects.filter(sent_email=True).count(),
+        "failed_deliveries": NoticeDistribution.objects.filter(email_status="failed").count(),
+        "urgent_notices": Notice.objects.filter(priority="urgent").count(),
+        "active_departments": Department.objects.count(),
+    }
+    for name, value in values.items():
+        DashboardCounter.objects.update_or_create(name=name, defaults={"value": value})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notices', '0015_unique_notice_distribution'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_counter_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notices', '0017_user_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='noticedelivery',
+            name='recipient',
+            field=models.CharField(max_length=512),
+        ),
+    ]
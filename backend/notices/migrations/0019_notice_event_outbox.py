@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:58
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notices', '0018_notice_delivery_recipient_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoticeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(max_length=32)),
+                ('data', models.JSONField()),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
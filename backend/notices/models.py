@@ -1,4 +1,7 @@
+import uuid
 from django.db import models
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Substr
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils import timezone
 
@@ -41,9 +44,30 @@ class Department(models.Model):
     # Legacy field
     head = models.ForeignKey("User", related_name="headed_departments", on_delete=models.SET_NULL, null=True, blank=True)
 
+    # Materialized path of ids from the root, e.g. "/1/4/17/"; maintained by save()
+    path = models.CharField(max_length=255, db_index=True, editable=False, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self) -> str:  # pragma: no cover - trivial
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Read the stored path: this instance may predate a move of one of its ancestors.
+        old_path = Department.objects.filter(pk=self.pk).values_list("path", flat=True).first() if self.pk else ""
+        super().save(*args, **kwargs)
+        parent_path = Department.objects.get(pk=self.parent_office_id).path if self.parent_office_id else "/"
+        new_path = f"{parent_path}{self.pk}/"
+        if new_path == old_path:
+            return
+        if self.pk and old_path:
+            # Move the whole subtree by swapping the path prefix in one UPDATE.
+            Department.objects.filter(path__startswith=old_path).update(
+                path=Concat(Value(new_path), Substr("path", len(old_path) + 1)), updated_at=timezone.now()
+            )
+        else:
+            Department.objects.filter(pk=self.pk).update(path=new_path)
+        self.path = new_path
+
 
 class UserManager(BaseUserManager):
     def _create_user(self, email, password, **extra_fields):
@@ -88,6 +112,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     password_hash = models.CharField(max_length=128)
     date_joined = models.DateTimeField(default=timezone.now)
+    # Part of the validators of every notice list and detail that nests this user
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = UserManager()
 
@@ -102,6 +128,33 @@ class User(AbstractBaseUser, PermissionsMixin):
         self.password_hash = self.password
 
 
+class DeviceToken(models.Model):
+    PLATFORM_CHOICES = (
+        ("web", "Web"),
+        ("android", "Android"),
+        ("ios", "iOS"),
+    )
+
+    user = models.ForeignKey(User, related_name="device_tokens", on_delete=models.CASCADE)
+    token = models.CharField(max_length=512, unique=True)
+    platform = models.CharField(max_length=20, choices=PLATFORM_CHOICES, default="web")
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_seen_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):  # pragma: no cover - trivial
+        return f"{self.user} ({self.platform})"
+
+
+# Notices that default read paths scan; archived ones are history.
+ACTIVE_NOTICE = ~Q(status="archived")
+
+
+class NoticeQuerySet(models.QuerySet):
+    def active(self):
+        # Same condition as the partial indexes below, so the planner can use them.
+        return self.filter(ACTIVE_NOTICE)
+
+
 class Notice(models.Model):
     PRIORITY_CHOICES = (
         ("low", "Low"),
@@ -128,6 +181,23 @@ class Notice(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = NoticeQuerySet.as_manager()
+
+    class Meta:
+        # Keyset pagination walks (created_at, id) newest first, optionally within a filter.
+        indexes = [
+            models.Index(fields=["-created_at", "-id"]),
+            models.Index(fields=["status", "-created_at", "-id"]),
+            models.Index(fields=["priority", "-created_at", "-id"]),
+            # max(updated_at) backs the list's ETag, and
+            # (updated_at, id) is the cursor of the /notices/changes delta feed.
+            models.Index(fields=["updated_at", "id"]),
+            # Partial indexes over active notices only (PostgreSQL and SQLite; other
+            # databases skip them). They stay small however much history is archived.
+            models.Index(fields=["-created_at", "-id"], condition=ACTIVE_NOTICE, name="notices_notice_active_recent"),
+            models.Index(fields=["expiry_date"], condition=ACTIVE_NOTICE, name="notices_notice_active_expiry"),
+        ]
+
     def __str__(self):  # pragma: no cover - trivial
         return self.title
 
@@ -143,6 +213,91 @@ class NoticeDistribution(models.Model):
     sms_status = models.CharField(max_length=50, default="pending")
     push_status = models.CharField(max_length=50, default="pending")
 
+    class Meta:
+        indexes = [models.Index(fields=["department", "notice"])]
+        constraints = [
+            # The per-office dedupe key of a circulation; channel state is in the status columns.
+            models.UniqueConstraint(fields=["notice", "department"], name="notices_distribution_office"),
+        ]
+
+
+class NoticeDelivery(models.Model):
+    """One recipient on one channel of a circulated notice: the delivery ledger.
+
+    ``NoticeDistribution`` statuses are aggregated from these rows
+    (notices/deliveries.py). Failed rows are retried with backoff until
+    ``DELIVERY_MAX_ATTEMPTS``, then left as ``dead`` for an operator.
+    """
+
+    CHANNEL_CHOICES = (("email", "Email"), ("sms", "SMS"), ("push", "Push"))
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("sent", "Sent"),
+        ("failed", "Failed, will retry"),
+        ("dead", "Dead letter"),
+    )
+
+    notice = models.ForeignKey(Notice, related_name="deliveries", on_delete=models.CASCADE)
+    department = models.ForeignKey(Department, related_name="notice_deliveries", on_delete=models.CASCADE)
+    channel = models.CharField(max_length=5, choices=CHANNEL_CHOICES)
+    # Email address, phone number or device token (as long as DeviceToken.token)
+    recipient = models.CharField(max_length=512)
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.CharField(max_length=255, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # resolve_recipients already reaches each address once per circulation.
+            models.UniqueConstraint(fields=["notice", "channel", "recipient"], name="notices_delivery_recipient"),
+        ]
+        indexes = [
+            # Per-department aggregation into NoticeDistribution
+            models.Index(fields=["notice", "department", "channel", "status"]),
+            # The retry scheduler's scan for due failures
+            models.Index(fields=["next_attempt_at"], condition=Q(status__in=["pending", "failed"]), name="notices_delivery_retry_due"),
+        ]
+
+    def __str__(self):  # pragma: no cover - trivial
+        return f"{self.channel} {self.recipient} ({self.status})"
+
+
+class DashboardCounter(models.Model):
+    """Running totals behind the admin dashboard, kept current by notices.counters."""
+
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):  # pragma: no cover - trivial
+        return f"{self.name}={self.value}"
+
+
+class CirculationJob(models.Model):
+    STATUS_CHOICES = (
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    )
+
+    notice = models.ForeignKey(Notice, related_name="circulation_jobs", on_delete=models.CASCADE)
+    requested_by = models.ForeignKey(User, related_name="circulation_jobs", on_delete=models.SET_NULL, null=True, blank=True)
+    department_ids = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):  # pragma: no cover - trivial
+        return f"Circulation #{self.pk} ({self.status}) for {self.notice}"
+
 
 class NoticeTracking(models.Model):
     user = models.ForeignKey(User, related_name="notice_tracking", on_delete=models.CASCADE)
@@ -155,11 +310,103 @@ class NoticeTracking(models.Model):
         unique_together = ("user", "notice")
 
 
+class Attachment(models.Model):
+    """A stored file, addressed by the SHA-256 of its content.
+
+    Notices link to it through ``NoticeAttachment``, so a circular attached
+    to many notices is kept on disk once.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField()
+    content_type = models.CharField(max_length=100, blank=True)
+    file = models.FileField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):  # pragma: no cover - trivial
+        return self.sha256
+
+
+class NoticeAttachment(models.Model):
+    notice = models.ForeignKey(Notice, related_name="attachments", on_delete=models.CASCADE)
+    attachment = models.ForeignKey(Attachment, related_name="notice_links", on_delete=models.PROTECT)
+    filename = models.CharField(max_length=255)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("notice", "attachment")
+
+    def __str__(self):  # pragma: no cover - trivial
+        return f"{self.notice_id}: {self.filename}"
+
+
+class UploadSession(models.Model):
+    """A resumable upload: chunks are appended to a temporary file until ``received == size``."""
+
+    STATUS_CHOICES = (
+        ("open", "Open"),
+        ("complete", "Complete"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, related_name="upload_sessions", on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    # Optional client-computed hash; a match with a stored file completes the upload at once.
+    sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="open")
+    attachment = models.ForeignKey(Attachment, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "updated_at"])]
+
+    def __str__(self):  # pragma: no cover - trivial
+        return f"{self.filename} ({self.received}/{self.size})"
+
+
+class NoticeTombstone(models.Model):
+    """Records a hard-deleted notice so delta-sync clients can drop it."""
+
+    notice_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):  # pragma: no cover - trivial
+        return f"notice {self.notice_id} deleted at {self.deleted_at}"
+
+
+class NoticeEvent(models.Model):
+    """Outbox of notice events for /api/events (notices/events.py).
+
+    Written in the same transaction as the change it announces, from whichever
+    process made it; every web process relays new rows to its own streams.
+    """
+
+    event_type = models.CharField(max_length=32)
+    data = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):  # pragma: no cover - trivial
+        return f"{self.event_type} #{self.pk}"
+
+
 class ActivityLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     action = models.CharField(max_length=255)
     notice = models.ForeignKey(Notice, null=True, blank=True, on_delete=models.SET_NULL)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the entry is logged, not when its transaction commits (notices/activity.py).
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["notice", "created_at"]),
+            models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["created_at"]),
+        ]
 
     def __str__(self):  # pragma: no cover - trivial
         return f"{self.created_at}: {self.user} - {self.action}"
@@ -1,61 +1,223 @@
 import logging
+import smtplib
 import requests
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from .sms import get_sms_backend
 
 logger = logging.getLogger(__name__)
 
+FCM_SEND_URL = "https://fcm.googleapis.com/fcm/send"
+FCM_MULTICAST_LIMIT = 500
+# Errors meaning the registration token will never work again and should be dropped
+FCM_STALE_TOKEN_ERRORS = {"NotRegistered", "InvalidRegistration"}
+
+
+def smtp_transient(exc):
+    """True for SMTP errors worth retrying: a 4xx reply or a lost connection."""
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    return isinstance(exc, (smtplib.SMTPServerDisconnected, OSError))
+
+
+class BulkEmailSender:
+    """Send one message per recipient over a shared SMTP connection.
+
+    The connection is reopened every ``chunk_size`` messages (most relays cap
+    messages per session) and after a dropped connection or 4xx reply,
+    retrying the affected message up to ``max_retries`` times. A permanent
+    (5xx) reply fails the message at once. A refused address is ``refused``
+    for a 5xx reply and ``failed`` for a 4xx one, so only the former is
+    dead-lettered. If the server cannot be reached at all, the sender gives
+    up: that recipient and every later one, in this and any further
+    ``send``, is ``failed`` straight away for the ledger to retry, and
+    ``unreachable`` holds the error.
+    """
+
+    def __init__(self, chunk_size=None, max_retries=None):
+        self.chunk_size = chunk_size or settings.EMAIL_BULK_CHUNK_SIZE
+        self.max_retries = settings.EMAIL_BULK_MAX_RETRIES if max_retries is None else max_retries
+        self.connection = None
+        self.unreachable = None
+        self._sent_on_connection = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
-def send_email_notice(subject: str, html_body: str, recipients: list):
+    def open(self):
+        if self.connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            self.connection, self._sent_on_connection = connection, 0
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:  # pragma: no cover - connection already gone
+                pass
+            self.connection = None
+
+    def _deliver(self, message):
+        if self._sent_on_connection >= self.chunk_size:
+            self.close()
+        message.connection = self.open()
+        message.send()
+        self._sent_on_connection += 1
+
+    def send(self, subject, html_body, recipients):
+        recipients = list(dict.fromkeys(r.strip() for r in recipients if r and r.strip()))
+        outcome = {}
+        for recipient in recipients:
+            if self.unreachable is not None:
+                break
+            message = EmailMultiAlternatives(
+                subject=subject,
+                body=html_body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[recipient],
+            )
+            message.attach_alternative(html_body, "text/html")
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self._deliver(message)
+                    outcome[recipient] = "sent"
+                    break
+                except smtplib.SMTPRecipientsRefused as exc:
+                    # The address was rejected; the session itself is still usable. A
+                    # 4xx (mailbox busy, greylisted) is left for the ledger's backoff,
+                    # only a 5xx means the address will never accept mail.
+                    code = exc.recipients.get(recipient, (550,))[0]
+                    outcome[recipient] = "failed" if 400 <= code < 500 else "refused"
+                    logger.warning("Email to %s refused: %s", recipient, exc)
+                    break
+                except (smtplib.SMTPException, OSError) as exc:
+                    outcome[recipient] = "failed"
+                    if self.connection is None:
+                        # Opening the connection failed; retrying per message only repeats the timeout.
+                        logger.error("SMTP server unreachable, leaving the remaining emails for retry: %s", exc)
+                        self.unreachable = exc
+                        break
+                    logger.warning("Email to %s failed (attempt %s): %s", recipient, attempt + 1, exc)
+                    if not smtp_transient(exc):
+                        break
+                    self.close()
+        for recipient in recipients:
+            outcome.setdefault(recipient, "failed")
+        return outcome
+
+
+def send_email_notice(subject: str, html_body: str, recipients: list, sender=None):
+    recipients = list(dict.fromkeys(r.strip() for r in recipients if r and r.strip()))
     if not recipients:
         return {"status": "skipped", "reason": "no recipients"}
     try:
-        msg = EmailMultiAlternatives(
-            subject=subject,
-            body=html_body,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=recipients,
-        )
-        msg.attach_alternative(html_body, "text/html")
-        msg.send()
-        logger.info("Email sent to %s", recipients)
-        return {"status": "sent"}
+        if sender is None:
+            with BulkEmailSender() as sender:
+                outcome = sender.send(subject, html_body, recipients)
+        else:
+            outcome = sender.send(subject, html_body, recipients)
     except Exception as exc:  # pragma: no cover - network dependent
         logger.error("Email send failed: %s", exc)
         return {"status": "failed", "reason": str(exc)}
+    failed = [recipient for recipient, result in outcome.items() if result != "sent"]
+    sent = len(outcome) - len(failed)
+    logger.info("Email sent to %s of %s recipients", sent, len(outcome))
+    if not failed:
+        status = "sent"
+    elif sent:
+        status = "partial"
+    else:
+        status = "failed"
+    result = {"status": status, "sent": sent, "failed": failed, "recipients": outcome}
+    if sender.unreachable is not None:
+        result["reason"] = f"SMTP server unreachable: {sender.unreachable}"
+    return result
 
 
 def send_sms_notice(message: str, phone_numbers: list):
-    # Mock Sparrow SMS / NTC integration
+    phone_numbers = list(dict.fromkeys(phone.strip() for phone in phone_numbers if phone and phone.strip()))
     if not phone_numbers:
         return {"status": "skipped", "reason": "no numbers"}
     try:
-        for phone in phone_numbers:
-            logger.info("SMS queued to %s: %s", phone, message)
-        return {"status": "sent"}
+        outcome = get_sms_backend().send(message, phone_numbers)
     except Exception as exc:  # pragma: no cover
         logger.error("SMS send failed: %s", exc)
         return {"status": "failed", "reason": str(exc)}
+    sent = len(outcome["sent"])
+    logger.info("SMS sent to %s of %s numbers", sent, len(phone_numbers))
+    if not outcome["failed"]:
+        status = "sent"
+    elif sent:
+        status = "partial"
+    else:
+        status = "failed"
+    result = {"status": status, "sent": sent, "failed": outcome["failed"]}
+    if outcome["errors"]:
+        result["reason"] = outcome["errors"][0]
+    return result
 
 
 def send_push_notice(title: str, body: str, tokens: list):
     if not settings.FCM_SERVER_KEY:
         return {"status": "skipped", "reason": "missing FCM_SERVER_KEY"}
+    tokens = list(dict.fromkeys(token for token in tokens if token))
     if not tokens:
         return {"status": "skipped", "reason": "no tokens"}
     headers = {
         "Authorization": f"key={settings.FCM_SERVER_KEY}",
         "Content-Type": "application/json",
     }
-    payload = {
-        "registration_ids": tokens,
-        "notification": {"title": title, "body": body},
+    sent = 0
+    failed_tokens = []
+    invalid_tokens = []
+    errors = []
+    for start in range(0, len(tokens), FCM_MULTICAST_LIMIT):
+        chunk = tokens[start:start + FCM_MULTICAST_LIMIT]
+        payload = {
+            "registration_ids": chunk,
+            "notification": {"title": title, "body": body},
+        }
+        try:
+            resp = requests.post(FCM_SEND_URL, json=payload, headers=headers, timeout=10)
+            resp.raise_for_status()
+            results = resp.json().get("results")
+            # FCM returns one result per registration id, in request order; anything
+            # else leaves the chunk's outcome unknown, so it is retried as a whole.
+            if not isinstance(results, list) or len(results) != len(chunk):
+                raise ValueError(f"FCM returned {len(results or [])} results for {len(chunk)} tokens")
+        except Exception as exc:  # pragma: no cover
+            logger.error("Push send failed: %s", exc)
+            failed_tokens.extend(chunk)
+            errors.append(str(exc))
+            continue
+        for token, result in zip(chunk, results):
+            error = result.get("error")
+            if not error:
+                sent += 1
+                continue
+            failed_tokens.append(token)
+            if error in FCM_STALE_TOKEN_ERRORS:
+                invalid_tokens.append(token)
+    logger.info("Push sent to %s of %s tokens (%s stale)", sent, len(tokens), len(invalid_tokens))
+    if not failed_tokens:
+        status = "sent"
+    elif sent:
+        status = "partial"
+    else:
+        status = "failed"
+    result = {
+        "status": status,
+        "sent": sent,
+        "failed": len(failed_tokens),
+        "failed_tokens": failed_tokens,
+        "invalid_tokens": invalid_tokens,
     }
-    try:
-        resp = requests.post("https://fcm.googleapis.com/fcm/send", json=payload, headers=headers, timeout=10)
-        resp.raise_for_status()
-        logger.info("Push sent, status %s", resp.status_code)
-        return {"status": "sent", "response": resp.json()}
-    except Exception as exc:  # pragma: no cover
-        logger.error("Push send failed: %s", exc)
-        return {"status": "failed", "reason": str(exc)}
+    if errors:
+        result["reason"] = errors[0]
+    return result
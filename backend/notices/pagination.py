@@ -0,0 +1,213 @@
+import base64
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .models import NoticeTombstone
+
+# Start of the change feed for a first sync
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class KeysetPagination(BasePagination):
+    """Newest-first keyset pagination on ``(created_at, id)``.
+
+    The cursor encodes the last row of the previous page, so every page is a
+    single index range scan no matter how deep the client pages.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    page_size = 50
+    max_page_size = 200
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, obj):
+        return encode_position(obj.created_at, obj.pk)
+
+    def decode_cursor(self, request):
+        return decode_position(request.query_params.get(self.cursor_query_param), self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        queryset = queryset.order_by("-created_at", "-id")
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        page = list(queryset[: page_size + 1])
+        self.has_next = len(page) > page_size
+        page = page[:page_size]
+        self.next_cursor = self.encode_cursor(page[-1]) if self.has_next else None
+        return page
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("next_cursor", self.next_cursor),
+                    ("results", data),
+                ]
+            )
+        )
+
+
+class ChangeFeedPagination(KeysetPagination):
+    """Oldest-first delta feed on ``(updated_at, id)`` for offline clients.
+
+    ``since`` is the ``next_cursor`` of the previous call. Rows updated in the
+    last ``SYNC_SETTLE_SECONDS`` are held back until the next call, so a
+    transaction that commits slightly out of timestamp order is not skipped.
+    Hard deletes come back as ids from ``NoticeTombstone`` on ``(deleted_at,
+    id)``, paged under the same ``limit``: the cursor keeps a position in
+    each stream and a page takes the oldest ``limit`` entries of both. A first
+    sync (no ``since``) gets no deletions, as the client holds nothing yet.
+    Tombstones are pruned after ``SYNC_TOMBSTONE_RETENTION_DAYS``, so an
+    older cursor gets ``410 Gone`` and the client must sync from scratch.
+    """
+
+    cursor_query_param = "since"
+    page_size = 200
+    max_page_size = 1000
+
+    def decode_cursor(self, request):
+        return decode_feed_position(request.query_params.get(self.cursor_query_param), self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        now = timezone.now()
+        horizon = now - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+        if position is None:
+            position = (EPOCH, 0, horizon, 0)
+        elif position[2] < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+            raise CursorExpired()
+        updated_at, pk, deleted_at, tombstone_pk = position
+        changes = list(
+            queryset.filter(updated_at__lte=horizon)
+            .filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk))
+            .order_by("updated_at", "id")[: page_size + 1]
+        )
+        tombstones = list(
+            NoticeTombstone.objects.filter(deleted_at__lte=horizon)
+            .filter(Q(deleted_at__gt=deleted_at) | Q(deleted_at=deleted_at, id__gt=tombstone_pk))
+            .order_by("deleted_at", "id")[: page_size + 1]
+        )
+        # The oldest ``page_size`` entries of both streams, by time.
+        entries = sorted(
+            [(row.updated_at, 0, row) for row in changes] + [(row.deleted_at, 1, row) for row in tombstones],
+            key=lambda entry: entry[:2],
+        )[:page_size]
+        page = [row for _, kind, row in entries if kind == 0]
+        deleted = [row for _, kind, row in entries if kind == 1]
+        changes_done = len(page) == len(changes)
+        tombstones_done = len(deleted) == len(tombstones)
+        self.has_next = not (changes_done and tombstones_done)
+        self.deleted = [row.notice_id for row in deleted]
+        updated_at, pk = _advance(
+            (page[-1].updated_at, page[-1].pk) if page else (updated_at, pk), changes_done, horizon
+        )
+        deleted_at, tombstone_pk = _advance(
+            (deleted[-1].deleted_at, deleted[-1].pk) if deleted else (deleted_at, tombstone_pk), tombstones_done, horizon
+        )
+        self.next_cursor = encode_feed_position(updated_at, pk, deleted_at, tombstone_pk)
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("changes", data),
+                    ("deleted", self.deleted),
+                    ("next_cursor", self.next_cursor),
+                    ("has_more", self.has_next),
+                ]
+            )
+        )
+
+
+class CursorExpired(APIException):
+    status_code = 410
+    default_detail = "This sync cursor is older than the deletion history; sync again without since."
+    default_code = "cursor_expired"
+
+
+def _advance(position, exhausted, horizon):
+    # A stream with nothing left jumps to the settle horizon, so the next call only scans newer rows.
+    timestamp, pk = position
+    if not exhausted or timestamp >= horizon:
+        return timestamp, pk
+    return horizon, 0
+
+
+def encode_feed_position(updated_at, pk, deleted_at, tombstone_pk):
+    raw = f"{updated_at.isoformat()}|{pk}|{deleted_at.isoformat()}|{tombstone_pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_feed_position(encoded, message):
+    """``(updated_at, id, deleted_at, tombstone id)`` from a change feed cursor, or None.
+
+    Anything but a cursor this feed issued is a ``400``.
+    """
+    if not encoded:
+        return None
+    try:
+        updated_at, pk, deleted_at, tombstone_pk = base64.urlsafe_b64decode(encoded.encode()).decode().split("|")
+        updated_at, deleted_at = parse_datetime(updated_at), parse_datetime(deleted_at)
+        pk, tombstone_pk = int(pk), int(tombstone_pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValidationError({"since": [message]})
+    if updated_at is None or deleted_at is None:
+        raise ValidationError({"since": [message]})
+    return updated_at, pk, deleted_at, tombstone_pk
+
+
+def encode_position(timestamp, pk):
+    raw = f"{timestamp.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_position(encoded, message):
+    if not encoded:
+        return None
+    try:
+        timestamp, pk = base64.urlsafe_b64decode(encoded.encode()).decode().split("|")
+        timestamp = parse_datetime(timestamp)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise NotFound(message)
+    if timestamp is None:
+        raise NotFound(message)
+    return timestamp, pk
+
+
+class SearchPagination(PageNumberPagination):
+    """Relevance-ordered search results are paged by number; they are rarely read deeply."""
+
+    page_size = 20
+    page_size_query_param = "limit"
+    max_page_size = 100
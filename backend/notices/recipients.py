@@ -0,0 +1,31 @@
+from .models import User
+
+RECIPIENT_CHANNELS = ("email", "sms", "push")
+
+
+def resolve_recipients(department_ids):
+    """Resolve every contact channel for the active users of ``department_ids`` in one query.
+
+    Returns ``{department_id: {"email": [...], "sms": [...], "push": [...]}}``.
+    Blank values are dropped and each address, number and device token is
+    listed once across the whole circulation, under the first department
+    (lowest id) that reaches it, so shared mailboxes or phones are not
+    notified once per office.
+    """
+    department_ids = sorted({int(pk) for pk in department_ids})
+    recipients = {pk: {channel: [] for channel in RECIPIENT_CHANNELS} for pk in department_ids}
+    seen = {channel: set() for channel in RECIPIENT_CHANNELS}
+    rows = (
+        User.objects.filter(department_id__in=department_ids, is_active=True)
+        .order_by("department_id", "id")
+        .values_list("department_id", "email", "phone", "device_tokens__token")
+    )
+    for department_id, email, phone, token in rows:
+        email = (email or "").strip()
+        phone = (phone or "").strip()
+        # (channel, value to send, key to de-duplicate on)
+        for channel, value, key in (("email", email, email.lower()), ("sms", phone, phone), ("push", token, token)):
+            if value and key not in seen[channel]:
+                seen[channel].add(key)
+                recipients[department_id][channel].append(value)
+    return recipients
@@ -0,0 +1,81 @@
+from django.db.models import Count, Exists, OuterRef, Q
+from rest_framework import serializers
+
+from .models import NoticeDistribution, NoticeTracking
+
+DELIVERY_CHANNELS = ("email", "sms", "push")
+DELIVERY_STATUSES = ("pending", "sent", "partial", "failed", "skipped")
+
+
+def delivery_report(notices):
+    """Aggregate view, download and per-channel delivery counts for a page of notices.
+
+    Runs three grouped queries whatever the page size: tracking counts,
+    distribution status counts and the number of users the notice reached.
+    ``unviewed`` only subtracts viewers who belong to a targeted office.
+    """
+    ids = [notice.pk for notice in notices]
+    tracking = {
+        row["notice_id"]: row
+        for row in NoticeTracking.objects.filter(notice_id__in=ids)
+        .values("notice_id")
+        .annotate(
+            viewed=Count("id", filter=Q(viewed_at__isnull=False)),
+            downloaded=Count("id", filter=Q(downloaded=True)),
+            viewed_recipients=Count(
+                "id",
+                filter=Q(viewed_at__isnull=False)
+                & Q(
+                    Exists(
+                        NoticeDistribution.objects.filter(
+                            notice_id=OuterRef("notice_id"), department_id=OuterRef("user__department_id")
+                        )
+                    )
+                ),
+            ),
+        )
+    }
+    status_counts = {
+        f"{channel}__{value}": Count("id", filter=Q(**{f"{channel}_status": value}))
+        for channel in DELIVERY_CHANNELS
+        for value in DELIVERY_STATUSES
+    }
+    distributions = {
+        row["notice_id"]: row
+        for row in NoticeDistribution.objects.filter(notice_id__in=ids)
+        .values("notice_id")
+        .annotate(departments=Count("id"), **status_counts)
+    }
+    recipients = dict(
+        NoticeDistribution.objects.filter(notice_id__in=ids)
+        .values("notice_id")
+        .annotate(recipients=Count("department__user"))
+        .values_list("notice_id", "recipients")
+    )
+
+    as_datetime = serializers.DateTimeField().to_representation
+    rows = []
+    for notice in notices:
+        views = tracking.get(notice.pk, {})
+        dist = distributions.get(notice.pk, {})
+        viewed = views.get("viewed", 0)
+        reached = recipients.get(notice.pk, 0)
+        rows.append(
+            {
+                "id": notice.pk,
+                "title": notice.title,
+                "priority": notice.priority,
+                "status": notice.status,
+                "created_at": as_datetime(notice.created_at),
+                "departments": dist.get("departments", 0),
+                "recipients": reached,
+                "viewed": viewed,
+                "unviewed": max(reached - views.get("viewed_recipients", 0), 0),
+                "downloaded": views.get("downloaded", 0),
+                "channels": {
+                    channel: {value: dist.get(f"{channel}__{value}", 0) for value in DELIVERY_STATUSES}
+                    for channel in DELIVERY_CHANNELS
+                },
+            }
+        )
+    return rows
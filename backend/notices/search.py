@@ -0,0 +1,50 @@
+import re
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Postgres: a stored, GIN-indexed tsvector column maintained by the database.
+# SQLite: an external-content FTS5 table kept in sync by triggers.
+# Both are created by migration 0008_notice_search.
+PG_CONFIG = "english"
+FTS_TABLE = "notices_notice_fts"
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts5_query(text):
+    # Quote every term so user input can never be read as FTS5 syntax.
+    return " ".join(f'"{term}"' for term in _TERM.findall(text))
+
+
+def search_notices(queryset, text):
+    """Restrict ``queryset`` to notices matching ``text`` and order them by relevance."""
+    text = (text or "").strip()
+    if not _TERM.search(text):
+        return queryset.none()
+    if connection.vendor == "postgresql":
+        query = f"websearch_to_tsquery('{PG_CONFIG}', %s)"
+        queryset = queryset.alias(
+            matched=RawSQL(f"notices_notice.search_vector @@ {query}", [text], output_field=BooleanField())
+        ).filter(matched=True).annotate(
+            rank=RawSQL(f"ts_rank(notices_notice.search_vector, {query})", [text], output_field=FloatField())
+        )
+    elif connection.vendor == "sqlite":
+        match = _fts5_query(text)
+        queryset = queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).annotate(
+            # bm25() is lower-is-better; title hits weigh ten times content hits.
+            rank=RawSQL(
+                f"(SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = notices_notice.id)",
+                [match],
+                output_field=FloatField(),
+            )
+        )
+    else:
+        terms = _TERM.findall(text)
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(content__icontains=term)
+        queryset = queryset.filter(condition).annotate(rank=Value(0.0, output_field=FloatField()))
+    return queryset.order_by("-rank", "-created_at", "-id")
@@ -1,7 +1,21 @@
+from django.conf import settings
 from django.contrib.auth import authenticate
 from rest_framework import serializers
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import User, Department, Notice, NoticeDistribution, NoticeTracking, ActivityLog
+from .downloads import download_url
+from .hierarchy import is_in_subtree
+from .models import (
+    User,
+    Department,
+    Notice,
+    NoticeAttachment,
+    NoticeDistribution,
+    NoticeTracking,
+    ActivityLog,
+    CirculationJob,
+    DeviceToken,
+    UploadSession,
+)
 
 
 class DepartmentSerializer(serializers.ModelSerializer):
@@ -25,7 +39,14 @@ class DepartmentSerializer(serializers.ModelSerializer):
             "address",
             "photo",
             "head",
+            "path",
         ]
+        read_only_fields = ["path"]
+
+    def validate_parent_office(self, value):
+        if value and self.instance and is_in_subtree(value, self.instance):
+            raise serializers.ValidationError("An office cannot be placed under itself or one of its sub-offices.")
+        return value
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -114,6 +135,37 @@ class NoticeSerializer(serializers.ModelSerializer):
         ]
 
 
+class UserSummarySerializer(serializers.ModelSerializer):
+    department_name = serializers.CharField(source="department.name", read_only=True, default=None)
+
+    class Meta:
+        model = User
+        fields = ["id", "name", "department_name"]
+
+
+class NoticeListSerializer(serializers.ModelSerializer):
+    """Compact notice row for list pages; authors are summarised, not nested in full."""
+
+    created_by = UserSummarySerializer(read_only=True)
+    approved_by = UserSummarySerializer(read_only=True)
+
+    class Meta:
+        model = Notice
+        fields = [
+            "id",
+            "title",
+            "content",
+            "priority",
+            "file_url",
+            "created_by",
+            "approved_by",
+            "expiry_date",
+            "status",
+            "created_at",
+            "updated_at",
+        ]
+
+
 class NoticeDistributionSerializer(serializers.ModelSerializer):
     department = DepartmentSerializer(read_only=True)
 
@@ -132,6 +184,61 @@ class NoticeDistributionSerializer(serializers.ModelSerializer):
         ]
 
 
+class DeviceTokenSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DeviceToken
+        fields = ["id", "token", "platform", "created_at", "last_seen_at"]
+
+
+class CirculationJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CirculationJob
+        fields = [
+            "id",
+            "notice",
+            "requested_by",
+            "department_ids",
+            "status",
+            "attempts",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    sha256 = serializers.RegexField(r"^[0-9a-fA-F]{64}$", required=False, allow_blank=True)
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ["id", "filename", "content_type", "size", "sha256", "received", "status", "attachment", "chunk_size"]
+        read_only_fields = ["received", "status", "attachment"]
+
+    def get_chunk_size(self, obj):
+        return settings.ATTACHMENT_CHUNK_SIZE
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.ATTACHMENT_MAX_SIZE:
+            raise serializers.ValidationError(f"Size must be between 1 and {settings.ATTACHMENT_MAX_SIZE} bytes.")
+        return value
+
+
+class NoticeAttachmentSerializer(serializers.ModelSerializer):
+    size = serializers.IntegerField(source="attachment.size", read_only=True)
+    content_type = serializers.CharField(source="attachment.content_type", read_only=True)
+    sha256 = serializers.CharField(source="attachment.sha256", read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = NoticeAttachment
+        fields = ["id", "filename", "size", "content_type", "sha256", "created_at", "download_url"]
+
+    def get_download_url(self, obj):
+        return download_url(self.context.get("request"), obj.notice_id, obj.pk)
+
+
 class NoticeTrackingSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
 
@@ -0,0 +1,68 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .hierarchy import detach_subtree
+from .directory import bump_directory_version
+from .counters import bump, bump_change, distribution_counts, notice_counts
+from .models import Department, Notice, NoticeDistribution, NoticeTombstone, User
+
+
+@receiver(pre_save, sender=Notice)
+def remember_notice_counts(sender, instance, **kwargs):
+    previous = Notice.objects.filter(pk=instance.pk).values_list("priority", flat=True).first() if instance.pk else None
+    instance._previous_counts = notice_counts(previous) if previous else {}
+
+
+@receiver(post_save, sender=Notice)
+def update_notice_counters(sender, instance, **kwargs):
+    bump_change(getattr(instance, "_previous_counts", {}), notice_counts(instance.priority))
+
+
+@receiver(post_delete, sender=Notice)
+def remove_notice_counters(sender, instance, **kwargs):
+    bump_change(notice_counts(instance.priority), {})
+
+
+@receiver(post_delete, sender=Notice)
+def record_notice_tombstone(sender, instance, **kwargs):
+    NoticeTombstone.objects.create(notice_id=instance.pk)
+
+
+@receiver(pre_save, sender=NoticeDistribution)
+def remember_distribution_counts(sender, instance, **kwargs):
+    previous = (
+        NoticeDistribution.objects.filter(pk=instance.pk).values_list("sent_email", "email_status").first()
+        if instance.pk
+        else None
+    )
+    instance._previous_counts = distribution_counts(*previous) if previous else {}
+
+
+@receiver(post_save, sender=NoticeDistribution)
+def update_distribution_counters(sender, instance, **kwargs):
+    bump_change(getattr(instance, "_previous_counts", {}), distribution_counts(instance.sent_email, instance.email_status))
+
+
+@receiver(post_delete, sender=NoticeDistribution)
+def remove_distribution_counters(sender, instance, **kwargs):
+    bump_change(distribution_counts(instance.sent_email, instance.email_status), {})
+
+
+@receiver(post_save, sender=Department)
+def update_department_counters(sender, instance, created, **kwargs):
+    if created:
+        bump(active_departments=1)
+    bump_directory_version()
+
+
+@receiver(post_delete, sender=Department)
+def remove_department_counters(sender, instance, **kwargs):
+    bump(active_departments=-1)
+    detach_subtree(instance.pk)
+    bump_directory_version()
+
+
+@receiver(post_delete, sender=User)
+def forget_department_head(sender, instance, **kwargs):
+    # Offices this user headed had ``head`` nulled by a queryset update.
+    bump_directory_version()
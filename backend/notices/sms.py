@@ -0,0 +1,128 @@
+import abc
+import logging
+import threading
+import time
+from functools import lru_cache
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class SMSGatewayError(Exception):
+    def __init__(self, message, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second.
+
+    A ``rate`` of zero or less means unthrottled: ``acquire`` never waits.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        if self.rate <= 0:
+            return
+        # Requests larger than the bucket are paid for in capacity-sized installments.
+        while amount > 0:
+            step = min(amount, self.capacity)
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= step:
+                    self._tokens -= step
+                    amount -= step
+                    continue
+                wait = (step - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class BaseSMSBackend(abc.ABC):
+    """Split numbers into gateway-sized batches, throttle them and retry transient failures."""
+
+    def __init__(self, batch_size=None, rate=None, max_retries=None):
+        self.batch_size = batch_size or settings.SMS_BATCH_SIZE
+        self.max_retries = settings.SMS_MAX_RETRIES if max_retries is None else max_retries
+        self.limiter = TokenBucket(settings.SMS_RATE_LIMIT if rate is None else rate)
+
+    @abc.abstractmethod
+    def send_batch(self, message, numbers):
+        """Send ``message`` to one batch of ``numbers``; raise ``SMSGatewayError`` on failure."""
+
+    def send(self, message, numbers):
+        sent = []
+        failed = []
+        errors = []
+        for start in range(0, len(numbers), self.batch_size):
+            batch = numbers[start:start + self.batch_size]
+            for attempt in range(self.max_retries + 1):
+                self.limiter.acquire(len(batch))
+                try:
+                    self.send_batch(message, batch)
+                except SMSGatewayError as exc:
+                    if exc.retryable and attempt < self.max_retries:
+                        delay = exc.retry_after or 2 ** attempt
+                        logger.warning("SMS batch throttled or unavailable, retrying in %ss: %s", delay, exc)
+                        time.sleep(delay)
+                        continue
+                    logger.error("SMS batch of %s failed: %s", len(batch), exc)
+                    failed.extend(batch)
+                    errors.append(str(exc))
+                else:
+                    sent.extend(batch)
+                break
+        return {"sent": sent, "failed": failed, "errors": errors}
+
+
+class ConsoleSMSBackend(BaseSMSBackend):
+    """Log messages instead of sending them (development default)."""
+
+    def send_batch(self, message, numbers):
+        for phone in numbers:
+            logger.info("SMS queued to %s: %s", phone, message)
+
+
+class SparrowSMSBackend(BaseSMSBackend):
+    """Sparrow SMS / NTC bulk HTTP API: comma-separated recipients per request."""
+
+    def send_batch(self, message, numbers):
+        data = {
+            "token": settings.SMS_API_TOKEN,
+            "from": settings.SMS_SENDER_ID,
+            "to": ",".join(numbers),
+            "text": message,
+        }
+        try:
+            resp = requests.post(settings.SMS_API_URL, data=data, timeout=10)
+        except requests.RequestException as exc:
+            raise SMSGatewayError(str(exc), retryable=True)
+        if resp.status_code == 429 or resp.status_code >= 500:
+            retry_after = resp.headers.get("Retry-After")
+            raise SMSGatewayError(
+                f"gateway returned {resp.status_code}",
+                retryable=True,
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+        if resp.status_code != 200:
+            try:
+                detail = resp.json().get("response")
+            except ValueError:
+                detail = resp.text
+            raise SMSGatewayError(f"gateway returned {resp.status_code}: {detail}")
+
+
+@lru_cache(maxsize=None)
+def get_sms_backend():
+    # One shared instance so every circulation thread draws from the same rate limit.
+    return import_string(settings.SMS_BACKEND)()
@@ -0,0 +1,104 @@
+"""The activity log writer and its archive."""
+import gzip
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from notices.activity import activity
+from notices.models import ActivityLog, Notice, User
+
+
+class ActivityWriterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("activity@test.local", "pw", name="Activity")
+        cls.notice = Notice.objects.create(title="Audited", content="x", created_by=cls.user)
+
+    def test_entries_are_written_together_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                activity.log(self.user, "created notice", self.notice)
+                activity.log(self.user, "approved notice", self.notice)
+                self.assertFalse(ActivityLog.objects.exists())
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(
+            list(ActivityLog.objects.order_by("id").values_list("user_id", "action", "notice_id")),
+            [(self.user.pk, "created notice", self.notice.pk), (self.user.pk, "approved notice", self.notice.pk)],
+        )
+
+    def test_rolled_back_change_logs_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                activity.log(self.user, "created notice", self.notice)
+                transaction.set_rollback(True)
+        self.assertFalse(ActivityLog.objects.exists())
+
+    def test_savepoint_rollback_drops_only_its_entries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            activity.log(self.user, "created notice", self.notice)
+            with transaction.atomic():
+                activity.log(self.user, "approved notice", self.notice)
+                transaction.set_rollback(True)
+            activity.log(self.user, "archived notice", self.notice)
+        self.assertEqual(
+            list(ActivityLog.objects.order_by("id").values_list("action", flat=True)), ["created notice", "archived notice"]
+        )
+
+    def test_entries_keep_the_time_they_were_logged(self):
+        logged = timezone.now() - timedelta(minutes=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            with mock.patch("notices.activity.timezone.now", return_value=logged):
+                activity.log(self.user, "created user")
+        self.assertEqual(ActivityLog.objects.get().created_at, logged)
+
+    def test_failed_write_is_reported_not_raised(self):
+        with mock.patch("notices.activity._write", side_effect=RuntimeError("db down")):
+            with self.assertLogs("notices.activity", "ERROR") as logs:
+                with self.captureOnCommitCallbacks(execute=True):
+                    activity.log(self.user, "created notice", self.notice)
+        self.assertIn("created notice", logs.output[0])
+
+
+class DeletedReferenceTests(TransactionTestCase):
+    def test_entry_for_a_deleted_user_is_kept_without_it(self):
+        author = User.objects.create_user("author@test.local", "pw", name="Author")
+        user = User.objects.create_user("gone@test.local", "pw", name="Gone")
+        notice = Notice.objects.create(title="Kept", content="x", created_by=author)
+        with transaction.atomic():
+            activity.log(user, "updated notice", notice)
+            User.objects.filter(pk=user.pk).delete()
+        entry = ActivityLog.objects.get()
+        self.assertEqual((entry.user_id, entry.action, entry.notice_id), (None, "updated notice", notice.pk))
+
+
+class ArchiveActivityTests(TestCase):
+    def test_archives_and_deletes_only_old_entries(self):
+        now = timezone.now()
+        ActivityLog.objects.create(action="old", created_at=now - timedelta(days=400))
+        recent = ActivityLog.objects.create(action="recent", created_at=now - timedelta(days=10))
+
+        with tempfile.TemporaryDirectory() as directory:
+            out = StringIO()
+            call_command("prune_activity_log", days=365, archive_dir=directory, stdout=out)
+            self.assertIn("Archived 1", out.getvalue())
+            (path,) = Path(directory).glob("activity-*.jsonl.gz")
+            with gzip.open(path, "rt", encoding="utf-8") as fh:
+                rows = [json.loads(line) for line in fh]
+
+        self.assertEqual([row["action"] for row in rows], ["old"])
+        self.assertEqual(list(ActivityLog.objects.values_list("id", flat=True)), [recent.pk])
+
+    def test_nothing_to_archive(self):
+        with tempfile.TemporaryDirectory() as directory:
+            out = StringIO()
+            call_command("prune_activity_log", days=365, archive_dir=directory, stdout=out)
+            self.assertEqual(list(Path(directory).iterdir()), [])
+        self.assertIn("No activity log entries", out.getvalue())
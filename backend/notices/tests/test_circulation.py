@@ -0,0 +1,53 @@
+"""Approving a notice queues its circulation."""
+from rest_framework.test import APITestCase
+
+from notices.models import CirculationJob, Department, Notice, User
+
+
+class ApproveTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.root = Department.objects.create(name="Approve Province", office_type="province")
+        cls.division = Department.objects.create(name="Approve Division", parent_office=cls.root)
+        cls.branch = Department.objects.create(name="Approve Branch", parent_office=cls.division)
+        cls.admin = User.objects.create_user("approve-admin@test.local", "pw", name="Approve Admin", role=User.Role.ADMIN)
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+        self.notice = Notice.objects.create(title="Outage", content="x", status="pending", created_by=self.admin)
+        self.url = f"/api/notices/{self.notice.pk}/approve/"
+
+    def assertStillPending(self):
+        self.notice.refresh_from_db()
+        self.assertEqual(self.notice.status, "pending")
+        self.assertFalse(CirculationJob.objects.filter(notice=self.notice).exists())
+
+    def test_root_office_expands_to_its_subtree(self):
+        response = self.client.post(self.url, {"root_office_id": self.division.pk}, format="json")
+        self.assertEqual(response.status_code, 202)
+        job = CirculationJob.objects.get(pk=response.data["job_id"])
+        self.assertEqual(job.department_ids, sorted([self.division.pk, self.branch.pk]))
+        self.notice.refresh_from_db()
+        self.assertEqual((self.notice.status, self.notice.approved_by), ("approved", self.admin))
+
+    def test_unknown_root_office_is_rejected(self):
+        response = self.client.post(self.url, {"root_office_id": 999999}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("root_office_ids", response.data)
+        self.assertStillPending()
+
+    def test_unknown_department_is_rejected(self):
+        response = self.client.post(self.url, {"department_ids": [self.branch.pk, 999999]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("department_ids", response.data)
+        self.assertStillPending()
+
+    def test_no_targets_is_rejected(self):
+        response = self.client.post(self.url, {}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertStillPending()
+
+    def test_non_numeric_id_is_rejected(self):
+        response = self.client.post(self.url, {"department_ids": ["1; drop"]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertStillPending()
@@ -0,0 +1,105 @@
+"""ETag / Last-Modified revalidation of the notice and department views."""
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from notices.models import Department, Notice, User
+from notices.tracking import TrackingBuffer
+
+
+class ConditionalGetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.office = Department.objects.create(name="ETag Office")
+        cls.admin = User.objects.create_user(
+            "etag-admin@test.local", "pw", name="ETag Admin", role=User.Role.ADMIN, department=cls.office
+        )
+        cls.notice = Notice.objects.create(title="Tariff", content="x", status="approved", created_by=cls.admin)
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+        patcher = mock.patch("notices.views.tracker", TrackingBuffer(interval=3600))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertRevalidates(self, url, change):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_detail_changes_with_notice(self):
+        def edit():
+            self.notice.title = "Tariff (revised)"
+            self.notice.save()
+
+        self.assertRevalidates(f"/api/notices/{self.notice.pk}/", edit)
+
+    def test_detail_changes_with_author(self):
+        def rename():
+            self.admin.name = "Renamed Admin"
+            self.admin.save()
+
+        self.assertRevalidates(f"/api/notices/{self.notice.pk}/", rename)
+
+    def test_detail_sends_last_modified(self):
+        response = self.client.get(f"/api/notices/{self.notice.pk}/")
+        since = response["Last-Modified"]
+        self.assertEqual(self.client.get(f"/api/notices/{self.notice.pk}/", HTTP_IF_MODIFIED_SINCE=since).status_code, 304)
+
+    def test_list_changes_with_department(self):
+        def rename():
+            self.office.name = "Renamed Office"
+            self.office.save()
+
+        self.assertRevalidates("/api/notices/", rename)
+
+    def test_list_changes_with_new_notice(self):
+        self.assertRevalidates(
+            "/api/notices/",
+            lambda: Notice.objects.create(title="New", content="x", status="approved", created_by=self.admin),
+        )
+
+    def test_list_changes_with_deleted_notice(self):
+        other = Notice.objects.create(title="Gone", content="x", status="approved", created_by=self.admin)
+        self.assertRevalidates("/api/notices/", other.delete)
+
+    def test_department_list_changes_with_deleted_department(self):
+        other = Department.objects.create(name="Closing Office")
+
+        def close():
+            # The directory version moves when the delete commits.
+            with self.captureOnCommitCallbacks(execute=True):
+                other.delete()
+
+        self.assertRevalidates("/api/departments/", close)
+
+    def test_lists_send_only_etag(self):
+        for url in ("/api/notices/", "/api/departments/"):
+            response = self.client.get(url)
+            self.assertIn("ETag", response)
+            self.assertNotIn("Last-Modified", response)
+            # A date alone cannot prove a list unchanged.
+            since = "Tue, 01 Jan 2999 00:00:00 GMT"
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+
+    def test_date_filter_changes_with_day(self):
+        url = "/api/notices/?expired=false"
+        today = timezone.localdate()
+        with mock.patch("django.utils.timezone.localdate", return_value=today):
+            etag = self.client.get(url)["ETag"]
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with mock.patch("django.utils.timezone.localdate", return_value=today + timedelta(days=1)):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_invalid_filter_is_rejected_before_revalidation(self):
+        # "*" matches any current representation, so only validation can refuse it.
+        self.assertEqual(self.client.get("/api/notices/", HTTP_IF_NONE_MATCH="*").status_code, 304)
+        response = self.client.get("/api/notices/?status=bogus", HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,69 @@
+"""Incrementally maintained dashboard counters."""
+from django.test import TestCase
+
+from notices.counters import COUNTERS, bump, read_counters, rebuild_counters
+from notices.deliveries import refresh_distributions
+from notices.models import DashboardCounter, Department, Notice, NoticeDelivery, NoticeDistribution, User
+
+
+class CounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("counter-admin@test.local", "pw", name="Counter Admin", role=User.Role.ADMIN)
+
+    def assertMatchesRecount(self):
+        self.assertEqual(read_counters(), {name: count() for name, count in COUNTERS.items()})
+
+    def test_counters_follow_model_changes(self):
+        rebuild_counters()
+        offices = [Department.objects.create(name=f"Counter Office {n}") for n in range(3)]
+        urgent = Notice.objects.create(title="Urgent", content="x", priority="urgent", created_by=self.admin)
+        normal = Notice.objects.create(title="Normal", content="x", priority="normal", created_by=self.admin)
+        self.assertMatchesRecount()
+
+        normal.priority = "urgent"
+        normal.save()
+        urgent.delete()
+        offices[2].delete()
+        self.assertMatchesRecount()
+
+        sent = NoticeDistribution.objects.create(notice=normal, department=offices[0], email_status="sent", sent_email=True)
+        failed = NoticeDistribution.objects.create(notice=normal, department=offices[1], email_status="failed")
+        self.assertMatchesRecount()
+        sent.email_status, sent.sent_email = "failed", False
+        sent.save()
+        failed.delete()
+        self.assertMatchesRecount()
+
+    def test_ledger_refresh_adjusts_counters(self):
+        rebuild_counters()
+        office = Department.objects.create(name="Counter Ledger Office")
+        notice = Notice.objects.create(title="Ledger", content="x", created_by=self.admin)
+        NoticeDistribution.objects.create(notice=notice, department=office)
+        delivery = NoticeDelivery.objects.create(
+            notice=notice, department=office, channel="email", recipient="a@test.local", status="failed"
+        )
+        refresh_distributions(notice.pk, [office.pk])
+        self.assertMatchesRecount()
+        self.assertEqual(read_counters()["failed_deliveries"], 1)
+
+        delivery.status = "sent"
+        delivery.save()
+        refresh_distributions(notice.pk, [office.pk])
+        self.assertMatchesRecount()
+        self.assertEqual((read_counters()["failed_deliveries"], read_counters()["delivered_reports"]), (0, 1))
+
+    def test_bump_is_one_update(self):
+        rebuild_counters()
+        before = read_counters()
+        with self.assertNumQueries(1):
+            bump(total_notices=2, urgent_notices=-1, active_departments=0)
+        after = read_counters()
+        self.assertEqual(after["total_notices"] - before["total_notices"], 2)
+        self.assertEqual(after["urgent_notices"] - before["urgent_notices"], -1)
+        self.assertEqual(after["active_departments"], before["active_departments"])
+
+    def test_missing_rows_are_rebuilt_on_read(self):
+        Notice.objects.create(title="Counted", content="x", created_by=self.admin)
+        DashboardCounter.objects.filter(name="total_notices").delete()
+        self.assertMatchesRecount()
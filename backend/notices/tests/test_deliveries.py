@@ -0,0 +1,123 @@
+"""The delivery ledger's retry schedule, dead-lettering and re-approval."""
+import smtplib
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from notices.circulation import claim_due_deliveries, enqueue_circulation, retry_due_deliveries
+from notices.deliveries import record_deliveries, retry_delay
+from notices.models import CirculationJob, Department, Notice, NoticeDelivery, NoticeDistribution, User
+from notices.tests.test_notifications import FakeSMTP
+
+
+@override_settings(DELIVERY_MAX_ATTEMPTS=3, DELIVERY_RETRY_BASE_SECONDS=60, DELIVERY_RETRY_MAX_SECONDS=600)
+class LedgerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.office = Department.objects.create(name="Ledger Office")
+        cls.admin = User.objects.create_user("ledger-admin@test.local", "pw", name="Ledger Admin", role=User.Role.ADMIN)
+        cls.notice = Notice.objects.create(title="Ledger", content="x", status="approved", created_by=cls.admin)
+
+    def delivery(self, recipient, **fields):
+        return NoticeDelivery.objects.create(
+            notice=self.notice, department=self.office, channel="email", recipient=recipient, **fields
+        )
+
+    def due(self, recipient):
+        return self.delivery(recipient, status="failed", attempts=1, next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+    def retry(self, smtp):
+        with mock.patch("notices.notifications.get_connection", smtp):
+            return retry_due_deliveries()
+
+    def test_retry_delay_doubles_with_jitter_and_caps(self):
+        with mock.patch("notices.deliveries.random.uniform", side_effect=lambda low, high: high):
+            self.assertEqual([retry_delay(n) for n in (1, 2, 3, 5, 10)], [60, 120, 240, 600, 600])
+        with mock.patch("notices.deliveries.random.uniform", side_effect=lambda low, high: low):
+            self.assertEqual(retry_delay(1), 30)
+
+    def test_failure_schedules_retry(self):
+        row = self.delivery("a@test.local")
+        before = timezone.now()
+        record_deliveries([row], {"status": "failed", "reason": "timeout"})
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts, row.last_error), ("failed", 1, "timeout"))
+        self.assertGreaterEqual(row.next_attempt_at, before + timedelta(seconds=30))
+        self.assertLessEqual(row.next_attempt_at, timezone.now() + timedelta(seconds=60))
+
+    def test_dead_letter_after_max_attempts(self):
+        row = self.delivery("a@test.local", status="failed", attempts=2)
+        record_deliveries([row], {"status": "failed"})
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts, row.next_attempt_at), ("dead", 3, None))
+
+    def test_only_due_rows_are_claimed_once(self):
+        due = self.due("due@test.local")
+        self.delivery("later@test.local", status="failed", attempts=1, next_attempt_at=timezone.now() + timedelta(minutes=5))
+        self.delivery("dead@test.local", status="dead", attempts=3)
+        self.assertEqual([row.pk for row in claim_due_deliveries()], [due.pk])
+        # The lease moves the row out of the due window, so a second worker gets nothing.
+        self.assertEqual(claim_due_deliveries(), [])
+
+    def test_due_row_is_resent(self):
+        row = self.due("a@test.local")
+        smtp = FakeSMTP()
+
+        self.assertEqual(self.retry(smtp), 1)
+
+        self.assertEqual(smtp.sent, ["a@test.local"])
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts, row.next_attempt_at, row.last_error), ("sent", 2, None, ""))
+        self.assertIsNotNone(row.sent_at)
+
+    def test_refused_address_is_dead_only_for_a_permanent_reply(self):
+        rejected, busy = self.due("gone@test.local"), self.due("busy@test.local")
+        smtp = FakeSMTP(
+            [
+                smtplib.SMTPRecipientsRefused({"gone@test.local": (550, b"no such user")}),
+                smtplib.SMTPRecipientsRefused({"busy@test.local": (450, b"mailbox busy")}),
+            ]
+        )
+
+        self.assertEqual(self.retry(smtp), 2)
+
+        rejected.refresh_from_db()
+        self.assertEqual((rejected.status, rejected.attempts, rejected.next_attempt_at), ("dead", 2, None))
+        busy.refresh_from_db()
+        self.assertEqual((busy.status, busy.attempts), ("failed", 2))
+        self.assertGreater(busy.next_attempt_at, timezone.now())
+        # Neither refusal was retried inside the send itself.
+        self.assertEqual(smtp.opened, 1)
+
+    def test_unreachable_server_leaves_rows_for_the_next_retry(self):
+        row = self.due("a@test.local")
+        self.retry(FakeSMTP(open_error=ConnectionRefusedError("refused")))
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ("failed", 2))
+        self.assertIn("unreachable", row.last_error)
+
+    def test_reapproval_skips_sent_channels_and_retries_only_failures(self):
+        other = Department.objects.create(name="Ledger Annex")
+        NoticeDistribution.objects.create(notice=self.notice, department=self.office, email_status="sent", sent_email=True)
+        sent = self.delivery("sent@test.local", status="sent", attempts=1)
+        failed = self.delivery("failed@test.local", status="failed", attempts=3, last_error="timeout")
+        dead = self.delivery("dead@test.local", status="dead", attempts=1, last_error="refused")
+
+        job, skipped = enqueue_circulation(self.notice, [self.office.pk, other.pk, other.pk], self.admin)
+
+        self.assertEqual(skipped, [{"department_id": self.office.pk, "channels": ["email"]}])
+        self.assertEqual(job.department_ids, sorted([self.office.pk, other.pk]))
+        self.assertEqual(NoticeDistribution.objects.filter(notice=self.notice).count(), 2)
+        failed.refresh_from_db()
+        self.assertEqual((failed.status, failed.attempts, failed.next_attempt_at, failed.last_error), ("pending", 0, None, ""))
+        # A refused address would only be refused again.
+        dead.refresh_from_db()
+        self.assertEqual((dead.status, dead.attempts, dead.last_error), ("dead", 1, "refused"))
+        sent.refresh_from_db()
+        self.assertEqual(sent.status, "sent")
+
+        enqueue_circulation(self.notice, [self.office.pk, other.pk], self.admin)
+        self.assertEqual(NoticeDistribution.objects.filter(notice=self.notice).count(), 2)
+        self.assertEqual(CirculationJob.objects.filter(notice=self.notice).count(), 2)
@@ -0,0 +1,65 @@
+"""The versioned department directory cache."""
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.test import APITestCase
+
+from notices.directory import VERSION_KEY, cached_directory, directory_version
+from notices.models import Department, User
+
+
+class DirectoryCacheTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.root = Department.objects.create(name="Directory Root")
+        cls.child = Department.objects.create(name="Directory Child", parent_office=cls.root)
+        cls.admin = User.objects.create_user(
+            "directory-admin@test.local", "pw", name="Directory Admin", role=User.Role.ADMIN, department=cls.root
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def names(self, url="/api/departments/"):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return {row["name"] for row in response.data}
+
+    def test_list_is_served_from_the_cache(self):
+        self.names()
+        with self.assertNumQueries(0):
+            self.names()
+
+    def test_save_invalidates_after_commit(self):
+        self.assertIn("Directory Child", self.names())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.child.name = "Renamed Child"
+            self.child.save()
+        names = self.names()
+        self.assertIn("Renamed Child", names)
+        self.assertNotIn("Directory Child", names)
+
+    def test_delete_invalidates_list_and_subtree(self):
+        subtree = f"/api/departments/{self.root.pk}/subtree/"
+        self.assertIn("Directory Child", self.names(subtree))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.child.delete()
+        self.assertNotIn("Directory Child", self.names())
+        self.assertNotIn("Directory Child", self.names(subtree))
+
+    def test_rolled_back_change_keeps_the_version(self):
+        version = directory_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                self.child.name = "Never Saved"
+                self.child.save()
+                transaction.set_rollback(True)
+        self.assertEqual(callbacks, [])
+        self.assertEqual(directory_version(), version)
+
+    def test_lost_version_never_revives_old_entries(self):
+        version, _ = cached_directory("probe", lambda: "old")
+        cache.delete(VERSION_KEY)
+        new_version, value = cached_directory("probe", lambda: "new")
+        self.assertNotEqual(new_version, version)
+        self.assertEqual(value, "new")
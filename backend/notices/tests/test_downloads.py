@@ -0,0 +1,115 @@
+"""Tracked, ranged attachment downloads and their signed links."""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from notices.downloads import download_token, token_user
+from notices.models import Attachment, Notice, NoticeAttachment, NoticeTracking, User
+from notices.tracking import TrackingBuffer
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix="ancs-downloads-")
+CONTENT = b"tariff revision 2081"
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, ATTACHMENT_SENDFILE="")
+class RangeDownloadTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("range-admin@test.local", "pw", name="Range Admin", role=User.Role.ADMIN)
+        cls.notice = Notice.objects.create(title="Ranged", content="x", status="approved", created_by=cls.admin)
+        sha256 = hashlib.sha256(CONTENT).hexdigest()
+        cls.link = NoticeAttachment.objects.create(
+            notice=cls.notice,
+            attachment=Attachment.objects.create(sha256=sha256, size=len(CONTENT), file=f"attachments/{sha256}"),
+            filename="tariff.pdf",
+        )
+        os.makedirs(os.path.join(MEDIA_ROOT, "attachments"), exist_ok=True)
+        with open(os.path.join(MEDIA_ROOT, "attachments", sha256), "wb") as fh:
+            fh.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+        # Keep download events in memory; a flush would write from another thread mid-test.
+        self.tracker = TrackingBuffer(interval=3600)
+        patcher = mock.patch("notices.views.tracker", self.tracker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = f"/api/notices/{self.notice.pk}/download/?attachment={self.link.pk}"
+
+    def test_range_returns_partial_content(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=7-14")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 7-14/{len(CONTENT)}")
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[7:15])
+
+    def test_suffix_range(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-4")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[-4:])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(CONTENT)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(CONTENT)}")
+
+    def test_stale_if_range_sends_whole_file(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-3", HTTP_IF_RANGE='"outdated"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, ATTACHMENT_SENDFILE="")
+class DownloadLinkTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user("link-reader@test.local", "pw", name="Link Reader")
+        cls.notice = Notice.objects.create(
+            title="Linked", content="x", status="approved", created_by=cls.reader, file_url="https://files.example/tariff.pdf"
+        )
+        cls.other = Notice.objects.create(title="Other", content="x", status="approved", created_by=cls.reader)
+
+    def setUp(self):
+        self.tracker = TrackingBuffer(interval=3600)
+        patcher = mock.patch("notices.views.tracker", self.tracker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_link_needs_a_signed_in_reader(self):
+        self.assertEqual(self.client.get(f"/api/notices/{self.notice.pk}/download-link/").status_code, 401)
+
+    def test_link_attributes_the_download(self):
+        self.client.force_authenticate(self.reader)
+        url = self.client.get(f"/api/notices/{self.notice.pk}/download-link/").data["url"]
+        self.client.force_authenticate(None)
+        # Opened by the browser itself, without the Authorization header.
+        parts = urlsplit(url)
+        response = self.client.get(parts.path, parse_qs(parts.query))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Referrer-Policy"], "no-referrer")
+        self.tracker.flush()
+        self.assertTrue(NoticeTracking.objects.filter(user=self.reader, notice=self.notice, downloaded=True).exists())
+
+    def test_token_is_bound_to_one_file(self):
+        token = download_token(self.reader, self.notice.pk)
+        self.assertEqual(token_user(token, self.notice.pk), self.reader)
+        self.assertIsNone(token_user(token, self.other.pk))
+        self.assertIsNone(token_user(token, self.notice.pk, 1))
+        self.assertIsNone(token_user(download_token(self.reader, self.notice.pk, 1), self.notice.pk))
+
+    @override_settings(ATTACHMENT_LINK_MAX_AGE=60)
+    def test_token_expires(self):
+        token = download_token(self.reader, self.notice.pk)
+        with mock.patch("django.core.signing.time.time", return_value=time.time() + 61):
+            self.assertIsNone(token_user(token, self.notice.pk))
@@ -0,0 +1,152 @@
+"""The notice event outbox, its relay and the /api/events stream."""
+import asyncio
+from datetime import timedelta
+from unittest import mock
+
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from notices.events import EventRelay, _stream, broadcaster, publish_notice_event, serve_until_disconnect
+from notices.expiry import expire_notices
+from notices.models import Department, Notice, NoticeEvent, User
+
+
+class OutboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("events-admin@test.local", "pw", name="Events Admin", role=User.Role.ADMIN)
+        cls.notice = Notice.objects.create(title="Budget", content="x", status="approved", created_by=cls.admin)
+
+    def test_event_is_part_of_the_transaction(self):
+        with transaction.atomic():
+            publish_notice_event("notice.updated", self.notice)
+            transaction.set_rollback(True)
+        self.assertFalse(NoticeEvent.objects.exists())
+
+        publish_notice_event("notice.approved", self.notice, [3, 4])
+        event = NoticeEvent.objects.get()
+        self.assertEqual(event.event_type, "notice.approved")
+        self.assertEqual(event.data["id"], self.notice.pk)
+        self.assertEqual(event.data["department_ids"], [3, 4])
+
+    def test_expiry_publishes_archived(self):
+        today = timezone.localdate()
+        expired = Notice.objects.create(
+            title="Old", content="x", status="approved", created_by=self.admin, expiry_date=today - timedelta(days=1)
+        )
+
+        expire_notices(today=today)
+
+        event = NoticeEvent.objects.get()
+        self.assertEqual((event.event_type, event.data["id"], event.data["status"]), ("notice.archived", expired.pk, "archived"))
+
+
+class RelayTests(TestCase):
+    def setUp(self):
+        self.relay = EventRelay(broadcaster, interval=0, settle=10)
+        self.now = timezone.now()
+
+    def row(self, pk, age=0):
+        return {"id": pk, "event_type": "notice.updated", "data": {"id": pk}, "created_at": self.now - timedelta(seconds=age)}
+
+    def test_contiguous_rows_advance_the_floor(self):
+        events = self.relay.accept([self.row(1), self.row(2)], now=self.now)
+        self.assertEqual([event["id"] for event in events], [1, 2])
+        self.assertEqual(self.relay.floor, 2)
+
+    def test_gap_holds_the_floor_until_filled(self):
+        self.assertEqual([e["id"] for e in self.relay.accept([self.row(1), self.row(3)], now=self.now)], [1, 3])
+        self.assertEqual(self.relay.floor, 1)
+        # Row 3 is read again while the gap is open, but not sent twice.
+        self.assertEqual([e["id"] for e in self.relay.accept([self.row(2), self.row(3)], now=self.now)], [2])
+        self.assertEqual(self.relay.floor, 3)
+
+    def test_gap_is_skipped_once_settled(self):
+        self.relay.accept([self.row(1), self.row(3)], now=self.now)
+        self.relay.accept([self.row(3)], now=self.now + timedelta(seconds=9))
+        self.assertEqual(self.relay.floor, 1)
+        self.relay.accept([self.row(3)], now=self.now + timedelta(seconds=11))
+        self.assertEqual(self.relay.floor, 3)
+
+    def test_fetch_reads_above_the_floor(self):
+        admin = User.objects.create_user("relay@test.local", "pw", name="Relay")
+        notice = Notice.objects.create(title="N", content="x", created_by=admin)
+        first = publish_notice_event("notice.updated", notice)
+        second = publish_notice_event("notice.archived", notice)
+        self.relay.reset(self.relay.latest_id() - 1)
+        self.assertEqual(self.relay.latest_id(), second.pk)
+        self.assertEqual([row["id"] for row in self.relay.fetch()], [second.pk])
+        self.relay.reset(first.pk - 1)
+        self.assertEqual([row["event_type"] for row in self.relay.fetch()], ["notice.updated", "notice.archived"])
+
+
+class EventStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.office = Department.objects.create(name="Stream Office")
+        cls.user = User.objects.create_user("stream@test.local", "pw", name="Stream", department=cls.office)
+        cls.token = str(RefreshToken.for_user(cls.user).access_token)
+
+    def setUp(self):
+        patcher = mock.patch("notices.events.relay")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get("/api/events")
+        self.assertEqual(response.status_code, 401)
+
+    async def test_rejects_bad_department(self):
+        response = await self.async_client.get(
+            "/api/events?department_id=x", headers={"Authorization": f"Bearer {self.token}"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_streams_events_for_the_office(self):
+        response = await self.async_client.get(
+            f"/api/events?department_id={self.office.pk}",
+            headers={"Authorization": f"Bearer {self.token}", "Origin": "https://board.example"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        # The API's CORS policy applies to the stream too.
+        self.assertIn("Access-Control-Allow-Origin", response)
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+
+        broadcaster.publish({"id": 7, "type": "notice.approved", "data": {"id": 1, "department_ids": [self.office.pk + 1]}})
+        broadcaster.publish({"id": 8, "type": "notice.approved", "data": {"id": 2, "department_ids": [self.office.pk]}})
+        chunk = await asyncio.wait_for(anext(stream), 5)
+        self.assertTrue(chunk.startswith(b"id: 8\nevent: notice.approved\n"))
+
+        await stream.aclose()
+
+
+class DisconnectTests(SimpleTestCase):
+    async def test_stream_ends_and_unsubscribes_on_disconnect(self):
+        disconnected = asyncio.Event()
+        subscribers = len(broadcaster)
+        with mock.patch("notices.events.relay"):
+            stream = _stream(None, disconnected)
+            self.assertTrue((await anext(stream)).startswith(b"retry:"))
+            self.assertEqual(len(broadcaster), subscribers + 1)
+            disconnected.set()
+            with self.assertRaises(StopAsyncIteration):
+                await asyncio.wait_for(anext(stream), 5)
+        self.assertEqual(len(broadcaster), subscribers)
+
+    async def test_app_is_told_when_the_client_leaves(self):
+        messages = [{"type": "http.request", "body": b"", "more_body": False}, {"type": "http.disconnect"}]
+
+        async def receive():
+            if len(messages) == 1:
+                await asyncio.sleep(0.01)
+            return messages.pop(0)
+
+        async def app(scope, receive, send):
+            self.assertEqual((await receive())["type"], "http.request")
+            await asyncio.wait_for(scope["disconnected"].wait(), 5)
+
+        await serve_until_disconnect(app, {"type": "http"}, receive, None)
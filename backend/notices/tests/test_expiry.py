@@ -0,0 +1,51 @@
+"""Archiving notices whose expiry date has passed."""
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from notices.expiry import expire_notices
+from notices.models import Notice, User
+
+
+class ExpiryTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("expiry-admin@test.local", "pw", name="Expiry Admin", role=User.Role.ADMIN)
+
+    def notice(self, expiry_date, status="approved"):
+        return Notice.objects.create(title="Notice", content="x", status=status, created_by=self.admin, expiry_date=expiry_date)
+
+    def test_only_past_expiry_is_archived(self):
+        today = timezone.localdate()
+        expired = [self.notice(today - timedelta(days=days)) for days in (1, 30, 400)]
+        current = [self.notice(today), self.notice(today + timedelta(days=1)), self.notice(None)]
+        before = timezone.now()
+
+        self.assertEqual(expire_notices(today=today, chunk_size=2), 3)
+
+        for notice in expired:
+            notice.refresh_from_db()
+            self.assertEqual(notice.status, "archived")
+            self.assertGreaterEqual(notice.updated_at, before)
+        for notice in current:
+            notice.refresh_from_db()
+            self.assertEqual(notice.status, "approved")
+        self.assertEqual(expire_notices(today=today), 0)
+
+    def test_already_archived_notice_is_left_alone(self):
+        archived = self.notice(timezone.localdate() - timedelta(days=5), status="archived")
+        updated_at = archived.updated_at
+
+        self.assertEqual(expire_notices(), 0)
+
+        archived.refresh_from_db()
+        self.assertEqual(archived.updated_at, updated_at)
+
+    def test_command_reports_the_count(self):
+        self.notice(timezone.localdate() - timedelta(days=1))
+        out = StringIO()
+        call_command("expire_notices", chunk_size=1, stdout=out)
+        self.assertIn("Archived 1 expired notices", out.getvalue())
@@ -0,0 +1,87 @@
+"""The materialized office hierarchy."""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from notices import hierarchy
+from notices.models import Department, User
+
+
+def ids(queryset):
+    return set(queryset.values_list("id", flat=True))
+
+
+class HierarchyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.province = Department.objects.create(name="Province")
+        cls.division = Department.objects.create(name="Division", parent_office=cls.province)
+        cls.branch = Department.objects.create(name="Branch", parent_office=cls.division)
+        cls.other = Department.objects.create(name="Other Province")
+
+    def refresh(self):
+        for department in (self.province, self.division, self.branch, self.other):
+            department.refresh_from_db()
+
+    def test_paths_follow_parents(self):
+        self.assertEqual(self.branch.path, f"/{self.province.pk}/{self.division.pk}/{self.branch.pk}/")
+        self.assertEqual(list(hierarchy.ancestors(self.branch)), [self.province, self.division])
+
+    def test_moving_an_office_moves_its_subtree(self):
+        self.division.parent_office = self.other
+        self.division.save()
+        self.refresh()
+        self.assertEqual(self.branch.path, f"/{self.other.pk}/{self.division.pk}/{self.branch.pk}/")
+        self.assertEqual(ids(hierarchy.subtree([self.other.pk])), {self.other.pk, self.division.pk, self.branch.pk})
+        self.assertEqual(ids(hierarchy.subtree([self.province.pk])), {self.province.pk})
+
+    def test_deleting_an_office_reroots_its_children(self):
+        self.division.delete()
+        self.branch.refresh_from_db()
+        self.assertEqual(self.branch.path, f"/{self.branch.pk}/")
+        self.assertIsNone(self.branch.parent_office)
+
+    def test_subtree_uses_constant_prefixes(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = ids(hierarchy.subtree([self.division.pk, self.branch.pk, self.other.pk]))
+        self.assertEqual(result, {self.division.pk, self.branch.pk, self.other.pk})
+        # Nested roots are dropped, and the path is compared with literal prefixes, not a join.
+        self.assertEqual(queries[-1]["sql"].count("LIKE"), 2)
+        self.assertNotIn("JOIN", queries[-1]["sql"])
+
+    def test_unknown_roots_give_an_empty_subtree(self):
+        self.assertEqual(ids(hierarchy.subtree([999999])), set())
+
+    def test_is_in_subtree(self):
+        self.assertTrue(hierarchy.is_in_subtree(self.branch, self.province))
+        self.assertTrue(hierarchy.is_in_subtree(self.province, self.province))
+        self.assertFalse(hierarchy.is_in_subtree(self.province, self.branch))
+        self.assertFalse(hierarchy.is_in_subtree(self.other, self.province))
+
+
+class HierarchyApiTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.province = Department.objects.create(name="Api Province")
+        cls.division = Department.objects.create(name="Api Division", parent_office=cls.province)
+        cls.admin = User.objects.create_user("hierarchy-admin@test.local", "pw", name="Admin", role=User.Role.ADMIN)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def test_subtree_and_ancestors(self):
+        response = self.client.get(f"/api/departments/{self.province.pk}/subtree/")
+        self.assertEqual({row["id"] for row in response.data}, {self.province.pk, self.division.pk})
+        response = self.client.get(f"/api/departments/{self.division.pk}/ancestors/")
+        self.assertEqual([row["id"] for row in response.data], [self.province.pk])
+
+    def test_office_cannot_move_under_its_own_subtree(self):
+        response = self.client.patch(
+            f"/api/departments/{self.province.pk}/", {"parent_office": self.division.pk}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.province.refresh_from_db()
+        self.assertIsNone(self.province.parent_office)
@@ -0,0 +1,148 @@
+"""Email and push sends, and how their failures are classified."""
+import smtplib
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+from notices.deliveries import recipient_outcomes
+from notices.models import DeviceToken, User
+from notices.notifications import BulkEmailSender, send_email_notice, send_push_notice, smtp_transient
+
+
+class FakeSMTP:
+    """Stands in for Django's SMTP backend; ``errors`` are raised by successive sends (None sends)."""
+
+    def __init__(self, errors=(), open_error=None):
+        self.errors = list(errors)
+        self.open_error = open_error
+        self.opened = 0
+        self.sent = []
+
+    def __call__(self, **kwargs):
+        return self
+
+    def open(self):
+        self.opened += 1
+        if self.open_error is not None:
+            raise self.open_error
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            raise error
+        self.sent += [message.to[0] for message in messages]
+        return len(messages)
+
+
+class EmailTests(SimpleTestCase):
+    def send(self, smtp, recipients=("a@test.local",)):
+        with mock.patch("notices.notifications.get_connection", smtp):
+            with BulkEmailSender(max_retries=2) as sender:
+                return sender.send("Subject", "<p>Body</p>", list(recipients))
+
+    def test_transient_errors(self):
+        self.assertTrue(smtp_transient(smtplib.SMTPResponseException(421, b"try later")))
+        self.assertTrue(smtp_transient(smtplib.SMTPServerDisconnected("gone")))
+        self.assertTrue(smtp_transient(ConnectionResetError()))
+        self.assertFalse(smtp_transient(smtplib.SMTPResponseException(554, b"rejected")))
+        self.assertFalse(smtp_transient(smtplib.SMTPDataError(552, b"too big")))
+
+    def test_transient_error_is_retried_on_a_new_connection(self):
+        smtp = FakeSMTP([smtplib.SMTPServerDisconnected("gone"), smtplib.SMTPResponseException(451, b"later")])
+        self.assertEqual(self.send(smtp), {"a@test.local": "sent"})
+        self.assertEqual(smtp.opened, 3)
+
+    def test_permanent_error_is_not_retried(self):
+        smtp = FakeSMTP([smtplib.SMTPDataError(554, b"rejected")])
+        self.assertEqual(self.send(smtp, ["a@test.local", "b@test.local"]), {"a@test.local": "failed", "b@test.local": "sent"})
+        self.assertEqual(smtp.opened, 1)
+
+    def test_unreachable_server_stops_the_batch(self):
+        smtp = FakeSMTP(open_error=ConnectionRefusedError("refused"))
+        with mock.patch("notices.notifications.get_connection", smtp):
+            with BulkEmailSender(max_retries=2) as sender:
+                first = sender.send("Subject", "Body", ["a@test.local", "b@test.local"])
+                second = sender.send("Subject", "Body", ["c@test.local"])
+        self.assertEqual(first, {"a@test.local": "failed", "b@test.local": "failed"})
+        self.assertEqual(second, {"c@test.local": "failed"})
+        self.assertEqual(smtp.opened, 1)
+        self.assertIsInstance(sender.unreachable, ConnectionRefusedError)
+
+    def test_unreachable_server_is_reported(self):
+        smtp = FakeSMTP(open_error=smtplib.SMTPConnectError(421, b"busy"))
+        with mock.patch("notices.notifications.get_connection", smtp):
+            result = send_email_notice("Subject", "Body", ["a@test.local", "b@test.local"])
+        self.assertEqual((result["status"], result["failed"]), ("failed", ["a@test.local", "b@test.local"]))
+        self.assertIn("unreachable", result["reason"])
+
+    def test_blank_recipients_are_skipped(self):
+        smtp = FakeSMTP()
+        with mock.patch("notices.notifications.get_connection", smtp):
+            result = send_email_notice("Subject", "Body", ["", "  ", None])
+        self.assertEqual(result["status"], "skipped")
+        self.assertEqual(smtp.opened, 0)
+
+    def test_recipients_are_stripped_and_sent_once(self):
+        smtp = FakeSMTP()
+        with mock.patch("notices.notifications.get_connection", smtp):
+            result = send_email_notice("Subject", "Body", ["a@test.local", " a@test.local ", "b@test.local"])
+        self.assertEqual(result["sent"], 2)
+        self.assertEqual(smtp.sent, ["a@test.local", "b@test.local"])
+
+
+@override_settings(FCM_SERVER_KEY="test-key")
+class PushTests(SimpleTestCase):
+    def post(self, payload):
+        response = mock.Mock()
+        response.json.return_value = payload
+        return mock.patch("notices.notifications.requests.post", return_value=response)
+
+    def test_short_results_fail_the_chunk(self):
+        with self.post({"results": [{"message_id": "1"}]}):
+            result = send_push_notice("Title", "Body", ["t1", "t2"])
+        self.assertEqual(result["status"], "failed")
+        self.assertEqual(result["failed_tokens"], ["t1", "t2"])
+        self.assertEqual(result["invalid_tokens"], [])
+
+    def test_missing_results_fail_the_chunk(self):
+        with self.post({"success": 2}):
+            result = send_push_notice("Title", "Body", ["t1", "t2"])
+        self.assertEqual(result["failed_tokens"], ["t1", "t2"])
+
+    def test_stale_tokens_are_dead(self):
+        with self.post({"results": [{"message_id": "1"}, {"error": "NotRegistered"}, {"error": "Unavailable"}]}):
+            result = send_push_notice("Title", "Body", ["t1", "t2", "t3"])
+        self.assertEqual((result["status"], result["invalid_tokens"]), ("partial", ["t2"]))
+        outcomes = recipient_outcomes("push", result, ["t1", "t2", "t3"])
+        self.assertEqual({token: status for token, (status, _) in outcomes.items()}, {"t1": "sent", "t2": "dead", "t3": "failed"})
+
+    @override_settings(FCM_SERVER_KEY="")
+    def test_skipped_without_server_key(self):
+        with self.post({}) as post:
+            self.assertEqual(send_push_notice("Title", "Body", ["t1"])["status"], "skipped")
+        post.assert_not_called()
+
+
+class DeviceRegistrationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("device-user@test.local", "pw", name="Device User")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_token_is_registered_once(self):
+        for _ in range(2):
+            response = self.client.post("/api/devices/register", {"token": "abc:DEF_123-x"}, format="json")
+            self.assertIn(response.status_code, (200, 201))
+        self.assertEqual(DeviceToken.objects.filter(user=self.user).count(), 1)
+
+    def test_malformed_tokens_are_rejected(self):
+        for token in ["", "has space", "x" * 513, ["list"], 42]:
+            response = self.client.post("/api/devices/register", {"token": token}, format="json")
+            self.assertEqual(response.status_code, 400, token)
+        self.assertFalse(DeviceToken.objects.exists())
@@ -0,0 +1,259 @@
+"""Query budgets for every route in ``notices/urls.py``.
+
+Each endpoint is called against a small dataset, the dataset is grown, and the
+endpoint is called again. The query count must not change between the two
+runs (no N+1) and must stay within the endpoint's declared budget. Budgets
+are for a cold cache; the cache is cleared before every call. Set
+``QUERY_BUDGET_REPORT=<file>`` to also write the measured counts and DB time
+as JSON.
+"""
+from itertools import count
+from unittest import mock
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from notices.models import (
+    ActivityLog,
+    Attachment,
+    CirculationJob,
+    Department,
+    DeviceToken,
+    Notice,
+    NoticeAttachment,
+    NoticeDelivery,
+    NoticeDistribution,
+    NoticeTracking,
+    UploadSession,
+    User,
+)
+from notices.tracking import TrackingBuffer
+
+PASSWORD = "budget-password"
+MEDIA_ROOT = tempfile.mkdtemp(prefix="ancs-budget-")
+_sequence = count()
+
+
+def populate(root, probe, offices, users_per_office, notices):
+    """Grow the dataset around ``probe``: more offices, users, notices, distributions, deliveries and tracking rows."""
+    departments = []
+    for _ in range(offices):
+        n = next(_sequence)
+        department = Department(name=f"Budget Office {n}", email=f"office{n}@budget.local", parent_office=root)
+        department.save()
+        departments.append(department)
+    users = User.objects.bulk_create(
+        [
+            User(
+                email=f"user{next(_sequence)}@budget.local",
+                name="Budget User",
+                phone=f"98{n:08d}",
+                department=department,
+            )
+            for department in departments
+            for n in range(users_per_office)
+        ]
+    )
+    DeviceToken.objects.bulk_create([DeviceToken(user=user, token=f"token-{user.pk}") for user in users])
+    created = Notice.objects.bulk_create(
+        [
+            Notice(title=f"Budget notice {n}", content="Budget", priority="urgent", status="approved", created_by=users[n % len(users)])
+            for n in range(notices)
+        ]
+    )
+    NoticeDistribution.objects.bulk_create(
+        [
+            NoticeDistribution(notice=notice, department=department, email_status="sent")
+            for notice in [probe, *created]
+            for department in departments
+        ]
+    )
+    NoticeDelivery.objects.bulk_create(
+        [
+            NoticeDelivery(
+                notice=probe,
+                department=user.department,
+                channel="email",
+                recipient=user.email,
+                status="failed" if user.pk % 3 else "sent",
+                next_attempt_at=timezone.now(),
+            )
+            for user in users
+        ]
+    )
+    NoticeTracking.objects.bulk_create(
+        [
+            NoticeTracking(user=user, notice=notice, downloaded=bool(user.pk % 2))
+            for notice in [probe, *created]
+            for user in users
+        ]
+    )
+    ActivityLog.objects.bulk_create([ActivityLog(user=user, action="viewed notice", notice=probe) for user in users])
+    attachments = Attachment.objects.bulk_create(
+        [Attachment(sha256=f"{next(_sequence):064x}", size=1, file="attachments/budget") for _ in created]
+    )
+    NoticeAttachment.objects.bulk_create(
+        [NoticeAttachment(notice=probe, attachment=attachment, filename="budget.pdf") for attachment in attachments]
+    )
+    return departments
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"], SYNC_SETTLE_SECONDS=0, MEDIA_ROOT=MEDIA_ROOT
+)
+class QueryBudgetTests(APITestCase):
+    measurements = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.root = Department.objects.create(name="Budget Directorate", office_type="directorate")
+        cls.office = Department.objects.create(name="Budget Division", office_type="division", parent_office=cls.root)
+        cls.spare = Department.objects.create(name="Budget Spare Office", parent_office=cls.root)
+        cls.admin = User.objects.create_user(
+            "budget-admin@budget.local", PASSWORD, name="Budget Admin", role=User.Role.ADMIN, department=cls.office
+        )
+        cls.probe = Notice.objects.create(
+            title="Probe notice", content="Probe", priority="urgent", status="pending", created_by=cls.admin, approved_by=cls.admin
+        )
+        cls.job = CirculationJob.objects.create(notice=cls.probe, requested_by=cls.admin, department_ids=[cls.office.pk])
+        cls.upload = UploadSession.objects.create(user=cls.admin, filename="tariff.pdf", size=8)
+        cls.uploaded = UploadSession.objects.create(
+            user=cls.admin,
+            filename="circular.pdf",
+            size=1,
+            received=1,
+            status="complete",
+            attachment=Attachment.objects.create(sha256="f" * 64, size=1, file="attachments/circular"),
+        )
+        cls.download = NoticeAttachment.objects.create(
+            notice=cls.probe,
+            attachment=Attachment.objects.create(sha256="e" * 64, size=8, file="attachments/tariff"),
+            filename="tariff.pdf",
+            created_by=cls.admin,
+        )
+        os.makedirs(os.path.join(MEDIA_ROOT, "attachments"), exist_ok=True)
+        with open(os.path.join(MEDIA_ROOT, "attachments", "tariff"), "wb") as fh:
+            fh.write(b"tariff!!")
+        populate(cls.root, cls.probe, offices=2, users_per_office=2, notices=3)
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+        self.refresh = str(RefreshToken.for_user(self.admin))
+        # Keep view events in memory; a flush would write from another thread mid-test.
+        patcher = mock.patch("notices.views.tracker", TrackingBuffer(interval=3600))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @classmethod
+    def tearDownClass(cls):
+        report = os.environ.get("QUERY_BUDGET_REPORT")
+        if report:
+            with open(report, "w") as fh:
+                json.dump(cls.measurements, fh, indent=2)
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def endpoints(self):
+        """(name, method, path, body, budget) for every route, max queries per request."""
+        notice = f"/api/notices/{self.probe.pk}/"
+        department = f"/api/departments/{self.office.pk}/"
+        return [
+            ("login", "post", "/api/auth/login", {"email": self.admin.email, "password": PASSWORD}, 3),
+            ("logout", "post", "/api/auth/logout", {"refresh": self.refresh}, 0),
+            (
+                "register",
+                "post",
+                "/api/auth/register",
+                {"name": "New", "email": "new@budget.local", "password": "x", "department_id": self.office.pk},
+                5,
+            ),
+            ("token refresh", "post", "/api/auth/refresh", {"refresh": self.refresh}, 0),
+            ("device register", "post", "/api/devices/register", {"token": "budget-device"}, 6),
+            ("upload start", "post", "/api/uploads", {"filename": "tariff.pdf", "size": 8}, 1),
+            ("upload status", "get", f"/api/uploads/{self.upload.pk}", None, 1),
+            # Includes the savepoint around the row-locked write.
+            ("upload chunk", "put", f"/api/uploads/{self.upload.pk}", b"tariff!!", 10),
+            ("device unregister", "post", "/api/devices/unregister", {"token": f"token-{self.admin.pk}"}, 1),
+            ("notice list", "get", "/api/notices/", None, 2),
+            ("notice list (compact)", "get", "/api/notices/?compact=true", None, 2),
+            ("notice list (department)", "get", f"/api/notices/?department_id={self.office.pk}", None, 2),
+            ("notice search", "get", "/api/notices/search/?q=budget", None, 2),
+            ("notice changes", "get", "/api/notices/changes/?limit=5", None, 2),
+            ("notice create", "post", "/api/notices/", {"title": "New", "content": "Body", "priority": "high"}, 2),
+            ("notice retrieve", "get", notice, None, 1),
+            ("notice update", "patch", notice, {"title": "Renamed"}, 4),
+            ("notice archive", "delete", notice, None, 4),
+            ("notice approve", "post", f"{notice}approve/", {"root_office_id": self.root.pk}, 13),
+            ("notice tracking", "get", f"{notice}tracking/", None, 2),
+            ("notice attachments", "get", f"{notice}attachments/", None, 2),
+            ("notice attach", "post", f"{notice}attachments/", {"upload_id": str(self.uploaded.pk)}, 7),
+            ("notice download", "get", f"{notice}download/?attachment={self.download.pk}", None, 2),
+            ("notice download link", "get", f"{notice}download-link/?attachment={self.download.pk}", None, 1),
+            ("department list", "get", "/api/departments/", None, 1),
+            ("department create", "post", "/api/departments/", {"name": "New Office", "parent_office": self.root.pk}, 6),
+            ("department retrieve", "get", department, None, 1),
+            ("department update", "patch", department, {"address": "Biratnagar"}, 4),
+            ("department delete", "delete", f"/api/departments/{self.spare.pk}/", None, 8),
+            ("department subtree", "get", f"/api/departments/{self.root.pk}/subtree/", None, 2),
+            ("department ancestors", "get", f"{department}ancestors/", None, 2),
+            ("admin dashboard", "get", "/api/admin/dashboard", None, 1),
+            ("department dashboard", "get", f"/api/department/dashboard?department_id={self.office.pk}", None, 3),
+            ("delivery report", "get", "/api/reports/delivery", None, 4),
+            ("circulation status", "get", f"/api/circulation/{self.job.pk}", None, 3),
+            ("notify email", "post", "/api/notify/email", {"subject": "S", "body": "B", "recipients": ["a@budget.local"]}, 0),
+            ("notify sms", "post", "/api/notify/sms", {"message": "M", "phones": ["9800000000"]}, 0),
+            ("notify push", "post", "/api/notify/push", {"title": "T", "body": "B", "tokens": []}, 0),
+            ("health", "get", "/api/health", None, 0),
+            # /api/events never ends; its access check is covered in test_events.py.
+        ]
+
+    def measure(self, method, path, body):
+        # Each call is rolled back so writes from one endpoint never feed the next.
+        cache.clear()
+        with transaction.atomic(), CaptureQueriesContext(connection) as captured:
+            if isinstance(body, bytes):
+                # A raw upload chunk covering the whole file.
+                response = self.client.generic(
+                    method.upper(),
+                    path,
+                    body,
+                    content_type="application/octet-stream",
+                    HTTP_CONTENT_RANGE=f"bytes 0-{len(body) - 1}/{len(body)}",
+                )
+            else:
+                response = getattr(self.client, method)(path, body, format="json")
+            if response.streaming:
+                b"".join(response.streaming_content)
+            transaction.set_rollback(True)
+        self.assertLess(response.status_code, 400, f"{method.upper()} {path}: {response.status_code} {getattr(response, 'content', b'')[:200]}")
+        return len(captured.captured_queries), sum(float(q["time"]) for q in captured.captured_queries)
+
+    def test_query_counts_are_flat_and_within_budget(self):
+        endpoints = self.endpoints()
+        small = {name: self.measure(method, path, body) for name, method, path, body, _ in endpoints}
+        populate(self.root, self.probe, offices=6, users_per_office=5, notices=12)
+        large = {name: self.measure(method, path, body) for name, method, path, body, _ in endpoints}
+
+        for name, method, path, _, budget in endpoints:
+            queries, db_time = large[name]
+            self.measurements[name] = {
+                "method": method.upper(),
+                "path": path,
+                "budget": budget,
+                "queries_small": small[name][0],
+                "queries_large": queries,
+                "db_ms_small": round(small[name][1] * 1000, 2),
+                "db_ms_large": round(db_time * 1000, 2),
+            }
+            with self.subTest(endpoint=name):
+                self.assertEqual(queries, small[name][0], f"{name}: query count grows with the number of rows")
+                self.assertLessEqual(queries, budget, f"{name}: {queries} queries exceeds the budget of {budget}")
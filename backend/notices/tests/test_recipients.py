@@ -0,0 +1,37 @@
+"""Recipient resolution for a circulation."""
+from django.test import TestCase
+
+from notices.models import Department, DeviceToken, User
+from notices.recipients import resolve_recipients
+
+
+class ResolveRecipientsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first = Department.objects.create(name="First Office")
+        cls.second = Department.objects.create(name="Second Office")
+        cls.empty = Department.objects.create(name="Empty Office")
+        cls.alice = User.objects.create_user("alice@test.local", "pw", name="Alice", department=cls.first, phone="9800000001")
+        cls.bob = User.objects.create_user("bob@test.local", "pw", name="Bob", department=cls.first, phone=" ")
+        # Shares Alice's phone under another office, and a mailbox differing only in case.
+        cls.carol = User.objects.create_user("carol@test.local", "pw", name="Carol", department=cls.second, phone="9800000001")
+        cls.dave = User.objects.create_user("ALICE@test.local", "pw", name="Dave", department=cls.second)
+        cls.gone = User.objects.create_user("gone@test.local", "pw", name="Gone", department=cls.second, is_active=False)
+        DeviceToken.objects.create(user=cls.alice, token="alice-phone")
+        DeviceToken.objects.create(user=cls.alice, token="alice-tablet")
+        DeviceToken.objects.create(user=cls.gone, token="gone-phone")
+
+    def test_each_contact_is_listed_once_under_the_lowest_office(self):
+        with self.assertNumQueries(1):
+            recipients = resolve_recipients([self.second.pk, self.first.pk, self.empty.pk, self.first.pk])
+        self.assertEqual(
+            recipients[self.first.pk],
+            {"email": ["alice@test.local", "bob@test.local"], "sms": ["9800000001"], "push": ["alice-phone", "alice-tablet"]},
+        )
+        self.assertEqual(recipients[self.second.pk], {"email": ["carol@test.local"], "sms": [], "push": []})
+        self.assertEqual(recipients[self.empty.pk], {"email": [], "sms": [], "push": []})
+
+    def test_inactive_users_are_skipped(self):
+        recipients = resolve_recipients([self.second.pk])
+        self.assertNotIn("gone@test.local", recipients[self.second.pk]["email"])
+        self.assertEqual(recipients[self.second.pk]["push"], [])
@@ -0,0 +1,56 @@
+"""The aggregated delivery report."""
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from notices.models import Department, Notice, NoticeDistribution, NoticeTracking, User
+
+
+class DeliveryReportTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.office = Department.objects.create(name="Report Office")
+        cls.elsewhere = Department.objects.create(name="Report Elsewhere")
+        cls.admin = User.objects.create_user("report-admin@test.local", "pw", name="Report Admin", role=User.Role.ADMIN)
+        cls.readers = [
+            User.objects.create_user(f"reader{n}@test.local", "pw", name="Reader", department=cls.office) for n in range(3)
+        ]
+        cls.outsider = User.objects.create_user("outsider@test.local", "pw", name="Outsider", department=cls.elsewhere)
+        cls.current = Notice.objects.create(title="Current", content="x", status="approved", created_by=cls.admin)
+        cls.archived = Notice.objects.create(title="Archived", content="x", status="archived", created_by=cls.admin)
+        for notice in (cls.current, cls.archived):
+            NoticeDistribution.objects.create(notice=notice, department=cls.office, email_status="sent", sent_email=True)
+        now = timezone.now()
+        NoticeTracking.objects.create(user=cls.readers[0], notice=cls.current, viewed_at=now, downloaded=True)
+        # A viewer from an office the notice was not sent to does not lower ``unviewed``.
+        NoticeTracking.objects.create(user=cls.outsider, notice=cls.current, viewed_at=now)
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def report(self, **params):
+        response = self.client.get("/api/reports/delivery", params)
+        self.assertEqual(response.status_code, 200)
+        return {row["id"]: row for row in response.data["results"]}
+
+    def test_counts(self):
+        row = self.report()[self.current.pk]
+        self.assertEqual((row["recipients"], row["viewed"], row["unviewed"], row["downloaded"]), (3, 2, 2, 1))
+        self.assertEqual(row["channels"]["email"]["sent"], 1)
+
+    def test_archived_notices_are_included(self):
+        self.assertEqual(set(self.report()), {self.current.pk, self.archived.pk})
+        self.assertEqual(set(self.report(status="archived")), {self.archived.pk})
+
+    def test_created_dates_are_inclusive_days(self):
+        today = timezone.localdate()
+        start = timezone.make_aware(datetime.combine(today, datetime.min.time()))
+        Notice.objects.filter(pk=self.current.pk).update(created_at=start)
+        Notice.objects.filter(pk=self.archived.pk).update(created_at=start - timedelta(microseconds=1))
+        self.assertEqual(set(self.report(created_after=today.isoformat())), {self.current.pk})
+        self.assertEqual(set(self.report(created_before=(today - timedelta(days=1)).isoformat())), {self.archived.pk})
+
+    def test_invalid_filter_is_rejected(self):
+        response = self.client.get("/api/reports/delivery", {"created_after": "yesterday"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,50 @@
+"""Full-text notice search."""
+from rest_framework.test import APITestCase
+
+from notices.models import Notice, User
+from notices.search import search_notices
+
+
+class SearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("search-admin@test.local", "pw", name="Search Admin", role=User.Role.ADMIN)
+        cls.in_title = cls.notice("Tariff revision", "Rates change next month.", priority="urgent")
+        cls.in_content = cls.notice("Monthly bulletin", "Includes the tariff table.")
+        cls.unrelated = cls.notice("Holiday", "Offices close on Friday.")
+
+    @classmethod
+    def notice(cls, title, content, priority="normal"):
+        return Notice.objects.create(title=title, content=content, priority=priority, status="approved", created_by=cls.admin)
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def search(self, text):
+        return list(search_notices(Notice.objects.all(), text).values_list("id", flat=True))
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.search("tariff"), [self.in_title.pk, self.in_content.pk])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search("tariff table"), [self.in_content.pk])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.unrelated.content = "Tariff offices close on Friday."
+        self.unrelated.save()
+        self.assertIn(self.unrelated.pk, self.search("tariff"))
+        self.in_title.delete()
+        self.assertNotIn(self.in_title.pk, self.search("tariff"))
+
+    def test_query_syntax_is_treated_as_text(self):
+        self.assertEqual(self.search('tariff" OR title:*'), [])
+        self.assertEqual(self.search('"tariff" NEAR'), [])
+        self.assertEqual(self.search("*"), [])
+        self.assertEqual(self.search("   "), [])
+
+    def test_endpoint_combines_filters_and_pages(self):
+        response = self.client.get("/api/notices/search/", {"q": "tariff", "priority": "urgent"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.in_title.pk])
+        response = self.client.get("/api/notices/search/", {"q": "tariff", "limit": 1, "page": 2})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.in_content.pk])
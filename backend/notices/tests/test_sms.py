@@ -0,0 +1,80 @@
+"""SMS throttling and batching."""
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from notices.sms import BaseSMSBackend, SMSGatewayError, TokenBucket
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_zero_or_negative_rate_is_unthrottled(self):
+        for rate in (0, -5):
+            bucket = TokenBucket(rate)
+            with mock.patch("notices.sms.time.sleep") as sleep:
+                bucket.acquire(1000)
+            sleep.assert_not_called()
+
+    def test_full_bucket_does_not_wait(self):
+        bucket = TokenBucket(10)
+        with mock.patch("notices.sms.time.sleep") as sleep:
+            bucket.acquire(10)
+        sleep.assert_not_called()
+
+    def test_empty_bucket_waits_for_refill(self):
+        bucket = TokenBucket(10)
+        clock = [100.0]
+        with mock.patch("notices.sms.time.monotonic", side_effect=lambda: clock[0]), mock.patch(
+            "notices.sms.time.sleep", side_effect=lambda seconds: clock.__setitem__(0, clock[0] + seconds)
+        ) as sleep:
+            bucket._updated = clock[0]
+            bucket.acquire(10)
+            bucket.acquire(5)
+        self.assertEqual(sleep.call_count, 1)
+        self.assertAlmostEqual(sleep.call_args.args[0], 0.5)
+
+    def test_request_larger_than_capacity_is_paid_in_installments(self):
+        bucket = TokenBucket(10)
+        clock = [100.0]
+        with mock.patch("notices.sms.time.monotonic", side_effect=lambda: clock[0]), mock.patch(
+            "notices.sms.time.sleep", side_effect=lambda seconds: clock.__setitem__(0, clock[0] + seconds)
+        ):
+            bucket._updated = clock[0]
+            bucket.acquire(25)
+        self.assertAlmostEqual(clock[0], 101.5)
+
+
+class RecordingBackend(BaseSMSBackend):
+    def __init__(self, errors=(), **kwargs):
+        super().__init__(**kwargs)
+        self.errors = list(errors)
+        self.batches = []
+
+    def send_batch(self, message, numbers):
+        self.batches.append(list(numbers))
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+class SMSBackendTests(SimpleTestCase):
+    def test_send_batch_is_abstract(self):
+        with self.assertRaises(TypeError):
+            BaseSMSBackend()
+
+    def test_numbers_are_batched(self):
+        backend = RecordingBackend(batch_size=2, rate=0)
+        result = backend.send("Hello", ["1", "2", "3"])
+        self.assertEqual(backend.batches, [["1", "2"], ["3"]])
+        self.assertEqual(result["sent"], ["1", "2", "3"])
+
+    def test_retryable_error_is_retried(self):
+        backend = RecordingBackend([SMSGatewayError("busy", retryable=True, retry_after=1)], batch_size=5, rate=0, max_retries=1)
+        with mock.patch("notices.sms.time.sleep") as sleep:
+            result = backend.send("Hello", ["1", "2"])
+        sleep.assert_called_once_with(1)
+        self.assertEqual((result["sent"], result["failed"]), (["1", "2"], []))
+
+    def test_permanent_error_fails_the_batch(self):
+        backend = RecordingBackend([SMSGatewayError("bad sender")], batch_size=1, rate=0, max_retries=3)
+        result = backend.send("Hello", ["1", "2"])
+        self.assertEqual(len(backend.batches), 2)
+        self.assertEqual((result["sent"], result["failed"], result["errors"]), (["2"], ["1"], ["bad sender"]))
@@ -0,0 +1,81 @@
+"""The delta-sync feed at /api/notices/changes."""
+import base64
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from notices.models import Notice, NoticeTombstone, User
+from notices.pagination import encode_feed_position
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class ChangeFeedTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("sync-admin@test.local", "pw", name="Sync Admin", role=User.Role.ADMIN)
+        cls.notices = [
+            Notice.objects.create(title=f"Notice {n}", content="x", status="approved", created_by=cls.admin) for n in range(3)
+        ]
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def sync(self, since=None, **params):
+        if since:
+            params["since"] = since
+        response = self.client.get("/api/notices/changes/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_pages_oldest_first(self):
+        first = self.sync(limit=2)
+        self.assertEqual([row["id"] for row in first["changes"]], [n.pk for n in self.notices[:2]])
+        self.assertTrue(first["has_more"])
+        second = self.sync(first["next_cursor"], limit=2)
+        self.assertEqual([row["id"] for row in second["changes"]], [self.notices[2].pk])
+        self.assertFalse(second["has_more"])
+        self.assertEqual(second["deleted"], [])
+
+    def test_reports_updates_and_deletions_since_the_cursor(self):
+        cursor = self.sync()["next_cursor"]
+        self.assertEqual(self.sync(cursor)["changes"], [])
+
+        self.notices[0].title = "Revised"
+        self.notices[0].save()
+        deleted_pk = self.notices[1].pk
+        self.notices[1].delete()
+
+        data = self.sync(cursor)
+        self.assertEqual([row["id"] for row in data["changes"]], [self.notices[0].pk])
+        self.assertEqual(data["deleted"], [deleted_pk])
+        self.assertEqual(self.sync(data["next_cursor"])["deleted"], [])
+
+    def test_first_sync_gets_no_deletions(self):
+        self.notices[2].delete()
+        self.assertEqual(self.sync()["deleted"], [])
+
+    def test_cursor_older_than_tombstones_is_gone(self):
+        old = timezone.now() - timedelta(days=91)
+        response = self.client.get("/api/notices/changes/", {"since": encode_feed_position(old, 0, old, 0)})
+        self.assertEqual(response.status_code, 410)
+
+    def test_malformed_cursor_is_rejected(self):
+        legacy = base64.urlsafe_b64encode(f"{timezone.now().isoformat()}|1".encode()).decode()
+        for since in ("not-a-cursor", base64.urlsafe_b64encode(b"x|y|z|w").decode(), legacy):
+            response = self.client.get("/api/notices/changes/", {"since": since})
+            self.assertEqual(response.status_code, 400, since)
+            self.assertIn("since", response.data)
+
+
+class PruneTombstonesTests(APITestCase):
+    def test_deletes_only_old_tombstones(self):
+        NoticeTombstone.objects.create(notice_id=1, deleted_at=timezone.now() - timedelta(days=100))
+        recent = NoticeTombstone.objects.create(notice_id=2)
+
+        call_command("prune_tombstones", days=90, stdout=StringIO())
+
+        self.assertEqual(list(NoticeTombstone.objects.values_list("id", flat=True)), [recent.pk])
@@ -0,0 +1,78 @@
+"""Buffered view and download tracking."""
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from notices.models import Notice, NoticeTracking, User
+from notices.tracking import TrackingBuffer
+
+
+class TrackingBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("tracked@test.local", "pw", name="Tracked")
+        cls.notices = [Notice.objects.create(title=f"N{n}", content="x", status="approved", created_by=cls.user) for n in range(3)]
+
+    def setUp(self):
+        # A long interval and a large size keep the background thread out of the test.
+        self.buffer = TrackingBuffer(interval=3600, max_size=1000)
+        self.now = timezone.now()
+
+    def row(self, notice):
+        return NoticeTracking.objects.get(user=self.user, notice=notice)
+
+    def test_events_are_coalesced_keeping_the_earliest(self):
+        notice = self.notices[0]
+        self.buffer.record_view(self.user.pk, notice.pk, self.now)
+        self.buffer.record_view(self.user.pk, notice.pk, self.now - timedelta(minutes=5))
+        self.buffer.record_view(self.user.pk, notice.pk, self.now + timedelta(minutes=5))
+        self.buffer.record_download(self.user.pk, notice.pk, self.now)
+        self.assertEqual(self.buffer.flush(), 2)
+        row = self.row(notice)
+        self.assertEqual(row.viewed_at, self.now - timedelta(minutes=5))
+        self.assertEqual((row.downloaded, row.download_time), (True, self.now))
+
+    def test_existing_rows_only_gain_missing_timestamps(self):
+        earlier = self.now - timedelta(days=1)
+        NoticeTracking.objects.create(user=self.user, notice=self.notices[0], viewed_at=earlier)
+        NoticeTracking.objects.create(user=self.user, notice=self.notices[1])
+        for notice in self.notices:
+            self.buffer.record_view(self.user.pk, notice.pk, self.now)
+        self.buffer.record_download(self.user.pk, self.notices[0].pk, self.now)
+        self.buffer.flush()
+        self.assertEqual(self.row(self.notices[0]).viewed_at, earlier)
+        self.assertEqual(self.row(self.notices[0]).download_time, self.now)
+        self.assertEqual(self.row(self.notices[1]).viewed_at, self.now)
+        self.assertEqual(self.row(self.notices[2]).viewed_at, self.now)
+
+    def test_flushed_keys_are_not_queued_again(self):
+        self.buffer.record_view(self.user.pk, self.notices[0].pk)
+        self.buffer.flush()
+        self.buffer.record_view(self.user.pk, self.notices[0].pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.buffer.flush(), 0)
+
+    def test_seen_cache_is_bounded(self):
+        buffer = TrackingBuffer(interval=3600, max_size=1000, seen_size=2)
+        for notice in self.notices:
+            buffer.record_view(self.user.pk, notice.pk)
+        buffer.flush()
+        buffer.record_view(self.user.pk, self.notices[0].pk)
+        self.assertEqual(len(buffer._pending), 1)
+
+    def test_failed_flush_keeps_events(self):
+        self.buffer.record_view(self.user.pk, self.notices[0].pk, self.now)
+        with mock.patch.object(NoticeTracking.objects, "bulk_create", side_effect=RuntimeError("database down")):
+            with self.assertRaises(RuntimeError):
+                self.buffer.flush()
+        self.buffer.record_view(self.user.pk, self.notices[0].pk, self.now + timedelta(minutes=1))
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.row(self.notices[0]).viewed_at, self.now)
+
+    def test_zero_interval_writes_immediately(self):
+        buffer = TrackingBuffer(interval=0)
+        buffer.record_download(self.user.pk, self.notices[0].pk)
+        self.assertTrue(self.row(self.notices[0]).downloaded)
+        self.assertIsNone(buffer._thread)
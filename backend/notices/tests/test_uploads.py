@@ -0,0 +1,139 @@
+"""Resumable, de-duplicated attachment uploads."""
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from notices.attachments import UploadOffsetConflict, temp_path, write_chunk
+from notices.models import Attachment, Department, Notice, UploadSession, User
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix="ancs-uploads-")
+CONTENT = b"tariff revision 2081"
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, ATTACHMENT_SENDFILE="")
+class UploadTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.office = Department.objects.create(name="Upload Office")
+        cls.head = User.objects.create_user(
+            "upload-head@test.local", "pw", name="Upload Head", role=User.Role.ADMIN, department=cls.office
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client.force_authenticate(self.head)
+        response = self.client.post(
+            "/api/uploads",
+            {"filename": "tariff.pdf", "size": len(CONTENT), "sha256": hashlib.sha256(CONTENT).hexdigest()},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.session = UploadSession.objects.get(pk=response.data["id"])
+        self.url = f"/api/uploads/{self.session.pk}"
+
+    def put(self, start, data):
+        return self.client.generic(
+            "PUT",
+            self.url,
+            data,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{start + len(data) - 1}/{len(CONTENT)}",
+        )
+
+    def test_resume_from_reported_offset(self):
+        self.assertEqual(self.put(0, CONTENT[:8]).status_code, 200)
+        self.assertEqual(self.client.get(self.url).data["received"], 8)
+        response = self.put(8, CONTENT[8:])
+        self.assertEqual(response.status_code, 200)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.status, "complete")
+        self.assertEqual(self.session.attachment.sha256, hashlib.sha256(CONTENT).hexdigest())
+        with open(os.path.join(MEDIA_ROOT, self.session.attachment.file.name), "rb") as fh:
+            self.assertEqual(fh.read(), CONTENT)
+
+    def test_chunk_at_wrong_offset_conflicts(self):
+        self.put(0, CONTENT[:8])
+        response = self.put(4, CONTENT[4:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["offset"], 8)
+        response = self.put(12, CONTENT[12:])
+        self.assertEqual(response.status_code, 409)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.received, 8)
+
+    def test_concurrent_writer_gets_conflict(self):
+        self.put(0, CONTENT[:8])
+        path = temp_path(self.session)
+        # Another request is still streaming the same chunk and holds the row lock (NOWAIT fails).
+        with mock.patch.object(UploadSession.objects, "select_for_update", side_effect=OperationalError("locked")):
+            response = self.put(8, CONTENT[8:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["offset"], 8)
+        self.assertEqual(path.stat().st_size, 8)
+        self.assertEqual(self.put(8, CONTENT[8:]).status_code, 200)
+
+    def test_stale_writer_cannot_append_after_offset_moved(self):
+        stale = UploadSession.objects.get(pk=self.session.pk)
+        self.put(0, CONTENT[:8])
+        # The stale copy still thinks the upload starts at 0; the offset is re-read under the lock.
+        with self.assertRaises(UploadOffsetConflict):
+            write_chunk(stale, 0, io.BytesIO(CONTENT[:8]), 8)
+        self.assertEqual(temp_path(self.session).stat().st_size, 8)
+
+    def test_bytes_past_offset_are_dropped(self):
+        self.put(0, CONTENT[:8])
+        # A writer died after writing but before recording its bytes.
+        with open(temp_path(self.session), "ab") as fh:
+            fh.write(b"garbage")
+        self.assertEqual(self.put(8, CONTENT[8:]).status_code, 200)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.status, "complete")
+
+    def test_missing_bytes_restart_upload(self):
+        self.put(0, CONTENT[:8])
+        temp_path(self.session).write_bytes(b"tar")
+        response = self.put(8, CONTENT[8:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["offset"], 0)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.received, 0)
+        self.assertEqual(self.put(0, CONTENT).status_code, 200)
+
+    def test_malformed_content_length_is_rejected(self):
+        response = self.client.generic(
+            "PUT",
+            self.url,
+            CONTENT,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes 0-{len(CONTENT) - 1}/{len(CONTENT)}",
+            CONTENT_LENGTH="twenty",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Content-Length", response.data["detail"])
+
+    def test_known_content_completes_without_bytes(self):
+        self.assertEqual(self.put(0, CONTENT).status_code, 200)
+        response = self.client.post(
+            "/api/uploads",
+            {"filename": "copy.pdf", "size": len(CONTENT), "sha256": hashlib.sha256(CONTENT).hexdigest()},
+            format="json",
+        )
+        self.assertEqual(response.data["status"], "complete")
+        self.assertEqual(Attachment.objects.count(), 1)
+
+    def test_attaching_requires_a_role(self):
+        notice = Notice.objects.create(title="Public", content="x", status="approved", created_by=self.head)
+        self.client.force_authenticate(None)
+        response = self.client.post(f"/api/notices/{notice.pk}/attachments/", {"upload_id": str(self.session.pk)})
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,136 @@
+import logging
+from collections import OrderedDict
+from django.conf import settings
+from django.db.models import Case, Q, Value, When
+from django.utils import timezone
+
+from .buffers import BackgroundBuffer
+from .models import NoticeTracking
+
+logger = logging.getLogger(__name__)
+
+# Rows per bulk INSERT / UPDATE statement
+WRITE_CHUNK = 500
+
+
+class TrackingBuffer(BackgroundBuffer):
+    """Collect view and download events in memory and write them in bulk.
+
+    Events are coalesced per ``(user_id, notice_id)`` keeping the earliest
+    timestamp, so a notice opened many times costs one row write. A background
+    thread flushes every ``interval`` seconds, or sooner once ``max_size``
+    keys are pending. Keys already flushed are remembered (bounded) and
+    skipped entirely, since the stored timestamp can only be earlier.
+    """
+
+    name = "tracking"
+
+    def __init__(self, interval=None, max_size=None, seen_size=None):
+        super().__init__(
+            settings.TRACKING_FLUSH_INTERVAL if interval is None else interval,
+            max_size or settings.TRACKING_FLUSH_SIZE,
+        )
+        self.seen_size = seen_size or settings.TRACKING_SEEN_CACHE_SIZE
+        self._pending = {}
+        self._seen = OrderedDict()
+
+    def record_view(self, user_id, notice_id, when=None):
+        self._record(user_id, notice_id, "viewed_at", when)
+
+    def record_download(self, user_id, notice_id, when=None):
+        self._record(user_id, notice_id, "download_time", when)
+
+    def _record(self, user_id, notice_id, field, when):
+        key = (user_id, notice_id, field)
+        with self._lock:
+            if key in self._seen:
+                return
+            when = when or timezone.now()
+            current = self._pending.get(key)
+            if current is None or when < current:
+                self._pending[key] = when
+            full = len(self._pending) >= self.max_size
+        self._added(full)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        rows = {}
+        for (user_id, notice_id, field), when in pending.items():
+            rows.setdefault((user_id, notice_id), {})[field] = when
+        items = list(rows.items())
+        written = 0
+        try:
+            for start in range(0, len(items), WRITE_CHUNK):
+                self._write(items[start:start + WRITE_CHUNK])
+                written = min(start + WRITE_CHUNK, len(items))
+        except Exception:
+            # Keep what was not written for the next flush instead of losing it.
+            self._requeue(items[written:])
+            raise
+        finally:
+            self._remember(items[:written])
+        logger.debug("Flushed %s tracking events", len(pending))
+        return len(pending)
+
+    def _requeue(self, items):
+        with self._lock:
+            for (user_id, notice_id), events in items:
+                for field, when in events.items():
+                    key = (user_id, notice_id, field)
+                    current = self._pending.get(key)
+                    if current is None or when < current:
+                        self._pending[key] = when
+
+    def _remember(self, items):
+        with self._lock:
+            for (user_id, notice_id), events in items:
+                for field in events:
+                    key = (user_id, notice_id, field)
+                    self._seen[key] = True
+                    self._seen.move_to_end(key)
+            while len(self._seen) > self.seen_size:
+                self._seen.popitem(last=False)
+
+    def _write(self, items):
+        NoticeTracking.objects.bulk_create(
+            [
+                NoticeTracking(
+                    user_id=user_id,
+                    notice_id=notice_id,
+                    viewed_at=events.get("viewed_at"),
+                    downloaded="download_time" in events,
+                    download_time=events.get("download_time"),
+                )
+                for (user_id, notice_id), events in items
+            ],
+            ignore_conflicts=True,
+        )
+        # Rows that already existed only take a timestamp they do not have yet,
+        # which keeps the earliest one.
+        views = [(key, events["viewed_at"]) for key, events in items if "viewed_at" in events]
+        if views:
+            NoticeTracking.objects.filter(_match(views), viewed_at__isnull=True).update(
+                viewed_at=Case(*_whens(views))
+            )
+        downloads = [(key, events["download_time"]) for key, events in items if "download_time" in events]
+        if downloads:
+            NoticeTracking.objects.filter(_match(downloads), downloaded=False).update(
+                downloaded=True, download_time=Case(*_whens(downloads))
+            )
+
+
+def _match(events):
+    condition = Q()
+    for (user_id, notice_id), _ in events:
+        condition |= Q(user_id=user_id, notice_id=notice_id)
+    return condition
+
+
+def _whens(events):
+    return [When(user_id=user_id, notice_id=notice_id, then=Value(when)) for (user_id, notice_id), when in events]
+
+
+tracker = TrackingBuffer().register_exit_flush()
@@ -5,15 +5,22 @@ from .views import (
     LoginView,
     LogoutView,
     RegisterView,
+    RegisterDeviceView,
+    UnregisterDeviceView,
+    UploadView,
+    UploadDetailView,
     NoticeViewSet,
     DepartmentViewSet,
     admin_dashboard,
     department_dashboard,
+    circulation_status,
+    delivery_reports,
     NotifyEmail,
     NotifySMS,
     NotifyPush,
     health,
 )
+from .events import event_stream
 
 router = DefaultRouter()
 router.register(r"notices", NoticeViewSet, basename="notice")
@@ -24,11 +31,18 @@ urlpatterns = [
     path("auth/logout", LogoutView.as_view(), name="logout"),
     path("auth/register", RegisterView.as_view(), name="register"),
     path("auth/refresh", TokenRefreshView.as_view(), name="token_refresh"),
+    path("devices/register", RegisterDeviceView.as_view(), name="device_register"),
+    path("devices/unregister", UnregisterDeviceView.as_view(), name="device_unregister"),
+    path("uploads", UploadView.as_view(), name="uploads"),
+    path("uploads/<uuid:upload_id>", UploadDetailView.as_view(), name="upload_detail"),
     path("", include(router.urls)),
     path("admin/dashboard", admin_dashboard, name="admin_dashboard"),
     path("department/dashboard", department_dashboard, name="department_dashboard"),
+    path("reports/delivery", delivery_reports, name="delivery_reports"),
+    path("circulation/<int:job_id>", circulation_status, name="circulation_status"),
     path("notify/email", NotifyEmail.as_view(), name="notify_email"),
     path("notify/sms", NotifySMS.as_view(), name="notify_sms"),
     path("notify/push", NotifyPush.as_view(), name="notify_push"),
+    path("events", event_stream, name="events"),
     path("health", health, name="health"),
 ]
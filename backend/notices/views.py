@@ -1,28 +1,89 @@
 import logging
+import re
 from datetime import datetime
 from django.db import transaction
+from django.http import HttpResponseRedirect
 from django.utils import timezone
 from rest_framework import status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import User, Department, Notice, NoticeDistribution, NoticeTracking, ActivityLog
+from .models import (
+    User,
+    Department,
+    Notice,
+    NoticeDistribution,
+    NoticeTracking,
+    CirculationJob,
+    DeviceToken,
+    UploadSession,
+)
 from .serializers import (
     AuthSerializer,
     UserSerializer,
     DepartmentSerializer,
     NoticeSerializer,
+    NoticeListSerializer,
     NoticeDistributionSerializer,
     NoticeTrackingSerializer,
+    CirculationJobSerializer,
+    DeviceTokenSerializer,
+    NoticeAttachmentSerializer,
+    UploadSessionSerializer,
 )
 from .permissions import IsAdmin, IsDepartmentHeadOrAbove
+from .activity import activity
+from .attachments import abort_upload, attach, start_upload, write_chunk
+from .downloads import attachment_response, download_url, token_user
 from .notifications import send_email_notice, send_sms_notice, send_push_notice
+from .conditional import collection_version, not_modified, row_version, set_validators, validators
+from .counters import read_counters
+from .directory import cached_directory
+from .events import publish_notice_event
+from .filters import date_dependent, filter_notices
+from . import hierarchy
+from .pagination import ChangeFeedPagination, KeysetPagination, SearchPagination
+from .search import search_notices
+from .reports import delivery_report
+from .tracking import tracker
+from .circulation import enqueue_circulation, job_progress, prune_device_tokens
 
 logger = logging.getLogger(__name__)
 
+CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+# FCM registration tokens are URL-safe base64 with ":" separators
+DEVICE_TOKEN = re.compile(r"^[A-Za-z0-9_:\-]+$")
+
+
+def _id_list(data, name):
+    """``data[name]`` (or ``name[]``; one id or a list) as a list of ints; a 400 names any that are not."""
+    if hasattr(data, "getlist"):
+        raw = data.getlist(name) or data.getlist(f"{name}[]")
+    else:
+        raw = data.get(name) or data.get(f"{name}[]") or []
+    if not isinstance(raw, (list, tuple)):
+        raw = [raw]
+    ids = []
+    for value in raw:
+        if isinstance(value, bool) or not str(value).strip().isdigit():
+            raise ValidationError({name: [f'"{value}" is not a valid id.']})
+        ids.append(int(value))
+    return ids
+
+
+def _attachment_param(request):
+    """``?attachment=`` as an int, or None when absent."""
+    value = request.query_params.get("attachment")
+    if not value:
+        return None
+    if not value.isdigit():
+        raise NotFound("Unknown attachment.")
+    return int(value)
+
 
 class RegisterView(APIView):
     permission_classes = [IsAdmin]
@@ -31,7 +92,7 @@ class RegisterView(APIView):
         serializer = UserSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
-        ActivityLog.objects.create(user=request.user, action="created user", notice=None)
+        activity.log(request.user, "created user")
         return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
 
 
@@ -55,34 +116,192 @@ class LogoutView(APIView):
         return Response({"detail": "Logged out"})
 
 
+class RegisterDeviceView(APIView):
+    def post(self, request):
+        token = request.data.get("token")
+        platform = request.data.get("platform") or "web"
+        if not token:
+            return Response({"token": ["This field is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        max_length = DeviceToken._meta.get_field("token").max_length
+        if not isinstance(token, str) or len(token) > max_length or not DEVICE_TOKEN.match(token):
+            return Response(
+                {"token": [f"Enter a valid registration token of at most {max_length} characters."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if platform not in dict(DeviceToken.PLATFORM_CHOICES):
+            return Response({"platform": [f'"{platform}" is not a valid choice.']}, status=status.HTTP_400_BAD_REQUEST)
+        # A browser that changes hands moves its token to the new user.
+        device, created = DeviceToken.objects.update_or_create(
+            token=token, defaults={"user": request.user, "platform": platform}
+        )
+        return Response(
+            DeviceTokenSerializer(device).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
+class UnregisterDeviceView(APIView):
+    def post(self, request):
+        DeviceToken.objects.filter(user=request.user, token=request.data.get("token")).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadView(APIView):
+    permission_classes = [IsDepartmentHeadOrAbove]
+
+    def post(self, request):
+        serializer = UploadSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        session = start_upload(request.user, data["filename"], data["size"], data.get("content_type", ""), data.get("sha256", ""))
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+
+class UploadDetailView(APIView):
+    """Resumable upload: ``GET`` reports the offset, ``PUT`` appends a chunk, ``DELETE`` aborts."""
+
+    permission_classes = [IsDepartmentHeadOrAbove]
+
+    def get_session(self, request, upload_id):
+        session = UploadSession.objects.filter(pk=upload_id, user=request.user).first()
+        if session is None:
+            raise NotFound()
+        return session
+
+    def get(self, request, upload_id):
+        return Response(UploadSessionSerializer(self.get_session(request, upload_id)).data)
+
+    def put(self, request, upload_id):
+        session = self.get_session(request, upload_id)
+        match = CONTENT_RANGE.match(request.headers.get("Content-Range", ""))
+        if not match:
+            return Response({"detail": "Content-Range: bytes <start>-<end>/<size> is required."}, status=status.HTTP_400_BAD_REQUEST)
+        start, end, total = (int(value) for value in match.groups())
+        try:
+            length = int(request.headers.get("Content-Length") or 0)
+        except ValueError:
+            return Response({"detail": "Content-Length must be a number of bytes."}, status=status.HTTP_400_BAD_REQUEST)
+        if total != session.size or end < start or end >= total or end - start + 1 != length:
+            return Response({"detail": "Content-Range does not match the upload or the body."}, status=status.HTTP_400_BAD_REQUEST)
+        # Read straight from the request stream; the chunk is never buffered whole.
+        session = write_chunk(session, start, request.stream, length)
+        return Response(UploadSessionSerializer(session).data)
+
+    def delete(self, request, upload_id):
+        abort_upload(self.get_session(request, upload_id))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class DepartmentViewSet(viewsets.ModelViewSet):
-    queryset = Department.objects.all()
+    queryset = Department.objects.select_related("parent_office").all()
     serializer_class = DepartmentSerializer
     permission_classes = [IsDepartmentHeadOrAbove]
 
+    def list(self, request, *args, **kwargs):
+        # The directory changes rarely; it is served from the cache until a
+        # Department save or delete bumps the directory version.
+        # ETag only: max(updated_at) would not move when an office is deleted, so a
+        # Last-Modified date could answer If-Modified-Since with a stale 304.
+        version, directory = cached_directory("list", lambda: self._serialize(self.get_queryset()))
+        etag = validators(request, "departments", version)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        return set_validators(Response(directory["results"]), etag)
+
+    def _serialize(self, queryset):
+        return {"results": [dict(row) for row in self.get_serializer(queryset, many=True).data]}
+
+    def retrieve(self, request, *args, **kwargs):
+        department = self.get_object()
+        # parent_office_name is part of the payload, so the parent's version is part of the ETag.
+        version, last_modified = row_version(department, department.parent_office)
+        etag = validators(request, "department", version)
+        cached = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+        return set_validators(Response(self.get_serializer(department).data), etag, last_modified)
+
+    @action(detail=True, methods=["get"], url_path="subtree")
+    def subtree(self, request, pk=None):
+        def build():
+            department = self.get_object()
+            return self._serialize(hierarchy.under_paths([department.path]).select_related("parent_office").order_by("path"))
+
+        return Response(cached_directory(f"subtree:{pk}", build)[1]["results"])
+
+    @action(detail=True, methods=["get"], url_path="ancestors")
+    def ancestors(self, request, pk=None):
+        def build():
+            return self._serialize(hierarchy.ancestors(self.get_object()).select_related("parent_office"))
+
+        return Response(cached_directory(f"ancestors:{pk}", build)[1]["results"])
+
 
 class NoticeViewSet(viewsets.ModelViewSet):
-    queryset = Notice.objects.select_related("created_by", "approved_by").all()
+    queryset = Notice.objects.select_related(
+        "created_by__department__parent_office", "approved_by__department__parent_office"
+    ).all()
     serializer_class = NoticeSerializer
+    pagination_class = KeysetPagination
 
     def get_permissions(self):
-        if self.action in ["list", "retrieve", "tracking"]:
-            return [AllowAny()] if self.request.method == "GET" else []
+        if self.action in ["list", "retrieve", "tracking", "search", "changes", "attachments", "download"]:
+            # Only reads are public; attaching a file needs the same role as uploading it.
+            return [AllowAny()] if self.request.method in ("GET", "HEAD") else [IsDepartmentHeadOrAbove()]
+        if self.action == "download_link":
+            # The link names its reader, so only a signed-in reader can have one made.
+            return [IsAuthenticated()]
         if self.action in ["approve", "destroy", "update", "partial_update"]:
             return [IsDepartmentHeadOrAbove()]
         return [IsDepartmentHeadOrAbove()]
 
     def list(self, request, *args, **kwargs):
-        queryset = self.queryset.order_by("-created_at")
-        department_id = request.query_params.get("department_id")
-        if department_id:
-            queryset = queryset.filter(distributions__department_id=department_id).distinct()
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+        # ?compact=true returns NoticeListSerializer rows; either way the authors'
+        # departments are joined up front so a page costs a fixed number of queries.
+        if request.query_params.get("compact", "").lower() in ("true", "1"):
+            queryset = Notice.objects.select_related("created_by__department", "approved_by__department")
+            serializer_class = NoticeListSerializer
+        else:
+            queryset = Notice.objects.select_related(
+                "created_by__department__parent_office", "approved_by__department__parent_office"
+            )
+            serializer_class = self.serializer_class
+        # Validated first, so a bad filter is a 400 even when the ETag matches.
+        queryset = filter_notices(queryset, request.query_params)
+        # Unchanged tables answer 304 from one aggregate query, before the page is read.
+        # Authors and their offices are nested in each row, so their versions count too,
+        # and date filters (expired=, expires_before=, ...) also depend on today's date.
+        # ETag only: neither a deleted row nor a new day moves max(updated_at), so a
+        # Last-Modified date could answer If-Modified-Since with a stale 304.
+        count, last_modified = collection_version(Notice.objects.all(), User.objects.all(), Department.objects.all())
+        today = timezone.localdate() if date_dependent(request.query_params) else None
+        etag = validators(request, "notices", count, last_modified, today)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        page = self.paginate_queryset(queryset)
+        serializer = serializer_class(page, many=True)
+        return set_validators(self.get_paginated_response(serializer.data), etag)
+
+    @action(detail=False, methods=["get"], url_path="search")
+    def search(self, request):
+        queryset = Notice.objects.select_related("created_by__department", "approved_by__department")
+        queryset = search_notices(filter_notices(queryset, request.query_params), request.query_params.get("q"))
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(NoticeListSerializer(page, many=True).data)
+
+    @action(detail=False, methods=["get"], url_path="changes")
+    def changes(self, request):
+        queryset = Notice.objects.select_related("created_by__department", "approved_by__department")
+        paginator = ChangeFeedPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(NoticeListSerializer(page, many=True).data)
 
     def perform_create(self, serializer):
         notice = serializer.save(created_by=self.request.user, status="pending")
-        ActivityLog.objects.create(user=self.request.user, action="created notice", notice=notice)
+        activity.log(self.request.user, "created notice", notice)
         return notice
 
     def create(self, request, *args, **kwargs):
@@ -94,65 +313,115 @@ class NoticeViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         notice = self.get_object()
         if request.user.is_authenticated:
-            tracking, _ = NoticeTracking.objects.get_or_create(user=request.user, notice=notice)
-            if not tracking.viewed_at:
-                tracking.viewed_at = timezone.now()
-                tracking.save()
-        return Response(self.get_serializer(notice).data)
+            tracker.record_view(request.user.pk, notice.pk)
+        # The payload nests both authors with their office and its parent (all joined by
+        # the viewset queryset), so a change to any of them changes the ETag.
+        nested = []
+        for user in (notice.created_by, notice.approved_by):
+            department = user.department if user else None
+            nested += [user, department, department.parent_office if department else None]
+        version, last_modified = row_version(notice, *nested)
+        etag = validators(request, "notice", version)
+        cached = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+        return set_validators(Response(self.get_serializer(notice).data), etag, last_modified)
 
     def update(self, request, *args, **kwargs):
         notice = self.get_object()
         serializer = self.get_serializer(notice, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
-        ActivityLog.objects.create(user=request.user, action="updated notice", notice=notice)
+        activity.log(request.user, "updated notice", notice)
+        publish_notice_event("notice.updated", notice)
         return Response(serializer.data)
 
     def destroy(self, request, *args, **kwargs):
         notice = self.get_object()
         notice.status = "archived"
         notice.save()
-        ActivityLog.objects.create(user=request.user, action="archived notice", notice=notice)
+        activity.log(request.user, "archived notice", notice)
+        publish_notice_event("notice.archived", notice)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=True, methods=["post"], url_path="approve")
     def approve(self, request, pk=None):
         notice = self.get_object()
-        department_ids = request.data.get("department_ids") or request.data.get("department_ids[]") or []
-        departments = Department.objects.filter(id__in=department_ids)
+        department_ids = _id_list(request.data, "department_ids")
+        root_office_ids = _id_list(request.data, "root_office_ids")
+        if request.data.get("root_office_id"):
+            root_office_ids += _id_list(request.data, "root_office_id")
+        # Resolve the targets before anything changes, so a bad request leaves the notice as it was.
+        paths = dict(Department.objects.filter(pk__in=[*department_ids, *root_office_ids]).values_list("id", "path"))
+        for name, ids in (("department_ids", department_ids), ("root_office_ids", root_office_ids)):
+            unknown = sorted(set(ids) - set(paths))
+            if unknown:
+                raise ValidationError({name: [f"Unknown office id {pk}." for pk in unknown]})
+        department_ids = {*department_ids, *root_office_ids}
+        if root_office_ids:
+            roots = [paths[pk] for pk in root_office_ids if paths[pk]]
+            department_ids.update(hierarchy.under_paths(roots).values_list("id", flat=True))
+        if not department_ids:
+            raise ValidationError({"department_ids": ["Choose at least one office to circulate to."]})
         with transaction.atomic():
             notice.status = "approved"
             notice.approved_by = request.user
             notice.save()
-            sent_status = []
-            for dept in departments:
-                dist, _ = NoticeDistribution.objects.get_or_create(notice=notice, department=dept)
-                recipients = list(User.objects.filter(department=dept).values_list("email", flat=True))
-                phones = list(User.objects.filter(department=dept).values_list("phone", flat=True))
-                push_tokens = []  # placeholder for stored FCM tokens
-                email_result = send_email_notice(f"[NEA Notice] {notice.title}", notice.content, recipients)
-                sms_result = send_sms_notice(f"NEA Notice: {notice.title}", phones) if notice.priority in ["high", "urgent"] else {"status": "skipped"}
-                push_result = send_push_notice(notice.title, notice.content, push_tokens)
-                dist.sent_email = email_result.get("status") == "sent"
-                dist.sent_sms = sms_result.get("status") == "sent"
-                dist.sent_push = push_result.get("status") == "sent"
-                dist.email_status = email_result.get("status")
-                dist.sms_status = sms_result.get("status")
-                dist.push_status = push_result.get("status")
-                dist.save()
-                sent_status.append({
-                    "department": dept.name,
-                    "email": email_result,
-                    "sms": sms_result,
-                    "push": push_result,
-                })
-            ActivityLog.objects.create(user=request.user, action="approved notice", notice=notice)
-        return Response({"status": "approved", "results": sent_status})
+            job, skipped = enqueue_circulation(notice, department_ids, request.user)
+            activity.log(request.user, "approved notice", notice)
+            publish_notice_event("notice.approved", notice, job.department_ids)
+        return Response(
+            # ``skipped`` names the offices and channels that already received this notice.
+            {"status": "approved", "job_id": job.id, "departments": len(job.department_ids), "skipped": skipped},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(detail=True, methods=["get", "post"], url_path="attachments")
+    def attachments(self, request, pk=None):
+        notice = self.get_object()
+        if request.method == "POST":
+            session = UploadSession.objects.filter(pk=request.data.get("upload_id"), user=request.user).first()
+            if session is None:
+                return Response({"upload_id": ["Unknown upload."]}, status=status.HTTP_400_BAD_REQUEST)
+            link = attach(notice, session, request.user, request.data.get("filename"))
+            activity.log(request.user, "attached file", notice)
+            return Response(NoticeAttachmentSerializer(link).data, status=status.HTTP_201_CREATED)
+        links = notice.attachments.select_related("attachment").order_by("id")
+        return Response(NoticeAttachmentSerializer(links, many=True, context={"request": request}).data)
+
+    @action(detail=True, methods=["get"], url_path="download")
+    def download(self, request, pk=None):
+        """Record the download and serve ``?attachment=`` (default: the first one) or redirect to ``file_url``."""
+        notice = self.get_object()
+        attachment_id = _attachment_param(request)
+        user = request.user
+        if not user.is_authenticated:
+            user = token_user(request.query_params.get("token", ""), notice.pk, attachment_id)
+        links = notice.attachments.select_related("attachment").order_by("id")
+        if attachment_id is not None:
+            links = links.filter(pk=attachment_id)
+        link = links.first()
+        if link is None and not notice.file_url:
+            raise NotFound("This notice has nothing to download.")
+        # Resumed downloads ask for a later byte range; only the first request counts.
+        if user is not None and request.headers.get("Range", "bytes=0-").startswith("bytes=0-"):
+            tracker.record_download(user.pk, notice.pk)
+        if link is None:
+            response = HttpResponseRedirect(notice.file_url)
+            response["Referrer-Policy"] = "no-referrer"
+            return response
+        return attachment_response(request, link)
+
+    @action(detail=True, methods=["get"], url_path="download-link")
+    def download_link(self, request, pk=None):
+        """A fresh signed ``download`` URL for ``?attachment=``, for links the browser opens itself."""
+        notice = self.get_object()
+        return Response({"url": download_url(request, notice.pk, _attachment_param(request))})
 
     @action(detail=True, methods=["get"], url_path="tracking")
     def tracking(self, request, pk=None):
         notice = self.get_object()
-        tracking = NoticeTracking.objects.filter(notice=notice)
+        tracking = NoticeTracking.objects.filter(notice=notice).select_related("user__department__parent_office")
         serializer = NoticeTrackingSerializer(tracking, many=True)
         return Response(serializer.data)
 
@@ -160,18 +429,14 @@ class NoticeViewSet(viewsets.ModelViewSet):
 @api_view(["GET"])
 @permission_classes([IsDepartmentHeadOrAbove])
 def admin_dashboard(request):
-    total_notices = Notice.objects.count()
-    delivered = NoticeDistribution.objects.filter(sent_email=True).count()
-    failed = NoticeDistribution.objects.filter(email_status="failed").count()
-    urgent = Notice.objects.filter(priority="urgent").count()
-    active_departments = Department.objects.count()
+    counters = read_counters()
     return Response(
         {
-            "total_notices": total_notices,
-            "delivered_reports": delivered,
-            "failed_deliveries": failed,
-            "urgent_notices": urgent,
-            "active_departments": active_departments,
+            "total_notices": counters["total_notices"],
+            "delivered_reports": counters["delivered_reports"],
+            "failed_deliveries": counters["failed_deliveries"],
+            "urgent_notices": counters["urgent_notices"],
+            "active_departments": counters["active_departments"],
         }
     )
 
@@ -180,7 +445,9 @@ def admin_dashboard(request):
 @permission_classes([IsDepartmentHeadOrAbove])
 def department_dashboard(request):
     dept_id = request.query_params.get("department_id")
-    qs = Notice.objects.all()
+    qs = Notice.objects.active().select_related(
+        "created_by__department__parent_office", "approved_by__department__parent_office"
+    )
     if dept_id:
         qs = qs.filter(distributions__department_id=dept_id)
     recent = qs.order_by("-created_at")[:10]
@@ -194,6 +461,30 @@ def department_dashboard(request):
     return Response(data)
 
 
+@api_view(["GET"])
+@permission_classes([IsDepartmentHeadOrAbove])
+def delivery_reports(request):
+    paginator = KeysetPagination()
+    # Archived notices were circulated too, so they stay in the report unless ``status`` excludes them.
+    queryset = filter_notices(
+        Notice.objects.only("id", "title", "priority", "status", "created_at"), request.query_params, active_only=False
+    )
+    page = paginator.paginate_queryset(queryset, request)
+    return paginator.get_paginated_response(delivery_report(page))
+
+
+@api_view(["GET"])
+@permission_classes([IsDepartmentHeadOrAbove])
+def circulation_status(request, job_id):
+    try:
+        job = CirculationJob.objects.get(pk=job_id)
+    except CirculationJob.DoesNotExist:
+        return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+    data = CirculationJobSerializer(job).data
+    data["progress"] = job_progress(job)
+    return Response(data)
+
+
 class NotifyEmail(APIView):
     permission_classes = [IsDepartmentHeadOrAbove]
 
@@ -215,6 +506,7 @@ class NotifyPush(APIView):
 
     def post(self, request):
         result = send_push_notice(request.data.get("title"), request.data.get("body"), request.data.get("tokens", []))
+        prune_device_tokens(result)
         return Response(result)
 
 
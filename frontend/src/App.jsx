@@ -16,7 +16,7 @@ import MyDownloads from './pages/MyDownloads'
 import AcknowledgementPage from './pages/AcknowledgementPage'
 import NoticeDetails from './pages/NoticeDetails'
 import DigitalNoticeboard from './pages/DigitalNoticeboard'
-import { initPush } from './firebase'
+import { initPush, registerPushToken } from './firebase'
 
 const PrivateRoute = ({ children }) => {
   const { token } = useAuth()
@@ -26,8 +26,8 @@ const PrivateRoute = ({ children }) => {
 export default function App() {
   useEffect(() => {
     initPush().then((token) => {
-      if (token) {
-        console.info('FCM token', token)
+      if (token && localStorage.getItem('ancs_token')) {
+        registerPushToken()
       }
     })
   }, [])
@@ -0,0 +1,66 @@
+import api from './axios'
+
+const TYPES = ['notice.approved', 'notice.updated', 'notice.archived', 'notice.circulated']
+
+// Subscribe to notice events from GET /api/events (Server-Sent Events).
+// Read with fetch rather than EventSource so the request carries the same
+// Authorization header as the rest of the API. Reconnects after the server's
+// `retry:` delay; onOpen fires on every (re)connect so callers can reload
+// whatever they may have missed.
+export function subscribeNoticeEvents(onEvent, { departmentId, onOpen } = {}) {
+  if (typeof fetch === 'undefined' || typeof TextDecoder === 'undefined') return () => {}
+  const query = departmentId ? `?department_id=${encodeURIComponent(departmentId)}` : ''
+  const controller = new AbortController()
+  let retry = 5000
+  let timer = null
+
+  const dispatch = (block) => {
+    let type = 'message'
+    const data = []
+    block.split('\n').forEach((line) => {
+      if (!line || line.startsWith(':')) return
+      const colon = line.indexOf(':')
+      const field = colon < 0 ? line : line.slice(0, colon)
+      const value = colon < 0 ? '' : line.slice(colon + 1).replace(/^ /, '')
+      if (field === 'event') type = value
+      else if (field === 'data') data.push(value)
+      else if (field === 'retry' && /^\d+$/.test(value)) retry = Number(value)
+    })
+    if (TYPES.includes(type) && data.length) onEvent(type, JSON.parse(data.join('\n')))
+  }
+
+  const connect = async () => {
+    try {
+      const headers = { Accept: 'text/event-stream' }
+      const auth = api.defaults.headers.common.Authorization
+      if (auth) headers.Authorization = auth
+      const res = await fetch(`${api.defaults.baseURL}/events${query}`, { headers, signal: controller.signal })
+      // Signed out or not allowed: retrying would only fail again.
+      if (res.status === 401 || res.status === 403) return
+      if (!res.ok || !res.body) throw new Error(`Event stream failed: ${res.status}`)
+      if (onOpen) onOpen()
+      const reader = res.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      for (;;) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        let end
+        while ((end = buffer.indexOf('\n\n')) >= 0) {
+          dispatch(buffer.slice(0, end))
+          buffer = buffer.slice(end + 2)
+        }
+      }
+    } catch (err) {
+      if (controller.signal.aborted) return
+    }
+    if (!controller.signal.aborted) timer = setTimeout(connect, retry)
+  }
+
+  connect()
+  return () => {
+    controller.abort()
+    clearTimeout(timer)
+  }
+}
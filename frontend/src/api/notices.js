@@ -0,0 +1,12 @@
+import api from './axios'
+
+// Fetch one page of a notice list or search. Pass the `next` of the previous
+// page to continue: the list follows its keyset `next_cursor`, search its
+// page number. `next` is null on the last page.
+export async function fetchNoticePage(path, params, next = null) {
+  const { data } = await api.get(path, { params: { ...params, ...next } })
+  let following = null
+  if (data.next_cursor) following = { cursor: data.next_cursor }
+  else if (data.next) following = { page: (next?.page || 1) + 1 }
+  return { results: data.results, next: following }
+}
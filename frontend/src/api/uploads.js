@@ -0,0 +1,44 @@
+import api from './axios'
+
+async function sha256Hex(file) {
+  if (!window.crypto?.subtle) return ''
+  const digest = await window.crypto.subtle.digest('SHA-256', await file.arrayBuffer())
+  return Array.from(new Uint8Array(digest)).map((b) => b.toString(16).padStart(2, '0')).join('')
+}
+
+// Upload a file in chunks and return the completed upload session.
+// An interrupted upload of the same file resumes from the server's offset;
+// a file the server already stores (same SHA-256) is not sent at all.
+export async function uploadFile(file, onProgress = () => {}) {
+  const resumeKey = `ancs_upload:${file.name}:${file.size}:${file.lastModified}`
+  let session = null
+  const saved = localStorage.getItem(resumeKey)
+  if (saved) {
+    session = await api.get(`/uploads/${saved}`).then((res) => res.data).catch(() => null)
+  }
+  if (!session) {
+    const sha256 = await sha256Hex(file)
+    session = (await api.post('/uploads', { filename: file.name, size: file.size, content_type: file.type, sha256 })).data
+    localStorage.setItem(resumeKey, session.id)
+  }
+  let offset = session.received
+  while (session.status !== 'complete') {
+    onProgress(offset / file.size)
+    const end = Math.min(offset + session.chunk_size, file.size)
+    try {
+      session = (
+        await api.put(`/uploads/${session.id}`, file.slice(offset, end), {
+          headers: { 'Content-Type': 'application/octet-stream', 'Content-Range': `bytes ${offset}-${end - 1}/${file.size}` }
+        })
+      ).data
+      offset = session.received
+    } catch (err) {
+      // 409: another attempt moved the offset; carry on from where the server is.
+      if (err.response?.status !== 409) throw err
+      offset = err.response.data.offset
+    }
+  }
+  localStorage.removeItem(resumeKey)
+  onProgress(1)
+  return session
+}
@@ -1,5 +1,6 @@
 import React, { createContext, useContext, useEffect, useState } from 'react'
 import api from '../api/axios'
+import { registerPushToken, unregisterPushToken } from '../firebase'
 
 const AuthContext = createContext()
 
@@ -21,10 +22,12 @@ export const AuthProvider = ({ children }) => {
     localStorage.setItem('ancs_token', data.access)
     localStorage.setItem('ancs_refresh', data.refresh)
     api.defaults.headers.common.Authorization = `Bearer ${data.access}`
+    registerPushToken()
     return data
   }
 
   const logout = async () => {
+    await unregisterPushToken()
     try {
       await api.post('/auth/logout', { refresh: localStorage.getItem('ancs_refresh') })
     } catch (err) {
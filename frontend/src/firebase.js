@@ -1,6 +1,7 @@
 // Firebase push notification bootstrap
 import { initializeApp } from 'firebase/app'
 import { getMessaging, getToken, onMessage } from 'firebase/messaging'
+import api from './api/axios'
 
 const firebaseConfig = {
   apiKey: import.meta.env.VITE_FIREBASE_API_KEY,
@@ -18,6 +19,7 @@ export const initPush = async () => {
   messaging = getMessaging(app)
   try {
     const token = await getToken(messaging, { vapidKey: import.meta.env.VITE_FIREBASE_VAPID_KEY })
+    if (token) localStorage.setItem('ancs_push_token', token)
     return token
   } catch (err) {
     console.error('FCM token error', err)
@@ -29,3 +31,24 @@ export const onPush = (cb) => {
   if (!messaging) return
   onMessage(messaging, cb)
 }
+
+// Link this browser's FCM token to the signed-in user so circulations reach it.
+export const registerPushToken = async () => {
+  const token = localStorage.getItem('ancs_push_token')
+  if (!token) return
+  try {
+    await api.post('/devices/register', { token, platform: 'web' })
+  } catch (err) {
+    console.error('Device register error', err)
+  }
+}
+
+export const unregisterPushToken = async () => {
+  const token = localStorage.getItem('ancs_push_token')
+  if (!token) return
+  try {
+    await api.post('/devices/unregister', { token })
+  } catch (err) {
+    console.error('Device unregister error', err)
+  }
+}
@@ -1,12 +1,14 @@
 import React, { useEffect, useState } from 'react'
 import Layout from '../components/Layout'
 import api from '../api/axios'
+import { uploadFile } from '../api/uploads'
 
 export default function CreateNotice() {
   const [departments, setDepartments] = useState([])
   const [form, setForm] = useState({ title: '', content: '', priority: 'normal', file_url: '', expiry_date: '' })
   const [selected, setSelected] = useState([])
   const [message, setMessage] = useState('')
+  const [file, setFile] = useState(null)
 
   useEffect(() => {
     api.get('/departments/').then((res) => setDepartments(res.data))
@@ -22,6 +24,10 @@ export default function CreateNotice() {
     e.preventDefault()
     try {
       const { data } = await api.post('/notices/', { ...form, department_ids: selected })
+      if (file) {
+        const upload = await uploadFile(file, (done) => setMessage(`Uploading attachment... ${Math.round(done * 100)}%`))
+        await api.post(`/notices/${data.id}/attachments/`, { upload_id: upload.id })
+      }
       setMessage('Notice created; awaiting approval.')
     } catch (err) {
       setMessage('Error creating notice')
@@ -37,6 +43,7 @@ export default function CreateNotice() {
           <input name="title" value={form.title} onChange={handleChange} placeholder="Title" className="w-full bg-slate-800 p-3 rounded" />
           <textarea name="content" value={form.content} onChange={handleChange} placeholder="Content" className="w-full bg-slate-800 p-3 rounded" rows="5"></textarea>
           <input name="file_url" value={form.file_url} onChange={handleChange} placeholder="File URL" className="w-full bg-slate-800 p-3 rounded" />
+          <input type="file" onChange={(e) => setFile(e.target.files[0] || null)} className="w-full bg-slate-800 p-3 rounded" />
           <div className="grid grid-cols-2 gap-3">
             <select name="priority" value={form.priority} onChange={handleChange} className="bg-slate-800 p-3 rounded">
               <option value="low">Low</option>
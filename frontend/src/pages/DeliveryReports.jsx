@@ -1,20 +1,20 @@
 import React, { useEffect, useState } from 'react'
 import Layout from '../components/Layout'
-import api from '../api/axios'
+import { fetchNoticePage } from '../api/notices'
 
 export default function DeliveryReports() {
   const [reports, setReports] = useState([])
+  const [next, setNext] = useState(null)
 
-  useEffect(() => {
-    api.get('/notices/').then(async (res) => {
-      const withStats = await Promise.all(
-        res.data.map(async (n) => {
-          const tracking = await api.get(`/notices/${n.id}/tracking/`)
-          return { ...n, tracking: tracking.data }
-        })
-      )
-      setReports(withStats)
+  // The report is keyset-paginated like the notice list.
+  const load = (from = null) =>
+    fetchNoticePage('/reports/delivery', {}, from).then((page) => {
+      setReports((prev) => (from ? [...prev, ...page.results] : page.results))
+      setNext(page.next)
     })
+
+  useEffect(() => {
+    load()
   }, [])
 
   return (
@@ -24,11 +24,19 @@ export default function DeliveryReports() {
         {reports.map((r) => (
           <div key={r.id} className="bg-slate-800 p-4 rounded">
             <p className="font-semibold">{r.title}</p>
-            <p className="text-sm text-slate-400">Priority: {r.priority} | Status: {r.status}</p>
-            <p className="text-sm text-emerald-300 mt-2">Views: {r.tracking.filter((t) => t.viewed_at).length} | Downloads: {r.tracking.filter((t) => t.downloaded).length}</p>
+            <p className="text-sm text-slate-400">Priority: {r.priority} | Status: {r.status} | Offices: {r.departments}</p>
+            <p className="text-sm text-emerald-300 mt-2">Views: {r.viewed} | Not viewed: {r.unviewed} | Downloads: {r.downloaded}</p>
+            <p className="text-xs text-slate-400 mt-1">
+              Email sent: {r.channels.email.sent}, failed: {r.channels.email.failed} | SMS sent: {r.channels.sms.sent}, failed: {r.channels.sms.failed} | Push sent: {r.channels.push.sent}, failed: {r.channels.push.failed}
+            </p>
           </div>
         ))}
       </div>
+      {next && (
+        <button onClick={() => load(next)} className="mt-4 px-4 py-2 bg-slate-700 rounded text-sm">
+          Load more
+        </button>
+      )}
     </Layout>
   )
 }
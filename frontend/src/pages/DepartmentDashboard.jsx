@@ -1,15 +1,22 @@
 import React, { useEffect, useState } from 'react'
 import Layout from '../components/Layout'
 import api from '../api/axios'
+import { subscribeNoticeEvents } from '../api/events'
 
 export default function DepartmentDashboard() {
   const [data, setData] = useState({ recent: [], unseen_count: 0, downloads: 0 })
   const [departmentId, setDepartmentId] = useState('')
+  const [version, setVersion] = useState(0)
 
   useEffect(() => {
     if (departmentId) {
       api.get(`/department/dashboard?department_id=${departmentId}`).then((res) => setData(res.data))
     }
+  }, [departmentId, version])
+
+  useEffect(() => {
+    if (!departmentId) return undefined
+    return subscribeNoticeEvents(() => setVersion((v) => v + 1), { departmentId })
   }, [departmentId])
 
   return (
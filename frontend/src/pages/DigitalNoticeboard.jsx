@@ -1,21 +1,35 @@
 import React, { useEffect, useState } from 'react'
 import Layout from '../components/Layout'
-import api from '../api/axios'
+import { fetchNoticePage } from '../api/notices'
+import { subscribeNoticeEvents } from '../api/events'
 
 export default function DigitalNoticeboard() {
   const [notices, setNotices] = useState([])
   const [query, setQuery] = useState('')
   const [priority, setPriority] = useState('')
+  const [version, setVersion] = useState(0)
+  const [next, setNext] = useState(null)
+
+  const load = (from = null) => {
+    const params = { priority: priority || undefined, compact: true }
+    const request = query.trim()
+      ? fetchNoticePage('/notices/search/', { ...params, q: query }, from)
+      : fetchNoticePage('/notices/', params, from)
+    return request.then((page) => {
+      setNotices((prev) => (from ? [...prev, ...page.results] : page.results))
+      setNext(page.next)
+    })
+  }
 
   useEffect(() => {
-    api.get('/notices/').then((res) => setNotices(res.data))
-  }, [])
+    load()
+  }, [query, priority, version])
 
-  const filtered = notices.filter((n) => {
-    const matchesText = n.title.toLowerCase().includes(query.toLowerCase())
-    const matchesPriority = priority ? n.priority === priority : true
-    return matchesText && matchesPriority
-  })
+  // Refetch on every notice event; unchanged pages come back as 304s.
+  useEffect(() => {
+    const refresh = () => setVersion((v) => v + 1)
+    return subscribeNoticeEvents(refresh, { onOpen: refresh })
+  }, [])
 
   return (
     <Layout>
@@ -31,7 +45,7 @@ export default function DigitalNoticeboard() {
         </select>
       </div>
       <div className="grid md:grid-cols-2 gap-3">
-        {filtered.map((n) => (
+        {notices.map((n) => (
           <div key={n.id} className="bg-slate-800 p-4 rounded border-l-4" style={{ borderColor: n.priority === 'urgent' ? '#ef4444' : n.priority === 'high' ? '#f59e0b' : '#10b981' }}>
             <p className="font-semibold">{n.title}</p>
             <p className="text-sm text-slate-300">{n.content.slice(0, 120)}...</p>
@@ -39,6 +53,11 @@ export default function DigitalNoticeboard() {
           </div>
         ))}
       </div>
+      {next && (
+        <button onClick={() => load(next)} className="mt-4 px-4 py-2 bg-slate-700 rounded text-sm">
+          Load more
+        </button>
+      )}
     </Layout>
   )
 }
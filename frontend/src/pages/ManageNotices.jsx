@@ -1,13 +1,20 @@
 import React, { useEffect, useState } from 'react'
 import Layout from '../components/Layout'
 import api from '../api/axios'
+import { fetchNoticePage } from '../api/notices'
 
 export default function ManageNotices() {
   const [notices, setNotices] = useState([])
   const [departments, setDepartments] = useState([])
   const [selectedDept, setSelectedDept] = useState([])
+  const [message, setMessage] = useState('')
+  const [next, setNext] = useState(null)
 
-  const load = () => api.get('/notices/').then((res) => setNotices(res.data))
+  const load = (from = null) =>
+    fetchNoticePage('/notices/', { compact: true }, from).then((page) => {
+      setNotices((prev) => (from ? [...prev, ...page.results] : page.results))
+      setNext(page.next)
+    })
 
   useEffect(() => {
     load()
@@ -15,8 +22,12 @@ export default function ManageNotices() {
   }, [])
 
   const approve = async (id) => {
-    await api.post(`/notices/${id}/approve/`, { department_ids: selectedDept })
-    load()
+    const { data } = await api.post(`/notices/${id}/approve/`, { department_ids: selectedDept })
+    // Offices and channels that already received the notice are not sent it again.
+    const skipped = data.skipped.map((s) => `${departments.find((d) => d.id === s.department_id)?.name || s.department_id} (${s.channels.join(', ')})`)
+    setMessage(skipped.length ? `Circulating to ${data.departments} offices; already sent: ${skipped.join('; ')}` : `Circulating to ${data.departments} offices`)
+    // Update the row in place so pages loaded further down stay loaded.
+    setNotices((prev) => prev.map((n) => (n.id === id ? { ...n, status: data.status } : n)))
   }
 
   return (
@@ -38,6 +49,7 @@ export default function ManageNotices() {
           </label>
         ))}
       </div>
+      {message && <p className="text-sm text-slate-300 mb-4">{message}</p>}
       <div className="grid gap-3">
         {notices.map((n) => (
           <div key={n.id} className="bg-slate-800 p-4 rounded">
@@ -46,13 +58,18 @@ export default function ManageNotices() {
                 <p className="font-semibold">{n.title}</p>
                 <p className="text-sm text-slate-400">Priority: {n.priority} | Status: {n.status}</p>
               </div>
-              {n.status !== 'approved' && (
-                <button onClick={() => approve(n.id)} className="px-3 py-1 bg-emerald-700 rounded text-sm">Approve & Circulate</button>
-              )}
+              <button onClick={() => approve(n.id)} className="px-3 py-1 bg-emerald-700 rounded text-sm">
+                {n.status === 'approved' ? 'Circulate to selected' : 'Approve & Circulate'}
+              </button>
             </div>
           </div>
         ))}
       </div>
+      {next && (
+        <button onClick={() => load(next)} className="mt-4 px-4 py-2 bg-slate-700 rounded text-sm">
+          Load more
+        </button>
+      )}
     </Layout>
   )
 }
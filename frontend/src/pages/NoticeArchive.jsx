@@ -1,14 +1,19 @@
 import React, { useEffect, useState } from 'react'
 import Layout from '../components/Layout'
-import api from '../api/axios'
+import { fetchNoticePage } from '../api/notices'
 
 export default function NoticeArchive() {
   const [items, setItems] = useState([])
+  const [next, setNext] = useState(null)
 
-  useEffect(() => {
-    api.get('/notices/?status=archived').then((res) => {
-      setItems(res.data.filter((n) => n.status === 'archived'))
+  const load = (from = null) =>
+    fetchNoticePage('/notices/', { status: 'archived', compact: true }, from).then((page) => {
+      setItems((prev) => (from ? [...prev, ...page.results] : page.results))
+      setNext(page.next)
     })
+
+  useEffect(() => {
+    load()
   }, [])
 
   return (
@@ -22,6 +27,11 @@ export default function NoticeArchive() {
           </div>
         ))}
       </div>
+      {next && (
+        <button onClick={() => load(next)} className="mt-4 px-4 py-2 bg-slate-700 rounded text-sm">
+          Load more
+        </button>
+      )}
     </Layout>
   )
 }
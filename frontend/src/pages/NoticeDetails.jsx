@@ -6,11 +6,34 @@ import api from '../api/axios'
 export default function NoticeDetails() {
   const { id } = useParams()
   const [notice, setNotice] = useState(null)
+  const [attachments, setAttachments] = useState([])
 
   useEffect(() => {
     api.get(`/notices/${id}/`).then((res) => setNotice(res.data))
+    api.get(`/notices/${id}/attachments/`).then((res) => setAttachments(res.data)).catch(() => setAttachments([]))
   }, [id])
 
+  // Download links carry a short-lived token naming the reader, so one is made on each click.
+  // The window opens first, while the click still allows it.
+  const download = async (attachment) => {
+    const win = window.open('about:blank', '_blank')
+    if (win) win.opener = null
+    let url
+    try {
+      const { data } = await api.get(`/notices/${id}/download-link/`, { params: { attachment } })
+      url = data.url
+    } catch (err) {
+      if (err.response?.status !== 401) {
+        if (win) win.close()
+        return
+      }
+      // Signed out: the file is public, the download just is not attributed to anyone.
+      url = `${api.defaults.baseURL}/notices/${id}/download/${attachment ? `?attachment=${attachment}` : ''}`
+    }
+    if (win) win.location.href = url
+    else window.location.assign(url)
+  }
+
   if (!notice) return <Layout>Loading...</Layout>
 
   return (
@@ -19,8 +42,13 @@ export default function NoticeDetails() {
         <p className="text-sm text-slate-400">Priority: {notice.priority} | Status: {notice.status}</p>
         <h1 className="text-3xl font-semibold">{notice.title}</h1>
         <article className="prose prose-invert" dangerouslySetInnerHTML={{ __html: notice.content.replace(/\n/g, '<br/>') }}></article>
+        {attachments.map((file) => (
+          <button key={file.id} type="button" onClick={() => download(file.id)} className="block text-primary underline">
+            {file.filename} ({Math.ceil(file.size / 1024)} KB)
+          </button>
+        ))}
         {notice.file_url && (
-          <a href={notice.file_url} target="_blank" rel="noreferrer" className="inline-block bg-primary px-4 py-2 rounded text-white">Download</a>
+          <button type="button" onClick={() => download()} className="inline-block bg-primary px-4 py-2 rounded text-white">Download</button>
         )}
       </div>
     </Layout>
@@ -1,13 +1,20 @@
 import React, { useEffect, useState } from 'react'
 import { Link } from 'react-router-dom'
 import Layout from '../components/Layout'
-import api from '../api/axios'
+import { fetchNoticePage } from '../api/notices'
 
 export default function ViewNotices() {
   const [notices, setNotices] = useState([])
+  const [next, setNext] = useState(null)
+
+  const load = (from = null) =>
+    fetchNoticePage('/notices/', { compact: true }, from).then((page) => {
+      setNotices((prev) => (from ? [...prev, ...page.results] : page.results))
+      setNext(page.next)
+    })
 
   useEffect(() => {
-    api.get('/notices/').then((res) => setNotices(res.data))
+    load()
   }, [])
 
   return (
@@ -24,6 +31,11 @@ export default function ViewNotices() {
           </div>
         ))}
       </div>
+      {next && (
+        <button onClick={() => load(next)} className="mt-4 px-4 py-2 bg-slate-700 rounded text-sm">
+          Load more
+        </button>
+      )}
     </Layout>
   )
 }